@@ -0,0 +1,98 @@
+import time
+import click
+import lcarsmonitor.sensors.sensors as sensors
+from lcarsmonitor.system.system import UISystem, UIManager
+
+
+class HeadlessMonitor:
+    """Runs UISystems without a GUI.
+
+    This is used by the ``headless`` command, to run the logic of UISystems (such as alerting graphs) on machines without
+    a display. The ComputerSystem is opened as usual, polling sensors in its background thread, and the systems are
+    updated at a fixed rate: each update processes the pending sensor events (triggering the On Update flows of Sensor nodes)
+    and triggers the On Update flow of each system's Root node (see ``UISystem.update()``).
+
+    No window, ImGui context, fonts or images are created, and widgets are never rendered. Actions that change widgets
+    still work, but nothing is shown.
+
+    Configs of the systems aren't saved, so running headless never overwrites changes made in the GUI.
+    """
+
+    def __init__(self, system_names: list[str], rate: float = 10.0):
+        """
+        Args:
+            system_names (list[str]): names of the UISystems to run.
+            rate (float, optional): amount of updates per second. Defaults to 10.
+        """
+        self.system_names = list(system_names)
+        """Names of the UISystems to run."""
+        self.rate = rate
+        """Amount of updates per second."""
+        self.systems: dict[str, UISystem] = {}
+        """Instantiated UISystems, by name."""
+        self.updates = 0
+        """Number of updates done."""
+
+    def open(self):
+        """Opens the ComputerSystem (if not opened already) and instantiates our UISystems.
+
+        Returns:
+            bool: if all systems were instantiated.
+        """
+        computer = sensors.ComputerSystem()
+        if not computer.is_active:
+            computer.open()
+        manager = UIManager()
+        for name in self.system_names:
+            config = manager.get_config(name)
+            if config is None:
+                click.secho(f"HeadlessMonitor: UISystem '{name}' doesn't exist.", fg="red")
+                return False
+            self.systems[name] = config.instantiate()
+            click.secho(f"HeadlessMonitor: running UISystem '{name}'.", fg="magenta")
+        return True
+
+    def update(self, delta_time: float):
+        """Updates all our systems once, after processing pending sensor events.
+
+        Args:
+            delta_time (float): time (in seconds) since the last update.
+        """
+        sensors.ComputerSystem().process_sensor_events()
+        for system in self.systems.values():
+            system.update(delta_time)
+        self.updates += 1
+
+    def close(self):
+        """Clears our systems and closes the ComputerSystem."""
+        for system in self.systems.values():
+            system.clear()
+        self.systems.clear()
+        computer = sensors.ComputerSystem()
+        if computer.is_active:
+            computer.close()
+
+    def run(self):
+        """Opens and runs our systems at our update rate, until interrupted (such as with CTRL+C)."""
+        if not self.open():
+            self.close()
+            return
+        period = 1.0 / max(self.rate, 0.01)
+        last_time = time.perf_counter()
+        next_update = last_time
+        click.secho(f"HeadlessMonitor: updating {len(self.systems)} systems at {self.rate} updates per second. Stop with CTRL+C.", fg="green")
+        try:
+            while True:
+                now = time.perf_counter()
+                self.update(now - last_time)
+                last_time = now
+                # Deadline-based, so the update rate doesn't drift. If we fall behind by a full period, we skip ahead.
+                next_update += period
+                if next_update < now:
+                    next_update = now + period
+                time.sleep(max(0.0, next_update - time.perf_counter()))
+        except KeyboardInterrupt:
+            pass
+        finally:
+            self.close()
+            click.secho(f"HeadlessMonitor: stopped after {self.updates} updates.", fg="magenta")
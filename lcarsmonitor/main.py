@@ -1,11 +1,18 @@
 #!/usr/bin/env python3
 import os
 import sys
+import json
 import click
 import libasvat.command_utils as cmd_utils
 import libasvat.utils as utils
 from lcarsmonitor.sensors.sensors import ComputerSystem
+from lcarsmonitor.sensors.daemon import SensorDaemon, DaemonRunningError, DEFAULT_SHARED_MEMORY_NAME
+from lcarsmonitor.sensors.sources.daemon_impl import DaemonSensors
+from lcarsmonitor.sensors.sources.synthetic_impl import SYNTHETIC_GENERATORS
+from lcarsmonitor.sensors.benchmark import run_sensor_benchmarks
 from lcarsmonitor.monitor import SystemMonitorApp
+from lcarsmonitor.monitor_data import MonitorAppData
+from lcarsmonitor.headless import HeadlessMonitor
 from lcarsmonitor.widgets.label import setup_lcars_fonts
 
 
@@ -54,6 +61,80 @@ class LCARSMonitorCommands(cmd_utils.RootCommands):
         """Opens the System Monitor GUI in EDIT mode."""
         self.open_gui(force_edit_mode=True, test_sensors=test)
 
+    @cmd_utils.instance_command()
+    @click.option("--test", "-t", is_flag=True, help="Use dummy testing sensors")
+    @click.option("--system", "-s", "systems", type=str, multiple=True, help="Name of UISystem to run. May be given multiple times.")
+    @click.option("--rate", "-r", type=float, default=10.0, help="Amount of system updates per second.")
+    def headless(self, test: bool, systems: tuple[str], rate: float):
+        """Runs UISystems without a GUI, for machines without a display.
+
+        The sensors are polled as usual, and the logic of the systems (their Root node's On Update flow and Sensor-driven
+        flows) is updated at a fixed RATE, but no window is opened and widgets aren't rendered. By default, runs the
+        system selected as the 'main' system in EDIT mode.
+
+        Stop with CTRL+C. The configs of the systems aren't saved.
+        """
+        systems = list(systems) or [MonitorAppData().selected_system]
+        if None in systems:
+            click.secho("No UISystem selected. Pass one with --system, or select a main system in EDIT mode.", fg="red")
+            return
+        if test:
+            ComputerSystem().open(True)
+        elif not utils.is_admin_user():
+            click.secho("Running headless without admin permissions!", fg="red")
+            click.secho("Not all system sensors will be available or work properly.", fg="red")
+        HeadlessMonitor(systems, rate).run()
+
+    @cmd_utils.instance_command()
+    @click.option("--source", "-s", type=str, default=None, help="Class name of the SensorSource to run. Defaults to the source selected in the GUI.")
+    @click.option("--name", "-n", type=str, default=DEFAULT_SHARED_MEMORY_NAME, help="Name of the shared memory to publish sensors to.")
+    @click.option("--rate", "-r", type=float, default=10.0, help="Amount of polls per second.")
+    @click.option("--all", "poll_all", is_flag=True, help="Poll all hardware, even those not being used by any GUI.")
+    def sensord(self, source: str, name: str, rate: float, poll_all: bool):
+        """Runs the Sensor Daemon, polling a SensorSource in this process and publishing its sensors in shared memory.
+
+        GUIs using the `Sensor Daemon` source will read their sensors from this daemon, so slow hardware updates happen
+        in this process instead of affecting the GUI's rendering. Several GUIs may use the same daemon.
+
+        The source uses the settings persisted by the GUI. Stop the daemon with CTRL+C.
+        """
+        sensor_source = ComputerSystem().get_source(source)
+        if sensor_source is None or isinstance(sensor_source, DaemonSensors):
+            click.secho(f"Invalid sensor source '{source or ComputerSystem().selected_source}' to run in the sensor daemon.", fg="red")
+            return
+        is_ok, message = sensor_source.check_availability()
+        if not is_ok:
+            click.secho(f"Sensor source '{sensor_source.pretty_name}' isn't available: {message}", fg="red")
+            return
+        if not utils.is_admin_user():
+            click.secho("Running Sensor Daemon without admin permissions!", fg="red")
+            click.secho("Not all system sensors will be available or work properly.", fg="red")
+        try:
+            SensorDaemon(sensor_source, name, rate, poll_all).run()
+        except DaemonRunningError as e:
+            click.secho(f"{e}. Stop it first, or use another --name.", fg="red")
+
+    @cmd_utils.instance_command()
+    @click.option("--sizes", "-s", type=str, default="100,1000,10000", help="Comma-separated amounts of sensors to benchmark with.")
+    @click.option("--repeats", "-r", type=int, default=20, help="Number of calls averaged for each timing.")
+    @click.option("--generator", "-g", type=click.Choice(SYNTHETIC_GENERATORS), default="sine", help="Value generator of the synthetic sensors.")
+    @click.option("--output", "-o", type=click.Path(dir_okay=False), default=None, help="Path of JSON file to save results to.")
+    def benchmark(self, sizes: str, repeats: int, generator: str, output: str):
+        """Benchmarks the sensor pipeline with synthetic sensors, without opening the GUI.
+
+        For each amount of sensors, measures the ComputerSystem update throughput, the cost of Sensor node updates and
+        the memory used per sensor. Results are printed as JSON (or saved to OUTPUT), for comparing between versions.
+        """
+        amounts = [int(size) for size in sizes.split(",") if size.strip()]
+        results = run_sensor_benchmarks(amounts, repeats, generator)
+        text = json.dumps(results, indent=4)
+        if output:
+            with open(output, "w") as file:
+                file.write(text)
+            click.secho(f"Benchmark results saved to '{output}'", fg="green")
+        else:
+            click.echo(text)
+
     def open_gui(self, force_edit_mode: bool = None, force_system_name: str = None, test_sensors=False):
         """Opens the System Monitor GUI with the given parameters.
 
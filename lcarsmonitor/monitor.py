@@ -9,6 +9,7 @@ from libasvat.imgui.editors.controller import render_all_properties
 from imgui_bundle import imgui, imgui_ctx
 from libasvat.imgui.windows_settings import WindowSettings, WindowedTemplate
 from lcarsmonitor.monitor_data import MonitorAppData
+from lcarsmonitor.profiler import Profiler, ProfilerWindow
 
 
 class SystemMonitorApp(windows.AppWindow):
@@ -44,6 +45,8 @@ class SystemMonitorApp(windows.AppWindow):
         from lcarsmonitor.system.system import UISystem, UIManager
         self.system_manager = UIManager()
         self.opened_systems: dict[str, UISystem] = {}
+        self.show_profiler = False
+        """If the Profiler window is shown in DISPLAY mode (in EDIT mode, it's a regular sub-window)."""
         self._reset_window_attrs()
 
     @property
@@ -83,6 +86,13 @@ class SystemMonitorApp(windows.AppWindow):
         self.settings = self.edit_window_settings if in_edit_mode else self.display_window_settings
 
     def render(self):
+        profiler = Profiler()
+        if profiler.enabled:
+            profiler.begin_frame()
+
+        # Notify Sensor nodes of sensor updates here, so their flows run on the render thread.
+        sensors.ComputerSystem().process_sensor_events()
+
         close_shortcut = imgui.Key.mod_ctrl | imgui.Key.q
         if self.data.in_edit_mode:
             close_shortcut = close_shortcut | imgui.Key.mod_shift
@@ -110,6 +120,8 @@ class SystemMonitorApp(windows.AppWindow):
             with imgui_ctx.begin_child("SystemDisplay", window_flags=window_flags):
                 system.render()
                 self._render_display_mode_context_menu()
+            if self.show_profiler:
+                self._render_profiler_window()
         elif self.selected_system is not None:
             imgui.text_colored(Colors.red, f"Invalid UISystem name '{self.selected_system}'\nOpen monitor in EDIT mode to select a system.")
         else:
@@ -133,6 +145,22 @@ class SystemMonitorApp(windows.AppWindow):
         if imgui.button("Restart"):
             self.restart()
 
+    def _render_profiler_window(self):
+        """Renders the Profiler as a floating window, for DISPLAY mode."""
+        imgui.set_next_window_size((500, 600), imgui.Cond_.first_use_ever)
+        expanded, self.show_profiler = imgui.begin("Profiler", self.show_profiler)
+        if expanded:
+            Profiler().render()
+        imgui.end()
+
+    def open_profiler(self):
+        """Opens the built-in Profiler window, which shows frame, widget render, action execute and sensor poll timings."""
+        if self.data.in_edit_mode:
+            if not any(isinstance(window, ProfilerWindow) for window in self.children):
+                self.add_child_window(ProfilerWindow())
+        else:
+            self.show_profiler = True
+
     def _render_display_mode_context_menu(self):
         menu_title = "MonitorDisplayModeMenu"
         if imgui.is_mouse_released(imgui.MouseButton_.right):
@@ -146,6 +174,9 @@ class SystemMonitorApp(windows.AppWindow):
             if imgui.menu_item_simple("Change to EDIT Mode"):
                 self.change_mode()
             imgui.set_item_tooltip(self.change_mode.__doc__)
+            if imgui.menu_item_simple("Profiler"):
+                self.open_profiler()
+            imgui.set_item_tooltip(self.open_profiler.__doc__)
             imgui.separator()
             imgui.text("Selected UISystem:")
             select_help = "Select the UISystem to display.\nThis changes the selected 'main' system as well."
@@ -330,6 +361,8 @@ class SystemMonitorApp(windows.AppWindow):
             self.change_mode()
         if imgui_utils.adv_button("Save", self.save_data.__doc__, in_menu=True):
             self.save_data()
+        if imgui_utils.adv_button("Profiler", self.open_profiler.__doc__, in_menu=True):
+            self.open_profiler()
         return super().render_app_menu_items()
 
     def save_data(self):
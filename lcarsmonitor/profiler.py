@@ -0,0 +1,460 @@
+import os
+import json
+import time
+import click
+import functools
+import threading
+import numpy as np
+import libasvat.command_utils as cmd_utils
+import libasvat.imgui.windows as windows
+from typing import Callable
+from imgui_bundle import imgui
+from libasvat.imgui.colors import Colors
+
+FRAME_HISTORY = 240
+"""Number of frames kept in the rolling frame-time graphs of the Profiler."""
+STATS_WINDOW = 1.0
+"""Time window (in seconds) of the call statistics shown by the Profiler. Statistics are reset after each window."""
+BACKGROUND_CATEGORIES = ("Update Thread", "Sensor Polls")
+"""Profiled categories that run on the ComputerSystem update thread, and thus aren't part of the frame-time graphs."""
+
+
+class ProfileStat:
+    """Call statistics of a single profiled item (such as a widget or action), in the current and last time windows."""
+
+    __slots__ = ("key", "calls", "total_ns", "self_ns", "max_ns", "last_calls", "last_total_ns", "last_self_ns", "last_max_ns")
+
+    def __init__(self, key: str):
+        self.key = key
+        """Name of the profiled item."""
+        self.calls = 0
+        self.total_ns = 0
+        self.self_ns = 0
+        self.max_ns = 0
+        self.last_calls = 0
+        """Number of calls in the last window."""
+        self.last_total_ns = 0
+        """Total time (in nanoseconds) of the calls in the last window, including nested profiled calls."""
+        self.last_self_ns = 0
+        """Total time (in nanoseconds) of the calls in the last window, excluding nested profiled calls."""
+        self.last_max_ns = 0
+        """Longest call (in nanoseconds) in the last window."""
+
+    def add(self, total_ns: int, self_ns: int):
+        """Adds a call, with its total and self times (in nanoseconds)."""
+        self.calls += 1
+        self.total_ns += total_ns
+        self.self_ns += self_ns
+        if total_ns > self.max_ns:
+            self.max_ns = total_ns
+
+    def roll(self):
+        """Ends the current window, moving its statistics to the ``last_*`` attributes."""
+        self.last_calls, self.last_total_ns, self.last_self_ns, self.last_max_ns = self.calls, self.total_ns, self.self_ns, self.max_ns
+        self.calls = self.total_ns = self.self_ns = self.max_ns = 0
+
+
+class ProfileCategory:
+    """A category of profiled items (such as all widgets), with the statistics of each item and the time per frame of the category."""
+
+    def __init__(self, name: str):
+        self.name = name
+        """Name of this category."""
+        self.stats: dict[str, ProfileStat] = {}
+        """Statistics of each item of this category, by key."""
+        self.frame_ns = 0
+        """Time (in nanoseconds) spent in this category in the current frame (outermost calls only)."""
+        self.history = np.zeros(FRAME_HISTORY, dtype=np.float32)
+        """Time (in milliseconds) spent in this category in each of the last frames (a ring buffer, see ``Profiler.frame_index``)."""
+        self.trace: TraceRecorder = None
+        """Trace being recorded, if any. Calls in this category are added to it as spans."""
+        self._stack: list[list] = []
+
+    def get_stat(self, key: str) -> ProfileStat:
+        """Gets the statistics of the given item, creating it if needed."""
+        stat = self.stats.get(key)
+        if stat is None:
+            stat = self.stats[key] = ProfileStat(key)
+        return stat
+
+    def hook(self, original: Callable, get_key: Callable[[object], str]):
+        """Creates the profiling hook of the given method, which times its calls in this category.
+
+        Calls nested in another call for the same object (such as ``super().render()``) aren't timed separately. Time spent in
+        nested calls of other objects in this category are discounted from the "self" time of the outer call.
+        If we have a ``trace``, each timed call is also added to it.
+
+        Args:
+            original (Callable): the method to time.
+            get_key (Callable[[object], str]): gets the key of the item being called, from its object.
+
+        Returns:
+            Callable: the hook, which should replace the original method.
+        """
+        stack = self._stack
+        perf_counter_ns = time.perf_counter_ns
+
+        @functools.wraps(original)
+        def profiled(obj, *args, **kwargs):
+            if len(stack) > 0 and stack[-1][0] is obj:
+                return original(obj, *args, **kwargs)
+            entry = [obj, 0]
+            stack.append(entry)
+            start = perf_counter_ns()
+            try:
+                return original(obj, *args, **kwargs)
+            finally:
+                elapsed = perf_counter_ns() - start
+                stack.pop()
+                if len(stack) > 0:
+                    stack[-1][1] += elapsed
+                else:
+                    self.frame_ns += elapsed
+                key = get_key(obj)
+                self.get_stat(key).add(elapsed, elapsed - entry[1])
+                trace = self.trace
+                if trace is not None:
+                    trace.add(key, self.name, start, elapsed)
+        profiled.__profiler_original__ = original
+        return profiled
+
+    def clear(self):
+        """Clears all statistics and history of this category."""
+        self.stats.clear()
+        self.frame_ns = 0
+        self.history[:] = 0
+        self._stack.clear()
+
+
+class TraceRecorder:
+    """Records timed spans, to save as a Chrome trace-event JSON file.
+
+    The saved trace can be opened in ``chrome://tracing`` or in the Perfetto UI (https://ui.perfetto.dev), showing the spans
+    of each thread in a timeline. Spans of the same thread are nested by their times.
+    """
+
+    def __init__(self, path: str, duration: float):
+        """
+        Args:
+            path (str): path of the trace file to save.
+            duration (float): time (in seconds) to record.
+        """
+        self.path = path
+        """Path of the trace file."""
+        self.duration = duration
+        """Time (in seconds) to record."""
+        self.start_ns = time.perf_counter_ns()
+        """Time (from ``time.perf_counter_ns()``) at which the recording started."""
+        self.events: list[tuple[str, str, int, int, int]] = []
+        """Recorded spans, as ``(name, category, thread_id, start_ns, duration_ns)`` tuples."""
+        self._thread_names: dict[int, str] = {}
+
+    @property
+    def elapsed(self):
+        """Time (in seconds) since the recording started."""
+        return (time.perf_counter_ns() - self.start_ns) / 1e9
+
+    @property
+    def is_finished(self):
+        """If the recording reached its duration."""
+        return self.elapsed >= self.duration
+
+    def add(self, name: str, category: str, start_ns: int, duration_ns: int):
+        """Adds a span of the calling thread. Can be called from any thread."""
+        thread_id = threading.get_ident()
+        if thread_id not in self._thread_names:
+            thread = threading.current_thread()
+            self._thread_names[thread_id] = "Render Thread" if thread is threading.main_thread() else thread.name
+        self.events.append((name, category, thread_id, start_ns, duration_ns))
+
+    def save(self):
+        """Saves the recorded spans to our trace file, as Chrome trace-event JSON."""
+        pid = os.getpid()
+        events = [{"name": "process_name", "ph": "M", "pid": pid, "args": {"name": "LCARSMonitor"}}]
+        for thread_id, thread_name in list(self._thread_names.items()):
+            events.append({"name": "thread_name", "ph": "M", "pid": pid, "tid": thread_id, "args": {"name": thread_name}})
+        for name, category, thread_id, start_ns, duration_ns in list(self.events):
+            events.append({"name": name, "cat": category, "ph": "X", "pid": pid, "tid": thread_id,
+                           "ts": (start_ns - self.start_ns) / 1000, "dur": duration_ns / 1000})
+        with open(self.path, "w") as file:
+            json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, file)
+        click.secho(f"Profiler: saved trace with {len(self.events)} spans to '{self.path}'.", fg="magenta")
+
+
+class Profiler(metaclass=cmd_utils.Singleton):
+    """Built-in profiler of the LCARSMonitor app.
+
+    Times the app's frames, broken down by category: processing of sensor events, ``UISystem.render()``, the ``render()`` of
+    each widget and the ``execute()`` of each action. The update thread's publishing of snapshots is also timed, while the poll
+    time of each hardware comes from the ComputerSystem's scheduler (see ``PollScheduler.get_timing()``).
+
+    Instrumentation is done by hooks that replace the profiled methods in their classes, using ``time.perf_counter_ns()``.
+    Hooks are only installed while the profiler is enabled, and the original methods are restored when it's disabled.
+    So a disabled profiler adds no overhead to the profiled calls: the only remaining cost is the app checking ``enabled``
+    once per frame.
+
+    The profiler can also record a trace for a few seconds (see ``start_trace()``), with spans of each frame, ``ActionFlow``
+    trigger cascade, widget render and hardware poll, in the thread they happened (render or update thread).
+    """
+
+    def __init__(self):
+        self.categories: dict[str, ProfileCategory] = {
+            name: ProfileCategory(name) for name in ("Sensor Events", "UISystems", "Widgets", "Action Flows", "Actions",
+                                                     "Update Thread", "Sensor Polls")
+        }
+        """Profiled categories, by name."""
+        self.frame_times = np.zeros(FRAME_HISTORY, dtype=np.float32)
+        """Duration (in milliseconds) of each of the last frames (a ring buffer, see ``self.frame_index``)."""
+        self.frame_index = 0
+        """Index of the oldest frame in our ring buffers (the next one to be overwritten)."""
+        self.trace_duration = 5.0
+        """Time (in seconds) to record traces started from our UI."""
+        self.last_trace_path: str = None
+        """Path of the last saved trace."""
+        self._trace: TraceRecorder = None
+        self._hooks: list[tuple[type, str, Callable]] = []
+        self._frame_start = 0
+        self._window_start = 0.0
+
+    @property
+    def enabled(self):
+        """If the profiler is enabled (its hooks are installed). [GET/SET]"""
+        return len(self._hooks) > 0
+
+    @enabled.setter
+    def enabled(self, value: bool):
+        if value and not self.enabled:
+            self._install_hooks()
+        elif not value and self.enabled:
+            self.stop_trace()
+            self._remove_hooks()
+
+    @property
+    def trace(self) -> TraceRecorder | None:
+        """The trace being recorded, if any."""
+        return self._trace
+
+    def start_trace(self, duration: float, path: str = None):
+        """Starts recording a trace, enabling the profiler if needed. The trace is saved when its duration is reached (checked
+        at the start of each frame) or when stopped (see ``stop_trace()``). If a trace is already being recorded, it's stopped.
+
+        Args:
+            duration (float): time (in seconds) to record.
+            path (str, optional): path of the trace file. Defaults to a timestamped file in the ComputerSystem's ``recordings_folder``.
+
+        Returns:
+            str: the path of the trace file.
+        """
+        from lcarsmonitor.sensors.sensors import ComputerSystem
+        from libasvat.data import DataCache
+        self.stop_trace()
+        self.enabled = True
+        if path is None:
+            folder = ComputerSystem().recordings_folder or os.path.dirname(DataCache().data_path)
+            path = os.path.join(folder, f"trace_{time.strftime('%Y%m%d_%H%M%S')}.json")
+        self._trace = TraceRecorder(path, duration)
+        for category in self.categories.values():
+            category.trace = self._trace
+        click.secho(f"Profiler: recording trace for {duration:.1f}s.", fg="magenta")
+        return path
+
+    def stop_trace(self):
+        """Stops recording the current trace (if any), saving it in a background thread."""
+        trace = self._trace
+        if trace is None:
+            return
+        self._trace = None
+        for category in self.categories.values():
+            category.trace = None
+        self.last_trace_path = trace.path
+        threading.Thread(target=trace.save, daemon=True).start()
+
+    def begin_frame(self):
+        """Marks the start of a new frame. Should be called by the app at the start of each frame, while we're enabled."""
+        now = time.perf_counter_ns()
+        trace = self._trace
+        if self._frame_start > 0:
+            if trace is not None:
+                trace.add("Frame", "Frame", self._frame_start, now - self._frame_start)
+            index = self.frame_index
+            self.frame_times[index] = (now - self._frame_start) / 1e6
+            for category in self.categories.values():
+                category.history[index] = category.frame_ns / 1e6
+                category.frame_ns = 0
+            self.frame_index = (index + 1) % FRAME_HISTORY
+        self._frame_start = now
+        if now / 1e9 - self._window_start >= STATS_WINDOW:
+            self._window_start = now / 1e9
+            for category in self.categories.values():
+                for stat in category.stats.values():
+                    stat.roll()
+        if trace is not None and trace.is_finished:
+            self.stop_trace()
+
+    def clear(self):
+        """Clears all profiled data."""
+        for category in self.categories.values():
+            category.clear()
+        self.frame_times[:] = 0
+        self.frame_index = 0
+        self._frame_start = 0
+
+    def _install_hooks(self):
+        """Installs our profiling hooks in all profiled classes."""
+        from lcarsmonitor.widgets.base import BaseWidget
+        from lcarsmonitor.actions.actions import Action, ActionFlow
+        from lcarsmonitor.system.system import UISystem
+        from lcarsmonitor.sensors.sensors import ComputerSystem
+        from lcarsmonitor.sensors.sensors_api import Hardware
+        self.clear()
+        categories = self.categories
+        self._hook(ComputerSystem, "process_sensor_events", categories["Sensor Events"], lambda obj: "ComputerSystem.process_sensor_events")
+        self._hook(UISystem, "render", categories["UISystems"], lambda obj: obj.name)
+        for cls in _get_all_subclasses(BaseWidget):
+            self._hook(cls, "render", categories["Widgets"], str)
+        self._hook(ActionFlow, "trigger", categories["Action Flows"], lambda obj: f"{obj.parent_node}: {obj.pin_name}")
+        for cls in _get_all_subclasses(Action):
+            self._hook(cls, "execute", categories["Actions"], lambda obj: type(obj).__name__)
+        self._hook(ComputerSystem, "_on_polled", categories["Update Thread"], lambda obj: "Publish Snapshot")
+        for cls in _get_all_subclasses(Hardware):
+            self._hook(cls, "poll", categories["Sensor Polls"], lambda obj: obj.full_name)
+
+    def _hook(self, cls: type, name: str, category: ProfileCategory, get_key: Callable[[object], str]):
+        """Replaces the method NAME of the given class by its profiling hook, if the class defines the method itself."""
+        original = cls.__dict__.get(name)
+        if original is None or not callable(original):
+            return
+        setattr(cls, name, category.hook(original, get_key))
+        self._hooks.append((cls, name, original))
+
+    def _remove_hooks(self):
+        """Restores the original methods replaced by our hooks."""
+        for cls, name, original in reversed(self._hooks):
+            setattr(cls, name, original)
+        self._hooks.clear()
+
+    def render(self):
+        """Renders the IMGUI contents of the profiler: controls, frame-time graphs and the statistics of each category."""
+        changed, enabled = imgui.checkbox("Enabled", self.enabled)
+        if changed:
+            self.enabled = enabled
+        imgui.set_item_tooltip("Installs the profiling hooks. While disabled, profiled calls have no overhead.")
+        imgui.same_line()
+        if imgui.button("Clear"):
+            self.clear()
+        imgui.same_line()
+        trace = self._trace
+        if trace is None:
+            if imgui.button("Record Trace"):
+                self.start_trace(self.trace_duration)
+            imgui.set_item_tooltip("Records a Chrome trace-event JSON file, with spans of each frame, action flow, widget render "
+                                   "and hardware poll, per thread. Open it in chrome://tracing or ui.perfetto.dev.")
+            imgui.same_line()
+            imgui.set_next_item_width(100)
+            _, self.trace_duration = imgui.input_float("Seconds", self.trace_duration)
+            self.trace_duration = max(0.1, self.trace_duration)
+        else:
+            if imgui.button("Stop Trace"):
+                self.stop_trace()
+            imgui.same_line()
+            imgui.text_colored(Colors.red, f"Recording trace: {max(0.0, trace.duration - trace.elapsed):.1f}s left")
+        if self.last_trace_path:
+            imgui.text_wrapped(f"Last trace: {self.last_trace_path}")
+        if not self.enabled:
+            imgui.text_wrapped("Profiler is disabled.")
+            return
+
+        offset = self.frame_index
+        frame_time = self.frame_times[(offset - 1) % FRAME_HISTORY]
+        width = imgui.get_content_region_avail().x
+        imgui.plot_lines("##Frame", self.frame_times, values_offset=offset, overlay_text=f"Frame: {frame_time:.2f}ms",
+                         scale_min=0, graph_size=(width, 80))
+        for category in self.categories.values():
+            if category.name in BACKGROUND_CATEGORIES:
+                continue
+            last = category.history[(offset - 1) % FRAME_HISTORY]
+            imgui.plot_lines(f"##{category.name}", category.history, values_offset=offset,
+                             overlay_text=f"{category.name}: {last:.2f}ms", scale_min=0, graph_size=(width, 40))
+
+        for category in self.categories.values():
+            if imgui.collapsing_header(category.name):
+                self._render_stats_table(category)
+        if imgui.collapsing_header("Poll Timing per Source"):
+            self._render_hardware_table()
+
+    def _render_stats_table(self, category: ProfileCategory):
+        """Renders the IMGUI table with the call statistics (in the last window) of the items of the given category."""
+        flags = imgui.TableFlags_.row_bg | imgui.TableFlags_.borders | imgui.TableFlags_.sizing_fixed_fit
+        if not imgui.begin_table(f"Profile{category.name}", 6, flags):
+            return
+        for header in ("Name", "Calls/s", "Total (ms/s)", "Self (ms/s)", "Avg (ms)", "Max (ms)"):
+            imgui.table_setup_column(header)
+        imgui.table_headers_row()
+        stats = sorted(category.stats.values(), key=lambda stat: stat.last_self_ns, reverse=True)
+        scale = 1.0 / (1e6 * STATS_WINDOW)
+        for stat in stats:
+            if stat.last_calls <= 0:
+                continue
+            imgui.table_next_row()
+            imgui.table_next_column()
+            imgui.text(stat.key)
+            values = (f"{stat.last_calls / STATS_WINDOW:.0f}", f"{stat.last_total_ns * scale:.2f}", f"{stat.last_self_ns * scale:.2f}",
+                      f"{stat.last_total_ns / stat.last_calls / 1e6:.3f}", f"{stat.last_max_ns / 1e6:.3f}")
+            for value in values:
+                imgui.table_next_column()
+                imgui.text(value)
+        imgui.end_table()
+
+    def _render_hardware_table(self):
+        """Renders the IMGUI table with the poll times of each sensor source and its hardware, from the ComputerSystem's scheduler."""
+        from lcarsmonitor.sensors.sensors import ComputerSystem
+        computer = ComputerSystem()
+        scheduler = computer.scheduler
+        flags = imgui.TableFlags_.row_bg | imgui.TableFlags_.borders | imgui.TableFlags_.sizing_fixed_fit
+        if not imgui.begin_table("ProfileHardware", 5, flags):
+            return
+        for header in ("Source/Hardware", "Polls", "Last (ms)", "Avg (ms)", "P95 (ms)"):
+            imgui.table_setup_column(header)
+        imgui.table_headers_row()
+        for source in computer.sources:
+            hardware = [hw for root_hw in source.get_all_hardware() for hw in root_hw.get_all_hardware()]
+            timings = [(hw, scheduler.get_timing(hw)) for hw in hardware]
+            timings = [(hw, timing) for hw, timing in timings if timing.count > 0]
+            imgui.table_next_row()
+            imgui.table_next_column()
+            imgui.text_colored(Colors.yellow, source.pretty_name)
+            imgui.table_next_column()
+            imgui.text(str(sum(timing.count for _, timing in timings)))
+            imgui.table_next_column()
+            imgui.text(f"{sum(timing.last for _, timing in timings) * 1000:.2f}")
+            imgui.table_next_column()
+            imgui.text(f"{sum(timing.stats.mean for _, timing in timings) * 1000:.2f}")
+            imgui.table_next_column()
+            for hw, timing in timings:
+                imgui.table_next_row()
+                imgui.table_next_column()
+                imgui.text(f"  {hw.full_name}")
+                for value in (str(timing.count), f"{timing.last * 1000:.2f}", f"{timing.stats.mean * 1000:.2f}",
+                              f"{timing.p95.value * 1000:.2f}"):
+                    imgui.table_next_column()
+                    imgui.text(value)
+        imgui.end_table()
+
+
+class ProfilerWindow(windows.BasicWindow):
+    """Sub-window of the Monitor App showing the built-in Profiler (see ``Profiler``)."""
+
+    def __init__(self):
+        super().__init__("Profiler")
+        self.user_closable = True
+
+    def render(self):
+        Profiler().render()
+
+
+def _get_all_subclasses(cls: type) -> list[type]:
+    """Gets the given class and all of its subclasses, recursively."""
+    classes = [cls]
+    for subclass in cls.__subclasses__():
+        classes.extend(subclass for subclass in _get_all_subclasses(subclass) if subclass not in classes)
+    return classes
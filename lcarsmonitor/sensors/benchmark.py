@@ -0,0 +1,182 @@
+import os
+import sys
+import time
+import click
+import platform
+import tracemalloc
+from libasvat.data import DataCache
+from lcarsmonitor.sensors.sensors import ComputerSystem
+from lcarsmonitor.sensors.sources.synthetic_impl import SyntheticSensors
+from lcarsmonitor.sensors.sources.proc_impl import PROC_HARDWARE_CLASSES, ProcFile
+
+DEFAULT_BENCHMARK_SIZES = (100, 1000, 10000)
+"""Default amounts of sensors benchmarked by ``run_sensor_benchmarks()``."""
+BENCHMARK_SENSORS_PER_HARDWARE = 25
+"""Sensors per hardware of the synthetic sources used in benchmarks. Each root hardware also has one sub-hardware."""
+_SYNTHETIC_SETTINGS = ("sensors_per_hardware", "sub_hardware_count", "sub_hardware_depth", "hardware_count", "generator")
+"""Settings of the SyntheticSensors source changed by benchmarks, and restored afterwards."""
+
+
+def _time_calls(func, repeats: int):
+    """Calls FUNC REPEATS times, returning the average time (in seconds) per call."""
+    start = time.perf_counter()
+    for _ in range(repeats):
+        func()
+    return (time.perf_counter() - start) / repeats
+
+
+def benchmark_sensor_pipeline(num_sensors: int, repeats: int = 20, generator: str = "sine") -> dict:
+    """Benchmarks the sensor pipeline of the ComputerSystem with the given amount of synthetic sensors.
+
+    The ComputerSystem is opened with a ``SyntheticSensors`` source of about NUM_SENSORS sensors (with its async update thread
+    stopped, so updates are only done here), and closed at the end. So this shouldn't be used while the ComputerSystem is in use
+    by the GUI. The previously selected source, and the settings of the synthetic source, are restored afterwards.
+
+    Measures:
+    * ``open_ms``: time to open the ComputerSystem (initializing the source, indexing sensors, creating histories, first snapshot).
+    * ``memory_per_sensor``: memory (in bytes) allocated by opening the ComputerSystem, per sensor. Includes each sensor's history.
+    * ``update_ms``: average time of a ``ComputerSystem.update()`` polling all hardware (building and publishing the snapshot,
+      and recording histories), and the derived ``updates_per_second`` and ``sensors_per_second``.
+    * ``idle_update_ms``: average time of a ``ComputerSystem.update()`` with demand-driven polling and no subscribed sensors.
+    * ``sensor_update_us``: average time to notify a single Sensor node of an update (detecting the change on the update thread,
+      and processing the event with ``ComputerSystem.process_sensor_events()``), with a Sensor node for every sensor.
+      ``notified_per_update`` is the average number of sensors notified per update, after change detection.
+
+    Args:
+        num_sensors (int): approximate amount of sensors to benchmark with.
+        repeats (int, optional): number of calls averaged for each timing. Defaults to 20.
+        generator (str, optional): value generator of the synthetic sensors. Defaults to "sine".
+
+    Returns:
+        dict: the results, as a JSON-serializable dict.
+    """
+    from lcarsmonitor.sensors.sensor_node import Sensor
+    computer = ComputerSystem()
+    source: SyntheticSensors = computer.get_source(SyntheticSensors.__name__)
+    previous_source = computer.selected_source
+    previous_poll_unused = computer.poll_unused_hardware
+    previous_settings = {name: getattr(source, name) for name in _SYNTHETIC_SETTINGS}
+    if computer.is_active:
+        computer.close()
+    source.sensors_per_hardware = BENCHMARK_SENSORS_PER_HARDWARE
+    source.sub_hardware_count = 1
+    source.sub_hardware_depth = 1
+    source.hardware_count = hardware_count = max(1, round(num_sensors / (2 * BENCHMARK_SENSORS_PER_HARDWARE)))
+    source.generator = generator
+    computer.selected_source = SyntheticSensors.__name__
+
+    try:
+        tracemalloc.start()
+        base_memory = tracemalloc.get_traced_memory()[0]
+        start = time.perf_counter()
+        computer.open()
+        open_time = time.perf_counter() - start
+        computer.stop_async_update()
+        memory = tracemalloc.get_traced_memory()[0] - base_memory
+        tracemalloc.stop()
+        total_sensors = len(computer.all_sensors)
+
+        computer.poll_unused_hardware = True
+        computer.update()  # warm-up
+        update_time = _time_calls(computer.update, repeats)
+        computer.poll_unused_hardware = False
+        idle_update_time = _time_calls(computer.update, repeats)
+
+        sensors: list[Sensor] = [isensor.create() for isensor in computer.all_sensors.values()]
+        computer.process_sensor_events()
+        # Time updates along with processing their events, and take the cost of the updates alone out of it.
+        update_time_with_nodes = 0.0
+        events = 0
+        for _ in range(repeats):
+            start = time.perf_counter()
+            computer.update()
+            events += computer.process_sensor_events()
+            update_time_with_nodes += time.perf_counter() - start
+        sensor_update_time = max(0.0, update_time_with_nodes - update_time * repeats) / max(1, events)
+        for sensor in sensors:
+            sensor.delete()
+    finally:
+        tracemalloc.stop()  # in case opening failed
+        if computer.is_active:
+            computer.close()
+        computer.poll_unused_hardware = previous_poll_unused
+        computer.selected_source = previous_source
+        for name, value in previous_settings.items():
+            setattr(source, name, value)
+
+    return {
+        "sensors": total_sensors,
+        "hardware": hardware_count * 2,
+        "generator": generator,
+        "repeats": repeats,
+        "open_ms": open_time * 1000,
+        "memory_per_sensor": memory / max(1, total_sensors),
+        "update_ms": update_time * 1000,
+        "updates_per_second": 1.0 / update_time if update_time > 0 else None,
+        "sensors_per_second": total_sensors / update_time if update_time > 0 else None,
+        "idle_update_ms": idle_update_time * 1000,
+        "sensor_update_us": sensor_update_time * 1e6,
+        "notified_per_update": events / max(1, repeats),
+    }
+
+
+def benchmark_procfs_parsing(procfs_path: str = "/proc", repeats: int = 1000) -> dict:
+    """Benchmarks the parsing of the procfs files read by the ``ProcSensors`` source.
+
+    Each file is read once from PROCFS_PATH (which may also be a folder of recorded procfs files), and its hardware is created
+    from these contents. Then the same contents are parsed repeatedly with ``ProcHardware.parse()``, so only the parsing (and
+    computing of values) is measured, not the reading of the file. Files that can't be read or parsed are skipped.
+
+    Args:
+        procfs_path (str, optional): path to the procfs root folder. Defaults to "/proc".
+        repeats (int, optional): number of calls averaged for each timing. Defaults to 1000.
+
+    Returns:
+        dict: the results by procfs file, as a JSON-serializable dict with the file ``bytes``, number of ``sensors`` and the
+        average time to parse it (``parse_us``).
+    """
+    results = {}
+    for hw_class in PROC_HARDWARE_CLASSES:
+        try:
+            file = ProcFile(os.path.join(procfs_path, hw_class.FILENAME))
+            try:
+                data = file.read()
+            finally:
+                file.close()
+            hw = hw_class(data)
+        except (OSError, ValueError, IndexError):
+            continue
+        parse_time = _time_calls(lambda: hw.parse(data, time.perf_counter()), repeats)
+        results[hw_class.FILENAME] = {
+            "bytes": len(data),
+            "sensors": len(hw.isensors),
+            "parse_us": parse_time * 1e6,
+        }
+    return results
+
+
+def run_sensor_benchmarks(sizes: list[int] = DEFAULT_BENCHMARK_SIZES, repeats: int = 20, generator: str = "sine") -> dict:
+    """Runs ``benchmark_sensor_pipeline()`` for each of the given amounts of sensors.
+
+    Saving of the DataCache is disabled while benchmarking, so the temporary source settings aren't persisted.
+    The parsing of the local procfs files is also benchmarked (see ``benchmark_procfs_parsing()``), if they're available.
+
+    Returns:
+        dict: the results, as a JSON-serializable dict with some information about the environment and the list of results.
+    """
+    cache = DataCache()
+    cache.set_saving_enabled(False)
+    results = []
+    for size in sizes:
+        click.secho(f"[Benchmark] Sensor pipeline with {size} sensors...", fg="blue", err=True)
+        results.append(benchmark_sensor_pipeline(size, repeats, generator))
+    click.secho("[Benchmark] Parsing of procfs files...", fg="blue", err=True)
+    procfs_results = benchmark_procfs_parsing()
+    return {
+        "benchmark": "sensor_pipeline",
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": sys.version.split()[0],
+        "platform": platform.platform(),
+        "results": results,
+        "procfs_parsing": procfs_results,
+    }
@@ -0,0 +1,278 @@
+import math
+from collections import OrderedDict
+from libasvat.imgui.math import Vector2
+from lcarsmonitor.sensors.sensors_api import SensorID, HardwareType, SensorType, SensorUnit, Hardware, InternalSensor
+
+
+def build_catalog(source_name: str, hardware: list[Hardware]) -> dict:
+    """Builds a catalog of the given hardware and their sensors, as a JSON-serializable dict.
+
+    The catalog describes the hardware tree and the identification of each sensor (ID, name, type, unit and limits), but no values.
+    It's used by features that expose sensors outside of their original SensorSource (such as the sensor daemon or recordings),
+    where sensors are recreated from their catalog with ``CatalogHardware`` and ``CatalogSensor`` objects.
+
+    Sensors are numbered by "rows", in the order of the given hardware and their sensors: the sensors of each hardware are the
+    consecutive rows starting at the hardware's ``start`` row.
+
+    Args:
+        source_name (str): name of the source of these sensors.
+        hardware (list[Hardware]): all hardware to include, including sub-hardware. Parents should come before their children
+            (such as the order of ``Hardware.get_all_hardware()``).
+
+    Returns:
+        dict: the catalog, as ``{"source": source_name, "hardware": [hardware records]}``.
+    """
+    hw_indexes = {id(hw): index for index, hw in enumerate(hardware)}
+    records = []
+    start = 0
+    for hw in hardware:
+        isensors = hw.isensors
+        sensors = []
+        for isensor in isensors:
+            limits = isensor.limits
+            sensors.append({
+                "id": str(isensor.id),
+                "name": isensor.name,
+                "type": str(isensor.type),
+                "unit": isensor.unit.id,
+                "limits": None if limits is None else [limits.x, limits.y],
+            })
+        records.append({
+            "id": hw.id,
+            "name": hw.name,
+            "type": str(hw.type),
+            "parent": hw_indexes.get(id(hw.parent), -1),
+            "start": start,
+            "sensors": sensors,
+        })
+        start += len(isensors)
+    return {"source": source_name, "hardware": records}
+
+
+def get_catalog_isensors(hardware: list[Hardware]) -> list[InternalSensor]:
+    """Gets the InternalSensors of the given hardware, ordered by their row in a catalog built with ``build_catalog()``."""
+    return [isensor for hw in hardware for isensor in hw.isensors]
+
+
+class CatalogHardware(Hardware):
+    """A hardware recreated from a catalog record (see ``build_catalog()``).
+
+    Subclasses should override ``poll()`` to update their sensors' data from wherever the actual values are.
+    """
+
+    SENSOR_CLASS: type['CatalogSensor'] = None
+    """Class of the sensors created by this hardware. Defaults to ``CatalogSensor``."""
+
+    def __init__(self, index: int, record: dict, parent: 'CatalogHardware' = None):
+        super().__init__(parent, [], [])
+        self.index = index
+        """Index of this hardware in the catalog."""
+        self.start: int = record["start"]
+        """Row of our first sensor in the catalog."""
+        self._id: str = record["id"]
+        self._name: str = record["name"]
+        self._type = HardwareType.from_obj(record["type"])
+        sensor_class = self.SENSOR_CLASS or CatalogSensor
+        self._isensors.extend(sensor_class(self, self.start + slot, sensor) for slot, sensor in enumerate(record["sensors"]))
+
+    @property
+    def id(self):
+        return self._id
+
+    @property
+    def name(self):
+        return self._name
+
+    @property
+    def type(self):
+        return self._type
+
+    @classmethod
+    def build_tree(cls, catalog: dict, *args):
+        """Recreates the hardware tree of the given catalog, with this class.
+
+        Args:
+            catalog (dict): the catalog, from ``build_catalog()``.
+            *args: additional arguments passed to our constructor, before the default arguments.
+
+        Returns:
+            tuple[list[CatalogHardware], list[CatalogHardware]]: a ``(root_hardware, all_hardware)`` tuple. The list of
+            all hardware is in catalog order.
+        """
+        roots: list[CatalogHardware] = []
+        all_hardware: list[CatalogHardware] = []
+        for index, record in enumerate(catalog["hardware"]):
+            parent = all_hardware[record["parent"]] if record["parent"] >= 0 else None
+            hw = cls(*args, index, record, parent)
+            all_hardware.append(hw)
+            if parent is not None:
+                parent._children.append(hw)
+            else:
+                roots.append(hw)
+        return roots, all_hardware
+
+
+class CatalogSensor(InternalSensor):
+    """A sensor recreated from a catalog record (see ``build_catalog()``). Its data is set by its parent CatalogHardware."""
+
+    def __init__(self, parent_hw: CatalogHardware, row: int, record: dict):
+        super().__init__(parent_hw)
+        self.row = row
+        """Row of this sensor in the catalog."""
+        self._id = SensorID(record["id"])
+        self._name: str = record["name"]
+        self._type = SensorType.from_obj(record["type"])
+        self._unit = next((unit for unit in SensorUnit if unit.id == record["unit"]), SensorUnit.from_type(self._type))
+        limits = record.get("limits")
+        self._limits: Vector2 = None if limits is None else Vector2(*limits)
+        self._value: float = None
+        self._value_range = Vector2(math.inf, -math.inf)
+
+    @property
+    def id(self):
+        return self._id
+
+    @property
+    def name(self):
+        return self._name
+
+    @property
+    def type(self):
+        return self._type
+
+    @property
+    def limits(self):
+        return self._limits
+
+    @property
+    def value(self):
+        return self._value
+
+    @property
+    def value_range(self):
+        return self._value_range
+
+    def set_value(self, value: float):
+        """Sets our current value (NaN for no value), updating our recorded min/max values."""
+        if math.isnan(value):
+            self._value = None
+            return
+        self._value = value
+        value_range = self._value_range
+        if value < value_range.x or value > value_range.y:
+            self._value_range = Vector2(min(value, value_range.x), max(value, value_range.y))
+
+    def set_data(self, value: float, minimum: float, maximum: float, low_limit: float, high_limit: float):
+        """Sets all our data at once (NaN for no value/limits)."""
+        self._value = None if math.isnan(value) else value
+        self._value_range = Vector2(minimum, maximum)
+        self._limits = None if math.isnan(low_limit) or math.isnan(high_limit) else Vector2(low_limit, high_limit)
+
+
+class SensorFilterResult:
+    """Result of filtering a SensorCatalogIndex: which sensors matched, and which hardware contain them."""
+
+    __slots__ = ("rows", "matches", "visible_hardware")
+
+    def __init__(self, rows: list[int], matches: set[InternalSensor], visible_hardware: set[Hardware]):
+        self.rows = rows
+        """Index rows of the matched sensors."""
+        self.matches = matches
+        """The InternalSensors that matched the filter."""
+        self.visible_hardware = visible_hardware
+        """The hardware that contain (directly or through sub-hardware) at least one matched sensor."""
+
+
+class SensorCatalogIndex:
+    """Prebuilt index of a hardware tree, for quickly filtering its sensors by name.
+
+    Besides caching the hardware tree (so its traversal doesn't copy the ``children``/``isensors`` lists of each hardware),
+    this keeps the lowercase name of each sensor and an index of their trigrams (all 3-character substrings). Filtering by a text
+    only checks the names of the sensors that have all trigrams of the text. Filter results are cached by text, so filtering
+    again with the same text is free, and extending the last text only checks the sensors that matched it.
+
+    The index is immutable: if the hardware tree changes (such as when the ComputerSystem is re-opened), a new index should be built.
+    """
+
+    def __init__(self, roots: list[Hardware], max_cached_filters: int = 32):
+        self.roots: tuple[Hardware] = tuple(roots)
+        """The root hardware of the indexed tree."""
+        self.children: dict[Hardware, tuple[Hardware]] = {}
+        """Sub-hardware of each hardware in the tree."""
+        self.isensors: dict[Hardware, tuple[InternalSensor]] = {}
+        """InternalSensors of each hardware in the tree."""
+        self._all_isensors: list[InternalSensor] = []
+        self._names: list[str] = []
+        self._trigrams: dict[str, set[int]] = {}
+        self._max_cached_filters = max_cached_filters
+        self._cache: OrderedDict[str, SensorFilterResult] = OrderedDict()
+        self._last_text: str = None
+        for root in self.roots:
+            for hw in root.get_all_hardware():
+                self.children[hw] = tuple(hw.children)
+                self.isensors[hw] = tuple(hw.isensors)
+                for isensor in self.isensors[hw]:
+                    self._add_isensor(isensor)
+        self._all_result = self._build_result(list(range(len(self._all_isensors))))
+
+    def _add_isensor(self, isensor: InternalSensor):
+        """Adds the given sensor to our name and trigram indexes."""
+        row = len(self._all_isensors)
+        name = isensor.name.lower()
+        self._all_isensors.append(isensor)
+        self._names.append(name)
+        for start in range(len(name) - 2):
+            self._trigrams.setdefault(name[start:start + 3], set()).add(row)
+
+    def _build_result(self, rows: list[int]):
+        """Builds the filter result with the sensors of the given rows, finding the hardware that contain them."""
+        matches = {self._all_isensors[row] for row in rows}
+        visible: set[Hardware] = set()
+        for isensor in matches:
+            hw = isensor.parent
+            while hw is not None and hw not in visible:
+                visible.add(hw)
+                hw = hw.parent
+        return SensorFilterResult(rows, matches, visible)
+
+    def _find_rows(self, text: str) -> list[int]:
+        """Finds the rows of all sensors whose name contains the given (lowercase) text."""
+        if self._last_text is not None and self._last_text in text and self._last_text in self._cache:
+            # The text extends the last filter, so only the sensors that matched it can match the new text.
+            candidates = self._cache[self._last_text].rows
+        elif len(text) >= 3:
+            trigram_sets = []
+            for start in range(len(text) - 2):
+                rows = self._trigrams.get(text[start:start + 3])
+                if rows is None:
+                    return []
+                trigram_sets.append(rows)
+            trigram_sets.sort(key=len)
+            candidates = set.intersection(*trigram_sets)
+        else:
+            candidates = range(len(self._names))
+        names = self._names
+        return [row for row in candidates if text in names[row]]
+
+    def filter(self, text: str = None) -> SensorFilterResult:
+        """Gets the sensors whose name contains the given text (case-insensitive), and the hardware that contain them.
+
+        Args:
+            text (str, optional): text to filter by. If None or empty, all sensors match.
+
+        Returns:
+            SensorFilterResult: the filter result. Results are cached, so the same object is returned for the same text.
+        """
+        if not text:
+            return self._all_result
+        text = text.lower()
+        result = self._cache.get(text)
+        if result is not None:
+            self._cache.move_to_end(text)
+            return result
+        result = self._build_result(self._find_rows(text))
+        self._cache[text] = result
+        self._last_text = text
+        if len(self._cache) > self._max_cached_filters:
+            self._cache.popitem(last=False)
+        return result
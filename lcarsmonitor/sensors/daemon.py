@@ -0,0 +1,321 @@
+import math
+import json
+import time
+import click
+import struct
+from multiprocessing import shared_memory, resource_tracker
+from lcarsmonitor.sensors.sensors_api import SensorSource, Hardware, InternalSensor
+from lcarsmonitor.sensors.catalog import build_catalog
+
+DEFAULT_SHARED_MEMORY_NAME = "lcarsmonitor_sensord"
+"""Default name of the shared memory table published by the sensor daemon."""
+SENSOR_FIELDS = 5
+"""Number of float64 fields of each sensor row in a SharedSensorTable: value, minimum, maximum, low-limit and high-limit."""
+STALE_TIMEOUT = 5.0
+"""Time (in seconds) without updates to its SharedSensorTable after which a sensor daemon is considered not running."""
+
+
+class DaemonRunningError(RuntimeError):
+    """Error raised when trying to start a sensor daemon with the same shared memory name as a daemon that is already running."""
+
+
+def open_shared_memory(name: str, create: bool = False, size: int = 0):
+    """Opens the shared memory block with the given name.
+
+    When attaching to an existing block (CREATE is False), the block is unregistered from python's resource tracker, which otherwise
+    would unlink the block (that belongs to another process) when this process exits.
+
+    When creating a block and one with the same name already exists (such as left over by a crashed daemon), it's replaced.
+    So callers should check the existing block isn't in use before creating it (see ``SharedSensorTable.check_not_running()``).
+    """
+    if not create:
+        shm = shared_memory.SharedMemory(name)
+        try:
+            resource_tracker.unregister(shm._name, "shared_memory")
+        except Exception:
+            pass
+        return shm
+    try:
+        return shared_memory.SharedMemory(name, create=True, size=size)
+    except FileExistsError:
+        old = shared_memory.SharedMemory(name)
+        old.close()
+        old.unlink()
+        return shared_memory.SharedMemory(name, create=True, size=size)
+
+
+class SharedSensorTable:
+    """Table of sensor values in shared memory, written by the sensor daemon and read by any number of proxy sources.
+
+    The table has a fixed-size header, followed by a row of ``SENSOR_FIELDS`` float64 values for each sensor, and then a float64
+    "demand" timestamp for each hardware. Missing values are stored as NaN.
+
+    Consistency between the writer and readers is kept with a seqlock: the writer increments the header's sequence counter before
+    and after writing values (so it's odd while writing), and readers retry any read during which the counter was odd or changed.
+    Readers never block the writer.
+
+    The demand timestamps are the other way around: readers write the time (``time.time()``) they last needed the data of a hardware,
+    and the daemon only polls hardware that were recently demanded. Concurrent readers may overwrite each other's timestamps, which
+    is harmless since they're all recent.
+
+    The sensor catalog (IDs, names, types, units of hardware and sensors) is published once, as JSON, in a second shared memory block
+    (see ``write_catalog()`` and ``read_catalog()``).
+    """
+
+    HEADER = struct.Struct("<8sQQdII")
+    """Header layout: magic, sequence counter, generation, heartbeat time, number of sensors, number of hardware."""
+    MAGIC = b"LCARSSHM"
+
+    def __init__(self, shm: shared_memory.SharedMemory, owner: bool):
+        self.shm = shm
+        """The shared memory block of this table."""
+        self.owner = owner
+        """If this table was created by this process (the daemon), which will unlink it on close."""
+        magic, _, _, _, self.sensor_count, self.hardware_count = self.HEADER.unpack_from(shm.buf, 0)
+        if magic != self.MAGIC:
+            raise ValueError(f"Shared memory '{shm.name}' isn't a sensor table")
+        self._header = shm.buf[8:24].cast("Q")  # sequence and generation
+        self._heartbeat = shm.buf[24:32].cast("d")
+        values_start = self.HEADER.size
+        values_end = values_start + 8 * SENSOR_FIELDS * self.sensor_count
+        self._raw_values = shm.buf[values_start:values_end]
+        self.values = self._raw_values.cast("d")
+        """Sensor rows, as a flat float64 view. Writers should use ``begin_write()``/``end_write()`` and readers ``read_rows()``."""
+        self.demand = shm.buf[values_end:values_end + 8 * self.hardware_count].cast("d")
+        """Time (``time.time()``) that each hardware was last demanded by a reader, by hardware index."""
+
+    @classmethod
+    def create(cls, name: str, sensor_count: int, hardware_count: int):
+        """Creates a new table in shared memory with the given name and size. Used by the daemon.
+
+        A stale table with the same name (left over by a crashed daemon) is replaced.
+
+        Raises:
+            DaemonRunningError: if a table with the same name is still being updated by a running daemon.
+        """
+        cls.check_not_running(name)
+        size = cls.HEADER.size + 8 * (SENSOR_FIELDS * sensor_count + hardware_count)
+        shm = open_shared_memory(name, True, size)
+        cls.HEADER.pack_into(shm.buf, 0, cls.MAGIC, 0, 0, time.time(), sensor_count, hardware_count)
+        table = cls(shm, True)
+        for index in range(len(table.values)):
+            table.values[index] = math.nan
+        return table
+
+    @classmethod
+    def attach(cls, name: str):
+        """Attaches to the existing table in shared memory with the given name. Used by the proxy sources."""
+        return cls(open_shared_memory(name), False)
+
+    @classmethod
+    def check_not_running(cls, name: str):
+        """Checks that no running daemon is publishing a table with the given name in shared memory.
+
+        Raises:
+            DaemonRunningError: if a table with this name exists and was updated in the last ``STALE_TIMEOUT`` seconds.
+        """
+        try:
+            table = cls.attach(name)
+        except (FileNotFoundError, ValueError):
+            return
+        try:
+            is_running = table.is_running
+        finally:
+            table.close()
+        if is_running:
+            raise DaemonRunningError(f"A sensor daemon is already running at '{name}'")
+
+    @property
+    def sequence(self) -> int:
+        """Current sequence counter of the seqlock. Odd while the writer is writing."""
+        return self._header[0]
+
+    @property
+    def generation(self) -> int:
+        """Number of times the daemon wrote to this table."""
+        return self._header[1]
+
+    @property
+    def heartbeat(self) -> float:
+        """Time (``time.time()``) of the daemon's last update of this table."""
+        return self._heartbeat[0]
+
+    @property
+    def is_running(self) -> bool:
+        """If the daemon writing this table is running: if it updated the table in the last ``STALE_TIMEOUT`` seconds."""
+        return time.time() - self.heartbeat <= STALE_TIMEOUT
+
+    def begin_write(self):
+        """Marks the start of a write to the table's values."""
+        self._header[0] += 1
+
+    def end_write(self):
+        """Marks the end of a write to the table's values, updating the generation and heartbeat."""
+        self._header[1] += 1
+        self._heartbeat[0] = time.time()
+        self._header[0] += 1
+
+    def write_sensor(self, index: int, isensor: InternalSensor):
+        """Writes the current data of the given InternalSensor to its row (INDEX). Should be called between begin/end_write."""
+        values = self.values
+        row = index * SENSOR_FIELDS
+        value = isensor.value
+        values[row] = math.nan if value is None else value
+        value_range = isensor.value_range
+        values[row + 1] = value_range.x
+        values[row + 2] = value_range.y
+        limits = isensor.limits
+        values[row + 3] = math.nan if limits is None else limits.x
+        values[row + 4] = math.nan if limits is None else limits.y
+
+    def read_rows(self, start: int, out: memoryview, max_attempts: int = 100):
+        """Copies consistent sensor rows into the given buffer, using the seqlock.
+
+        Args:
+            start (int): index of the first sensor row to read.
+            out (memoryview): byte-view of a preallocated buffer (such as an ``array('d')``) to copy rows into. Its size
+                defines the number of rows read.
+            max_attempts (int, optional): maximum number of reads to try while the writer is writing. Defaults to 100.
+
+        Returns:
+            bool: if the rows were read consistently. The buffer contents are undefined if not.
+        """
+        offset = 8 * SENSOR_FIELDS * start
+        with self._raw_values[offset:offset + len(out)] as source:
+            for _ in range(max_attempts):
+                sequence = self._header[0]
+                if sequence & 1:
+                    time.sleep(0)
+                    continue
+                out[:] = source
+                if self._header[0] == sequence:
+                    return True
+        return False
+
+    def close(self):
+        """Closes this table, unlinking its shared memory if we're the owner."""
+        for view in (self._header, self._heartbeat, self.values, self._raw_values, self.demand):
+            view.release()
+        self.shm.close()
+        if self.owner:
+            self.shm.unlink()
+
+
+def write_catalog(name: str, source: SensorSource, hardware: list[Hardware]):
+    """Publishes the sensor catalog of the given source to a new shared memory block with the given name.
+
+    The catalog (see ``build_catalog()``) is JSON, prefixed by its length (uint64). Catalog rows are the rows of the SharedSensorTable.
+
+    Returns:
+        SharedMemory: the catalog's shared memory block. The caller owns it, and should unlink it when done.
+    """
+    data = json.dumps(build_catalog(source.pretty_name, hardware)).encode()
+    shm = open_shared_memory(name, True, 8 + len(data))
+    struct.pack_into("<Q", shm.buf, 0, len(data))
+    shm.buf[8:8 + len(data)] = data
+    return shm
+
+
+def read_catalog(name: str) -> dict:
+    """Reads the sensor catalog published by ``write_catalog()`` in the shared memory block with the given name."""
+    shm = open_shared_memory(name)
+    try:
+        size, = struct.unpack_from("<Q", shm.buf, 0)
+        return json.loads(bytes(shm.buf[8:8 + size]))
+    finally:
+        shm.close()
+
+
+class SensorDaemon:
+    """Runs a SensorSource, publishing its sensors in shared memory for other processes.
+
+    The catalog of the source's sensors is published once (see ``write_catalog()``), and then the daemon periodically polls the
+    source's hardware, writing the values of all polled sensors to a ``SharedSensorTable``. The ``DaemonSensors`` source (in the
+    GUI processes) reads these values, exposing the same Hardware/InternalSensor API as the original source.
+
+    Only hardware recently demanded by some reader are polled, unless ``poll_all`` is set. So, as in the GUI process, only
+    hardware actually used by Sensor nodes are polled.
+    """
+
+    def __init__(self, source: SensorSource, name: str = DEFAULT_SHARED_MEMORY_NAME, rate: float = 10.0, poll_all: bool = False,
+                 demand_timeout: float = 10.0):
+        self.source = source
+        """The SensorSource being run."""
+        self.name = name
+        """Name of our shared memory table. The catalog block is named ``<name>_catalog``."""
+        self.rate = rate
+        """Amount of polls per second. Readers consider the daemon stopped after ``STALE_TIMEOUT`` seconds without polls."""
+        self.poll_all = poll_all
+        """If all hardware should be polled, regardless of demand."""
+        self.demand_timeout = demand_timeout
+        """Time (in seconds) after their last demand that hardware stop being polled."""
+        self._hardware: list[Hardware] = []
+        self._table: SharedSensorTable = None
+        self._catalog: shared_memory.SharedMemory = None
+        self._running = False
+
+    def start(self):
+        """Initializes our source and publishes its catalog and (empty) value table.
+
+        Raises:
+            DaemonRunningError: if another daemon is already running with our name.
+        """
+        SharedSensorTable.check_not_running(self.name)
+        self.source.initialize()
+        self._hardware = [hw for root_hw in self.source.get_all_hardware() for hw in root_hw.get_all_hardware()]
+        sensor_count = sum(len(hw.isensors) for hw in self._hardware)
+        self._catalog = write_catalog(f"{self.name}_catalog", self.source, self._hardware)
+        self._table = SharedSensorTable.create(self.name, sensor_count, len(self._hardware))
+        click.secho(f"[SensorDaemon] Publishing {sensor_count} sensors from {len(self._hardware)} hardware of '{self.source.pretty_name}' "
+                    f"at '{self.name}'", fg="green")
+
+    def poll(self):
+        """Polls all demanded hardware (or all of them, if ``poll_all``), writing their sensor values to our table."""
+        table = self._table
+        now = time.time()
+        polled: list[tuple[int, Hardware]] = []
+        start = 0
+        for index, hw in enumerate(self._hardware):
+            if self.poll_all or now - table.demand[index] <= self.demand_timeout:
+                hw.poll()
+                polled.append((start, hw))
+            start += len(hw.isensors)
+        table.begin_write()
+        try:
+            for start, hw in polled:
+                for offset, isensor in enumerate(hw.isensors):
+                    table.write_sensor(start + offset, isensor)
+        finally:
+            table.end_write()
+
+    def run(self):
+        """Runs the daemon until interrupted (CTRL+C), polling at our rate."""
+        self.start()
+        self._running = True
+        period = 1.0 / max(self.rate, 0.01)
+        deadline = time.perf_counter()
+        try:
+            while self._running:
+                self.poll()
+                deadline += period
+                now = time.perf_counter()
+                if deadline < now:
+                    deadline = now
+                time.sleep(deadline - now)
+        except KeyboardInterrupt:
+            pass
+        finally:
+            self.stop()
+
+    def stop(self):
+        """Stops the daemon, shutting down our source and unlinking our shared memory."""
+        self._running = False
+        if self._table is not None:
+            self._table.close()
+            self._table = None
+        if self._catalog is not None:
+            self._catalog.close()
+            self._catalog.unlink()
+            self._catalog = None
+        self.source.shutdown()
+        click.secho("[SensorDaemon] Stopped.", fg="magenta")
@@ -0,0 +1,61 @@
+import math
+
+
+class ChangeDetector:
+    """Detects meaningful changes in a stream of sensor values, using a deadband with optional hysteresis.
+
+    Each new value is compared to the last *reported* value (the last value for which a change was detected), not to the
+    previous value. A change is detected when the difference exceeds the deadband, which is the largest of:
+    * the absolute deadband (in the sensor's unit).
+    * the relative deadband: a fraction of the last reported value (0.05 is 5%).
+
+    With hysteresis, a change that reverses the direction of the last reported change also needs to exceed the hysteresis
+    amount (added to the deadband). This avoids flapping when a value oscillates around a point.
+
+    With no deadband (the default), any different value is a change. Values appearing or disappearing (NaN) are always changes.
+    """
+
+    __slots__ = ("last_value", "direction")
+
+    def __init__(self):
+        self.last_value: float = math.nan
+        """Last reported value. NaN if no value was reported yet."""
+        self.direction: int = 0
+        """Direction of the last reported change: 1 if it increased, -1 if it decreased, 0 if unknown."""
+
+    def check(self, value: float, deadband: float = 0.0, relative_deadband: float = 0.0, hysteresis: float = 0.0) -> bool:
+        """Checks if the given value is a meaningful change from the last reported value. If it is, it becomes the reported value.
+
+        Args:
+            value (float): the new value. NaN for no value.
+            deadband (float, optional): absolute deadband. Defaults to 0.
+            relative_deadband (float, optional): deadband relative to the last reported value. Defaults to 0.
+            hysteresis (float, optional): extra deadband for changes that reverse direction. Defaults to 0.
+
+        Returns:
+            bool: if the value changed.
+        """
+        last = self.last_value
+        if value != value or last != last:  # NaN checks
+            changed = (value != value) != (last != last)
+            if changed:
+                self.last_value = value
+                self.direction = 0
+            return changed
+        delta = value - last
+        if delta == 0.0:
+            return False
+        band = max(deadband, relative_deadband * abs(last))
+        direction = 1 if delta > 0 else -1
+        if hysteresis > 0 and direction == -self.direction:
+            band += hysteresis
+        if abs(delta) <= band:
+            return False
+        self.last_value = value
+        self.direction = direction
+        return True
+
+    def reset(self):
+        """Forgets the last reported value, so the next value is always a change."""
+        self.last_value = math.nan
+        self.direction = 0
@@ -0,0 +1,78 @@
+import itertools
+import threading
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from lcarsmonitor.sensors.sensors_api import InternalSensor
+
+
+class SensorEventQueue:
+    """Thread-safe queue of "sensor updated" events, from the ComputerSystem update thread to the render thread.
+
+    The update thread pushes an event for each updated sensor after publishing a new snapshot (see ``push()``), and the render
+    thread drains the queue once per frame (see ``drain()``), notifying the Sensor nodes of each sensor. This way, the flows
+    triggered by Sensor nodes (and the widgets they change) only run on the render thread.
+
+    Events are coalesced per sensor, with latest-value-wins: if a sensor is updated again before its pending event was
+    drained (such as when polling faster than the frame rate), the pending event is kept at its position in the queue
+    with the newer snapshot generation, and the older event is counted as dropped. So the queue never holds more events
+    than there are sensors, and Sensor nodes are notified at most once per frame.
+    """
+
+    def __init__(self):
+        self._pending: dict['InternalSensor', int] = {}
+        self._lock = threading.Lock()
+        self.pushed = 0
+        """Total number of events pushed to this queue."""
+        self.dropped = 0
+        """Total number of events dropped: coalesced by a newer event of the same sensor, or discarded by ``clear()``."""
+        self.processed = 0
+        """Total number of events drained from this queue."""
+        self.last_drained = 0
+        """Number of events drained by the last ``drain()``."""
+
+    @property
+    def depth(self):
+        """Number of pending events (sensors with updates not yet drained)."""
+        return len(self._pending)
+
+    def push(self, isensors: list['InternalSensor'], generation: int):
+        """Pushes an event for each of the given sensors, updated by the snapshot of the given generation.
+
+        Pending events of these sensors are coalesced (replaced by the new event).
+        """
+        with self._lock:
+            pending = self._pending
+            size = len(pending)
+            for isensor in isensors:
+                pending[isensor] = generation
+            self.dropped += len(isensors) - (len(pending) - size)
+            self.pushed += len(isensors)
+
+    def drain(self, max_events: int = 0) -> list['InternalSensor']:
+        """Removes pending events from the queue, oldest first.
+
+        Args:
+            max_events (int, optional): maximum number of events to remove. Remaining events stay queued (and may
+                still be coalesced) for the next drain. If 0 (the default), all pending events are removed.
+
+        Returns:
+            list[InternalSensor]: the sensors of the removed events.
+        """
+        with self._lock:
+            if max_events <= 0 or max_events >= len(self._pending):
+                isensors = list(self._pending)
+                self._pending.clear()
+            else:
+                isensors = list(itertools.islice(self._pending, max_events))
+                for isensor in isensors:
+                    del self._pending[isensor]
+            self.processed += len(isensors)
+            self.last_drained = len(isensors)
+        return isensors
+
+    def clear(self):
+        """Discards all pending events, counting them as dropped."""
+        with self._lock:
+            self.dropped += len(self._pending)
+            self._pending.clear()
@@ -0,0 +1,149 @@
+import threading
+import click
+from typing import Callable, TYPE_CHECKING
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from lcarsmonitor.sensors.snapshot import SensorSnapshot
+
+if TYPE_CHECKING:
+    from lcarsmonitor.sensors.sensors_api import InternalSensor
+
+OPENMETRICS_CONTENT_TYPE = "application/openmetrics-text; version=1.0.0; charset=utf-8"
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+METRICS = (
+    ("lcarsmonitor_sensor_value", "Current value of the sensor.", "values"),
+    ("lcarsmonitor_sensor_minimum", "Minimum value of the sensor since measurements started.", "minimums"),
+    ("lcarsmonitor_sensor_maximum", "Maximum value of the sensor since measurements started.", "maximums"),
+)
+"""Exported metrics, as ``(name, help, SensorSnapshot attribute)`` tuples."""
+
+
+def _format_value(value: float):
+    """Formats the given value as a sample value in the metrics text formats."""
+    if value == float("inf"):
+        return "+Inf"
+    if value == float("-inf"):
+        return "-Inf"
+    return repr(value)
+
+
+def _escape_label(value: str):
+    """Escapes the given text to be used as a label value in the metrics text formats."""
+    return str(value).replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
+
+
+class MetricsExporter:
+    """HTTP server that exports the values of all sensors as OpenMetrics (or Prometheus text format) gauges.
+
+    Metrics are served at ``/metrics``, with labels for the sensor's ID, name, hardware (its full name), type and unit.
+    The response is rendered from the latest ``SensorSnapshot`` of the ComputerSystem, and cached by snapshot generation,
+    so any number of scrapers don't cause any extra polling of the sensors, nor touch the render thread.
+
+    The server runs on its own (daemon) threads.
+    """
+
+    def __init__(self, get_snapshot: Callable[[], SensorSnapshot]):
+        """
+        Args:
+            get_snapshot (Callable[[], SensorSnapshot]): callable that returns the latest sensor snapshot.
+        """
+        self.get_snapshot = get_snapshot
+        """Callable that returns the latest sensor snapshot."""
+        self._labels: list[str] = []
+        self._cache: tuple[int, list[str], bytes, bytes] = (-1, None, b"", b"")
+        self._server: ThreadingHTTPServer = None
+        self._thread: threading.Thread = None
+        self.requests = 0
+        """Number of metrics requests served."""
+
+    @property
+    def is_running(self):
+        """If the HTTP server is running."""
+        return self._server is not None
+
+    @property
+    def address(self):
+        """URL of our metrics endpoint. None if we're not running."""
+        if self._server is None:
+            return None
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}/metrics"
+
+    def set_sensors(self, isensors: list['InternalSensor']):
+        """Sets the sensors to export, ordered by their index in the snapshots."""
+        labels = []
+        for isensor in isensors:
+            hardware = isensor.parent.full_name if isensor.parent is not None else ""
+            pairs = (("id", isensor.id), ("sensor", isensor.name), ("hardware", hardware), ("type", isensor.type),
+                     ("unit", isensor.unit))
+            labels.append(",".join(f"{key}=\"{_escape_label(value)}\"" for key, value in pairs))
+        self._labels = labels
+
+    def render(self, openmetrics: bool = True) -> bytes:
+        """Renders the metrics of the latest snapshot.
+
+        Args:
+            openmetrics (bool, optional): if the OpenMetrics format should be used. Otherwise the Prometheus text format is used.
+                They only differ in the ``# EOF`` marker at the end. Defaults to True.
+
+        Returns:
+            bytes: the metrics text, encoded in UTF-8.
+        """
+        snapshot = self.get_snapshot()
+        labels = self._labels
+        generation, cached_labels, body, eof = self._cache
+        if generation != snapshot.generation or cached_labels is not labels:
+            lines = []
+            for name, help, attribute in METRICS:
+                lines.append(f"# TYPE {name} gauge")
+                lines.append(f"# HELP {name} {help}")
+                for label, value in zip(labels, getattr(snapshot, attribute)):
+                    if value == value:  # skips NaN values
+                        lines.append(f"{name}{{{label}}} {_format_value(value)}")
+            lines.append("")
+            body = "\n".join(lines).encode("utf-8")
+            eof = body + b"# EOF\n"
+            self._cache = (snapshot.generation, labels, body, eof)
+        return eof if openmetrics else body
+
+    def start(self, host: str, port: int):
+        """Starts the HTTP server at the given address. If already running, the server is restarted."""
+        self.stop()
+        exporter = self
+
+        class MetricsRequestHandler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split("?")[0] not in ("/metrics", "/"):
+                    self.send_error(404)
+                    return
+                openmetrics = "application/openmetrics-text" in self.headers.get("Accept", "")
+                body = exporter.render(openmetrics)
+                exporter.requests += 1
+                self.send_response(200)
+                self.send_header("Content-Type", OPENMETRICS_CONTENT_TYPE if openmetrics else PROMETHEUS_CONTENT_TYPE)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass  # Don't log every scrape.
+
+        try:
+            self._server = ThreadingHTTPServer((host, port), MetricsRequestHandler)
+        except OSError as e:
+            click.secho(f"MetricsExporter: failed to start server at {host}:{port}: {e}", fg="red")
+            return False
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        click.secho(f"MetricsExporter: serving sensor metrics at {self.address}", fg="magenta")
+        return True
+
+    def stop(self):
+        """Stops the HTTP server, if it's running."""
+        if self._server is None:
+            return
+        self._server.shutdown()
+        self._server.server_close()
+        self._thread.join()
+        self._server = None
+        self._thread = None
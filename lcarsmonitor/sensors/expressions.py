@@ -0,0 +1,274 @@
+import ast
+import math
+import numpy as np
+from typing import Callable
+
+
+class ExpressionError(ValueError):
+    """Error raised when a sensor expression is invalid (such as bad syntax or unknown sensors)."""
+
+
+def _reduction(function: Callable[[np.ndarray], float]):
+    """Creates a reduction function for expressions: it reduces all given values (scalars or vectors), ignoring NaN values.
+    The reduction is NaN if there are no values."""
+    def reduce(*args):
+        values = np.hstack(args)
+        values = values[~np.isnan(values)]
+        if len(values) <= 0:
+            return math.nan
+        return float(function(values))
+    return reduce
+
+
+def _condition(function: Callable[[np.ndarray], bool]):
+    """Creates a condition reduction for expressions: 1 if FUNCTION holds for the given values (scalars or vectors), 0 otherwise.
+    Values of sensors without values (NaN) are ignored, and the result is NaN if there are no values."""
+    def reduce(*args):
+        values = np.hstack(args)
+        values = values[~np.isnan(values)]
+        if len(values) <= 0:
+            return math.nan
+        return 1.0 if function(values) else 0.0
+    return reduce
+
+
+EXPRESSION_FUNCTIONS: dict[str, Callable] = {
+    "max": _reduction(np.max),
+    "min": _reduction(np.min),
+    "sum": _reduction(np.sum),
+    "avg": _reduction(np.mean),
+    "count": lambda *args: float(np.count_nonzero(~np.isnan(np.hstack(args)))),
+    "abs": np.abs,
+    "any": _condition(np.any),
+    "all": _condition(np.all),
+}
+"""Functions available in sensor expressions, by name. All reductions (all but ``abs``) accept any number of scalars or
+vectors, and ignore sensors without values. ``any`` and ``all`` are meant for conditions over vectors, such as
+``any(sensors("*fan*") == 0)``."""
+_VECTOR_FUNCTIONS = {"abs"}
+"""Functions that take a single argument, and whose result is a vector when given a vector."""
+_BINARY_OPERATORS = (ast.Add, ast.Sub, ast.Mult, ast.Div, ast.FloorDiv, ast.Mod, ast.Pow)
+_UNARY_OPERATORS = (ast.UAdd, ast.USub)
+_COMPARE_OPERATORS = {ast.Gt: "_gt", ast.GtE: "_ge", ast.Lt: "_lt", ast.LtE: "_le", ast.Eq: "_eq", ast.NotEq: "_ne"}
+"""Comparison operators allowed in conditions, mapped to the name of their helper function in compiled expressions."""
+
+
+def _comparison(operator: Callable[[float, float], bool]):
+    """Creates the helper function of a comparison operator for conditions. Comparisons result in 1 (true) or 0 (false), but
+    comparing with an undefined value (NaN) results in NaN. When comparing vectors, the result is a vector."""
+    def compare(left, right):
+        if np.ndim(left) == 0 and np.ndim(right) == 0:
+            if left != left or right != right:  # NaN
+                return math.nan
+            return 1.0 if operator(left, right) else 0.0
+        result = np.asarray(operator(left, right), dtype=np.float64)
+        return np.where(np.isnan(left) | np.isnan(right), math.nan, result)
+    return compare
+
+
+def _and(*operands: float):
+    """Boolean ``and`` for conditions: NaN if any operand is NaN, otherwise 1 if all operands are true, or 0."""
+    if any(operand != operand for operand in operands):
+        return math.nan
+    return 1.0 if all(operands) else 0.0
+
+
+def _or(*operands: float):
+    """Boolean ``or`` for conditions: NaN if any operand is NaN, otherwise 1 if any operand is true, or 0."""
+    if any(operand != operand for operand in operands):
+        return math.nan
+    return 1.0 if any(operands) else 0.0
+
+
+def _not(operand: float):
+    """Boolean ``not`` for conditions: NaN if the operand is NaN, otherwise 1 if it's false, or 0."""
+    if operand != operand:
+        return math.nan
+    return 0.0 if operand else 1.0
+
+
+_CONDITION_FUNCTIONS: dict[str, Callable] = {
+    "_gt": _comparison(lambda a, b: a > b),
+    "_ge": _comparison(lambda a, b: a >= b),
+    "_lt": _comparison(lambda a, b: a < b),
+    "_le": _comparison(lambda a, b: a <= b),
+    "_eq": _comparison(lambda a, b: a == b),
+    "_ne": _comparison(lambda a, b: a != b),
+    "_and": _and,
+    "_or": _or,
+    "_not": _not,
+}
+"""Helper functions of the condition operators in compiled expressions. Python's own operators can't be used, since NaN
+is "truthy", which would make undefined values hold as true."""
+
+
+class CompiledExpression:
+    """A sensor expression compiled to a Python function over the vector of sensor values (such as ``SensorSnapshot.values``).
+
+    See ``compile_expression()``.
+    """
+
+    __slots__ = ("expression", "dependencies", "_function", "_no_limits")
+
+    def __init__(self, expression: str, function: Callable[[np.ndarray, np.ndarray, float, np.ndarray], float],
+                 dependencies: tuple[int]):
+        self.expression = expression
+        """The source expression."""
+        self.dependencies = dependencies
+        """Indexes of the sensors used by the expression, sorted."""
+        self._function = function
+        self._no_limits: np.ndarray = None
+
+    def evaluate(self, values: np.ndarray, previous: np.ndarray = None, delta_time: float = 0.0, limits: np.ndarray = None) -> float:
+        """Evaluates this expression with the given sensor values (by sensor index).
+
+        Args:
+            values (np.ndarray): current values of all sensors.
+            previous (np.ndarray, optional): values of all sensors in the previous evaluation, used by ``rate()``.
+                Defaults to None, in which case rates are NaN.
+            delta_time (float, optional): time (in seconds) since the previous evaluation, used by ``rate()``. Defaults to 0.
+            limits (np.ndarray, optional): maximum limits of all sensors (NaN for no limit), used by ``limit()``.
+                Defaults to None, in which case limits are NaN.
+
+        Returns:
+            float: the result. NaN if a used sensor has no value, or the result is undefined (such as a division by zero).
+            Conditions result in 1 (true) or 0 (false).
+        """
+        if previous is None:
+            previous, delta_time = values, 0.0
+        if limits is None:
+            if self._no_limits is None or len(self._no_limits) != len(values):
+                self._no_limits = np.full(len(values), math.nan)
+            limits = self._no_limits
+        try:
+            result = float(self._function(values, previous, delta_time, limits))
+        except (ArithmeticError, ValueError, TypeError):
+            return math.nan
+        return result if math.isfinite(result) else math.nan
+
+
+def compile_expression(expression: str, resolve_sensor: Callable[[str], int | None],
+                       resolve_sensors: Callable[[str], list[int]], conditions: bool = False) -> CompiledExpression:
+    """Compiles the given sensor expression.
+
+    Expressions use Python syntax, with numbers, the arithmetic operators (``+ - * / // % **``), parenthesis and:
+    * ``sensor("key")``: the value of a single sensor.
+    * ``sensors("pattern")``: the values of all sensors matching the pattern, as a vector. Vectors can be used in arithmetic
+      with numbers, but need to be reduced to a single value by the end of the expression.
+    * The functions from ``EXPRESSION_FUNCTIONS``, such as ``max(sensors("*/CPU Core #*"))`` or ``max(sensor("a"), sensor("b"))``.
+
+    If CONDITIONS is enabled, the expression may also use:
+    * Comparisons (``> >= < <= == !=``) and the ``and``/``or``/``not`` operators. They result in 1 (true) or 0 (false),
+      or NaN (undefined) if any of their operands is NaN (such as a sensor without value).
+    * ``limit("key")``: the maximum limit of a sensor (see ``SensorSnapshot.limits_max``).
+    * ``rate(expression)``: rate of change (per second) of the given (numeric) expression, since the previous evaluation.
+    Such as ``sensor("fan") == 0 and rate(sensor("temp")) > 0``.
+
+    The expression is parsed and validated once, and then compiled to a Python function where each sensor reference is an
+    index into the values vector. So evaluating it is as fast as a hand-written python function.
+
+    Args:
+        expression (str): the expression to compile.
+        resolve_sensor (Callable[[str], int | None]): callable that receives the key given to ``sensor()``, and returns the
+            index of its sensor, or None if the sensor doesn't exist.
+        resolve_sensors (Callable[[str], list[int]]): callable that receives the pattern given to ``sensors()``, and returns
+            the indexes of the matching sensors.
+        conditions (bool, optional): if condition syntax (comparisons, boolean operators, ``limit()`` and ``rate()``) is
+            allowed. Defaults to False.
+
+    Raises:
+        ExpressionError: if the expression is invalid.
+
+    Returns:
+        CompiledExpression: the compiled expression.
+    """
+    try:
+        tree = ast.parse(expression.strip(), mode="eval")
+    except SyntaxError as e:
+        raise ExpressionError(f"invalid syntax: {e.msg}") from e
+    constants: dict[str, np.ndarray] = {}
+    dependencies: set[int] = set()
+
+    def call(name: str, *args: ast.AST):
+        """Creates a call node of the helper function with the given name."""
+        return ast.Call(ast.Name(name, ast.Load()), list(args), [])
+
+    def visit(node: ast.AST, source: str = "values") -> tuple[ast.AST, bool]:
+        """Validates and converts the given expression node. Returns the converted node, and if its result is a vector.
+        SOURCE is the name of the values vector used by sensor references ("previous" inside a ``rate()``)."""
+        if isinstance(node, ast.Constant) and type(node.value) in (int, float):
+            return node, False
+        if isinstance(node, ast.BinOp) and isinstance(node.op, _BINARY_OPERATORS):
+            left, left_vector = visit(node.left, source)
+            right, right_vector = visit(node.right, source)
+            return ast.BinOp(left, node.op, right), left_vector or right_vector
+        if isinstance(node, ast.UnaryOp) and isinstance(node.op, _UNARY_OPERATORS):
+            operand, is_vector = visit(node.operand, source)
+            return ast.UnaryOp(node.op, operand), is_vector
+        if conditions and isinstance(node, ast.Compare) and all(type(op) in _COMPARE_OPERATORS for op in node.ops):
+            operands = [visit(operand, source) for operand in [node.left] + node.comparators]
+            is_vector = any(operand_vector for _, operand_vector in operands)
+            if is_vector and len(node.ops) > 1:
+                raise ExpressionError("chained comparisons can't be used with multiple values")
+            # Chained comparisons (such as "a < b < c") are the "and" of each comparison.
+            comparisons = [call(_COMPARE_OPERATORS[type(op)], operands[i][0], operands[i + 1][0]) for i, op in enumerate(node.ops)]
+            return (comparisons[0] if len(comparisons) == 1 else call("_and", *comparisons)), is_vector
+        if conditions and (isinstance(node, ast.BoolOp) or (isinstance(node, ast.UnaryOp) and isinstance(node.op, ast.Not))):
+            operands = [visit(operand, source) for operand in (node.values if isinstance(node, ast.BoolOp) else [node.operand])]
+            if any(operand_vector for _, operand_vector in operands):
+                raise ExpressionError(f"'{ast.unparse(node)}' uses multiple values, reduce them with a function such as any() or all()")
+            if isinstance(node, ast.BoolOp):
+                return call("_and" if isinstance(node.op, ast.And) else "_or", *[operand for operand, _ in operands]), False
+            return call("_not", operands[0][0]), False
+        if isinstance(node, ast.Call) and isinstance(node.func, ast.Name) and len(node.keywords) <= 0:
+            name = node.func.id
+            if name in ("sensor", "sensors") or (conditions and name == "limit"):
+                if len(node.args) != 1 or not isinstance(node.args[0], ast.Constant) or not isinstance(node.args[0].value, str):
+                    raise ExpressionError(f"{name}() takes a single text argument")
+                key = node.args[0].value
+                if name in ("sensor", "limit"):
+                    index = resolve_sensor(key)
+                    if index is None:
+                        raise ExpressionError(f"unknown sensor '{key}'")
+                    dependencies.add(index)
+                    vector = "limits" if name == "limit" else source
+                    return ast.Subscript(ast.Name(vector, ast.Load()), ast.Constant(index), ast.Load()), False
+                indexes = resolve_sensors(key)
+                if len(indexes) <= 0:
+                    raise ExpressionError(f"no sensors match '{key}'")
+                dependencies.update(indexes)
+                constant = f"_indexes_{len(constants)}"
+                constants[constant] = np.array(indexes, dtype=np.intp)
+                return ast.Subscript(ast.Name(source, ast.Load()), ast.Name(constant, ast.Load()), ast.Load()), True
+            if conditions and name == "rate":
+                if len(node.args) != 1 or source != "values":
+                    raise ExpressionError("rate() takes a single argument, and can't be nested")
+                if any(isinstance(child, (ast.Compare, ast.BoolOp)) or (isinstance(child, ast.UnaryOp) and isinstance(child.op, ast.Not))
+                       for child in ast.walk(node.args[0])):
+                    raise ExpressionError("rate() takes a numeric expression, not a condition")
+                current, is_vector = visit(node.args[0], "values")
+                previous, _ = visit(node.args[0], "previous")
+                change = ast.BinOp(current, ast.Sub(), previous)
+                return ast.BinOp(change, ast.Div(), ast.Name("delta_time", ast.Load())), is_vector
+            if name not in EXPRESSION_FUNCTIONS:
+                raise ExpressionError(f"unknown function '{name}'")
+            if len(node.args) <= 0:
+                raise ExpressionError(f"{name}() needs at least one argument")
+            if name in _VECTOR_FUNCTIONS and len(node.args) != 1:
+                raise ExpressionError(f"{name}() takes a single argument")
+            args = [visit(arg, source) for arg in node.args]
+            is_vector = name in _VECTOR_FUNCTIONS and any(arg_vector for _, arg_vector in args)
+            return ast.Call(ast.Name(f"_{name}", ast.Load()), [arg for arg, _ in args], []), is_vector
+        raise ExpressionError(f"unsupported syntax '{ast.unparse(node)}'")
+
+    body, is_vector = visit(tree.body)
+    if is_vector:
+        raise ExpressionError("expression results in multiple values, reduce them with a function such as max() or avg()")
+    parameters = [ast.arg(name) for name in ("values", "previous", "delta_time", "limits")]
+    arguments = ast.arguments(posonlyargs=[], args=parameters, kwonlyargs=[], kw_defaults=[], defaults=[])
+    program = ast.fix_missing_locations(ast.Expression(ast.Lambda(arguments, body)))
+    namespace = {"__builtins__": {}, **constants}
+    namespace.update((f"_{name}", function) for name, function in EXPRESSION_FUNCTIONS.items())
+    namespace.update(_CONDITION_FUNCTIONS)
+    function = eval(compile(program, "<sensor expression>", "eval"), namespace)
+    return CompiledExpression(expression, function, tuple(sorted(dependencies)))
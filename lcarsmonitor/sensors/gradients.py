@@ -0,0 +1,102 @@
+from array import array
+from functools import lru_cache
+from libasvat.imgui.math import multiple_lerp_with_weigths
+from libasvat.imgui.colors import Colors, Color
+from lcarsmonitor.sensors.sensors_api import SensorUnit
+
+GRADIENT_LUT_SIZE = 256
+"""Default number of precomputed colors in the lookup table of a ColorGradient."""
+
+
+def pack_color_u32(color: Color) -> int:
+    """Packs the given color to a 32-bit RGBA integer, as used by IMGUI's draw lists (same as ``IM_COL32``)."""
+    channels = [min(255, max(0, int(component * 255.0 + 0.5))) for component in (color.x, color.y, color.z, color.w)]
+    return channels[0] | (channels[1] << 8) | (channels[2] << 16) | (channels[3] << 24)
+
+
+class ColorGradient:
+    """A color gradient, compiled to a lookup table (LUT) of precomputed colors.
+
+    The gradient is defined by ``(color, weight)`` stops (as used by ``multiple_lerp_with_weigths``), with weights in [0, 1].
+    All colors of the gradient are computed once, when the gradient is created. Getting the color of a percent is then
+    only a clamp, a multiply and an index into the table.
+
+    Besides the Color objects, the table also has the colors packed as 32-bit integers, for use directly with IMGUI draw lists.
+    """
+
+    def __init__(self, stops: list[tuple[Color, float]], size: int = GRADIENT_LUT_SIZE):
+        """
+        Args:
+            stops (list[tuple[Color, float]]): the ``(color, weight)`` stops of the gradient, ordered by weight.
+            size (int, optional): number of precomputed colors. Defaults to ``GRADIENT_LUT_SIZE``.
+        """
+        self.stops = tuple(stops)
+        """The ``(color, weight)`` stops of this gradient."""
+        size = max(2, size)
+        self._scale = size - 1
+        self.colors: list[Color] = [multiple_lerp_with_weigths(list(self.stops), index / self._scale) for index in range(size)]
+        """The lookup table of colors, evenly spaced from 0 to 1."""
+        self.colors_u32 = array("I", [pack_color_u32(color) for color in self.colors])
+        """The lookup table of colors packed as 32-bit RGBA integers."""
+
+    def get_index(self, percent: float) -> int:
+        """Gets the index in our lookup tables of the given percent (clamped to [0, 1])."""
+        if not percent > 0.0:  # also handles NaN
+            return 0
+        if percent >= 1.0:
+            return self._scale
+        return int(percent * self._scale + 0.5)
+
+    def get_color(self, percent: float) -> Color:
+        """Gets the color of this gradient at the given percent, in [0, 1] (values outside are clamped)."""
+        return self.colors[self.get_index(percent)]
+
+    def get_color_u32(self, percent: float) -> int:
+        """Gets the color of this gradient at the given percent, in [0, 1], packed as a 32-bit RGBA integer."""
+        return self.colors_u32[self.get_index(percent)]
+
+    @classmethod
+    def from_colors(cls, colors: list[Color]) -> 'ColorGradient':
+        """Gets a gradient with the given colors evenly spread from 0 to 1.
+
+        Gradients are cached (LRU) by their colors, so this is cheap to call with the same colors repeatedly.
+        """
+        return _get_gradient_from_colors(tuple((color.x, color.y, color.z, color.w) for color in colors))
+
+
+@lru_cache(maxsize=64)
+def _get_gradient_from_colors(colors: tuple[tuple[float, float, float, float]]):
+    """Builds the gradient for ``ColorGradient.from_colors()``, cached by the components of the colors."""
+    if len(colors) == 1:
+        colors = colors * 2
+    last = max(1, len(colors) - 1)
+    return ColorGradient([(Color(*components), index / last) for index, components in enumerate(colors)])
+
+
+UNIT_GRADIENT_STOPS: dict[str, list[tuple[Color, float]]] = {
+    SensorUnit.PERCENT.name: [(Colors.magenta, 0), (Colors.green, 0.0001), (Colors.yellow, 0.75), (Colors.red, 1)],
+    SensorUnit.FAN.name: [(Colors.magenta, 0), (Colors.green, 0.0001), (Colors.yellow, 0.75), (Colors.red, 1)],
+    SensorUnit.TEMPERATURE.name: [(Colors.red, 0), (Colors.green, 0.001), (Colors.yellow, 0.75), (Colors.red, 1)],
+    SensorUnit.POWER.name: [(Colors.green, 0), (Colors.yellow, 0.75), (Colors.red, 1)],
+    SensorUnit.VOLTAGE.name: [(Colors.green, 0), (Colors.yellow, 0.75), (Colors.red, 1)],
+    SensorUnit.CURRENT.name: [(Colors.green, 0), (Colors.yellow, 0.75), (Colors.red, 1)],
+    SensorUnit.THROUGHPUT.name: [(Colors.white, 0), (Colors.white, 0.5), (Colors.yellow, 0.75), (Colors.red, 1)],
+    SensorUnit.CLOCK.name: [(Colors.white, 0), (Colors.white, 0.5), (Colors.yellow, 0.75), (Colors.red, 1)],
+}
+"""Stops of the default color gradient of each SensorUnit, by unit name (SensorUnits aren't hashable).
+Units without a gradient always use white."""
+_unit_gradients: dict[str, ColorGradient] = {}
+
+
+def get_unit_gradient(unit: SensorUnit) -> ColorGradient | None:
+    """Gets the default color gradient of the given SensorUnit. None if the unit has no gradient.
+    Gradients are compiled when first used."""
+    if unit is None:
+        return None
+    gradient = _unit_gradients.get(unit.name)
+    if gradient is None:
+        stops = UNIT_GRADIENT_STOPS.get(unit.name)
+        if stops is None:
+            return None
+        gradient = _unit_gradients[unit.name] = ColorGradient(stops)
+    return gradient
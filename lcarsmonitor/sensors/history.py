@@ -0,0 +1,209 @@
+import math
+from array import array
+
+DEFAULT_RAW_CAPACITY = 300
+"""Default number of raw samples kept by a SensorHistory: 30 seconds at 10Hz (or 5 minutes at the default 1Hz)."""
+DEFAULT_TIERS = ((1.0, 60), (10.0, 90), (60.0, 120))
+"""Default rollup tiers of a SensorHistory, as ``(bucket_duration, num_buckets)`` pairs: 1 minute of 1s buckets,
+15 minutes of 10s buckets and 2 hours of 60s buckets."""
+
+
+class HistoryTier:
+    """A rollup tier of a SensorHistory.
+
+    Aggregates the samples of a sensor in fixed-duration buckets, keeping the minimum, maximum and average value
+    of each bucket in a ring-buffer of preallocated arrays.
+    """
+
+    def __init__(self, bucket_duration: float, capacity: int):
+        self.bucket_duration = bucket_duration
+        """Duration of each bucket, in seconds."""
+        self.capacity = max(1, capacity)
+        """Maximum number of (closed) buckets stored in this tier."""
+        self._times = array("d", bytes(8 * self.capacity))
+        self._mins = array("f", bytes(4 * self.capacity))
+        self._maxs = array("f", bytes(4 * self.capacity))
+        self._avgs = array("f", bytes(4 * self.capacity))
+        self._head = 0
+        self._count = 0
+        # Accumulators of the current (open) bucket.
+        self._bucket_start = -math.inf
+        self._bucket_min = math.inf
+        self._bucket_max = -math.inf
+        self._bucket_sum = 0.0
+        self._bucket_count = 0
+
+    def add(self, timestamp: float, value: float):
+        """Adds a sample to this tier, closing the current bucket if the sample's timestamp is past it."""
+        if timestamp >= self._bucket_start + self.bucket_duration:
+            if self._bucket_count > 0:
+                self._close_bucket()
+            self._bucket_start = timestamp - (timestamp % self.bucket_duration)
+            self._bucket_min = math.inf
+            self._bucket_max = -math.inf
+            self._bucket_sum = 0.0
+            self._bucket_count = 0
+        if value < self._bucket_min:
+            self._bucket_min = value
+        if value > self._bucket_max:
+            self._bucket_max = value
+        self._bucket_sum += value
+        self._bucket_count += 1
+
+    def _close_bucket(self):
+        """Stores the current bucket's aggregated values in our ring-buffer."""
+        head = self._head
+        self._times[head] = self._bucket_start
+        self._mins[head] = self._bucket_min
+        self._maxs[head] = self._bucket_max
+        self._avgs[head] = self._bucket_sum / self._bucket_count
+        # Only advance the head after writing the bucket, so readers never see a partially written bucket.
+        self._head = (head + 1) % self.capacity
+        if self._count < self.capacity:
+            self._count += 1
+
+    def __len__(self):
+        return self._count
+
+    def get(self, duration: float = None, now: float = None):
+        """Gets the closed buckets of this tier, from oldest to newest.
+
+        Args:
+            duration (float, optional): if given, only buckets that started in the last DURATION seconds (relative to NOW) are returned.
+            now (float, optional): reference time for DURATION. Defaults to the start time of the newest bucket.
+
+        Returns:
+            tuple[list[float], list[float], list[float], list[float]]: a ``(times, minimums, maximums, averages)`` tuple of lists,
+            where ``times`` are the start times of each bucket. This is O(window).
+        """
+        times, mins, maxs, avgs = [], [], [], []
+        index = self._head
+        for _ in range(self._count):
+            index = (index - 1) % self.capacity
+            bucket_time = self._times[index]
+            if duration is not None:
+                if now is None:
+                    now = bucket_time
+                if bucket_time < now - duration:
+                    break
+            times.append(bucket_time)
+            mins.append(self._mins[index])
+            maxs.append(self._maxs[index])
+            avgs.append(self._avgs[index])
+        times.reverse()
+        mins.reverse()
+        maxs.reverse()
+        avgs.reverse()
+        return times, mins, maxs, avgs
+
+    @property
+    def memory_size(self):
+        """Approximate amount of memory (in bytes) used by our arrays."""
+        return sum(arr.itemsize * len(arr) for arr in (self._times, self._mins, self._maxs, self._avgs))
+
+
+class SensorHistory:
+    """Array-backed history of the values of a single sensor.
+
+    Keeps the last N raw samples of the sensor in a ring-buffer, along with a few rollup tiers (by default, 1s/10s/60s buckets - see
+    ``DEFAULT_TIERS``) which keep the min/max/avg of the samples in each bucket. All storage is preallocated in compact arrays, so appending
+    a sample is O(1) and doesn't store new python objects, and reading a window of the history is O(window).
+
+    Samples are appended by the ComputerSystem update thread, after each poll. Readers in other threads might see a sample being written,
+    but will never see a partially written one since the ring heads are only advanced after the sample is written.
+
+    Memory budget: raw samples use 12 bytes each, and rollup buckets 20 bytes each. With the defaults (``DEFAULT_RAW_CAPACITY``
+    and ``DEFAULT_TIERS``), each history uses about 9KB: about 3.5MB for 400 sensors. The number of raw samples is configurable
+    with ``ComputerSystem.history_length``.
+    """
+
+    def __init__(self, raw_capacity: int = DEFAULT_RAW_CAPACITY, tiers: tuple[tuple[float, int]] = DEFAULT_TIERS):
+        self.raw_capacity = max(1, raw_capacity)
+        """Maximum number of raw samples kept by this history."""
+        self._times = array("d", bytes(8 * self.raw_capacity))
+        self._values = array("f", bytes(4 * self.raw_capacity))
+        self._head = 0
+        self._count = 0
+        self.tiers = [HistoryTier(duration, capacity) for duration, capacity in tiers]
+        """The rollup tiers of this history, ordered as given in the constructor."""
+
+    def append(self, timestamp: float, value: float):
+        """Appends a new sample to this history.
+
+        Args:
+            timestamp (float): time of the sample, in seconds. Samples should be appended with increasing timestamps.
+            value (float): value of the sample.
+        """
+        head = self._head
+        self._times[head] = timestamp
+        self._values[head] = value
+        self._head = (head + 1) % self.raw_capacity
+        if self._count < self.raw_capacity:
+            self._count += 1
+        for tier in self.tiers:
+            tier.add(timestamp, value)
+
+    def __len__(self):
+        return self._count
+
+    @property
+    def last_timestamp(self) -> float | None:
+        """Timestamp of the newest raw sample. None if the history is empty."""
+        if self._count <= 0:
+            return None
+        return self._times[(self._head - 1) % self.raw_capacity]
+
+    def get_raw(self, duration: float = None):
+        """Gets the raw samples of this history, from oldest to newest.
+
+        Args:
+            duration (float, optional): if given, only samples from the last DURATION seconds (relative to the newest sample)
+                are returned. Otherwise all stored samples are returned.
+
+        Returns:
+            tuple[list[float], list[float]]: a ``(timestamps, values)`` tuple of lists. This is O(window).
+        """
+        times, values = [], []
+        index = self._head
+        min_time = -math.inf
+        if duration is not None and self._count > 0:
+            min_time = self.last_timestamp - duration
+        for _ in range(self._count):
+            index = (index - 1) % self.raw_capacity
+            timestamp = self._times[index]
+            if timestamp < min_time:
+                break
+            times.append(timestamp)
+            values.append(self._values[index])
+        times.reverse()
+        values.reverse()
+        return times, values
+
+    def get_tier(self, bucket_duration: float):
+        """Gets our rollup tier with the given bucket duration (in seconds). None if we have no such tier."""
+        for tier in self.tiers:
+            if tier.bucket_duration == bucket_duration:
+                return tier
+
+    def get_rollup(self, bucket_duration: float, duration: float = None):
+        """Gets the buckets of the rollup tier with the given bucket duration.
+
+        Args:
+            bucket_duration (float): duration of the tier's buckets, in seconds. Such as 1, 10 or 60 for the default tiers.
+            duration (float, optional): if given, only buckets from the last DURATION seconds (relative to our newest sample)
+                are returned.
+
+        Returns:
+            tuple[list[float], list[float], list[float], list[float]]: a ``(times, minimums, maximums, averages)`` tuple
+            of lists (see ``HistoryTier.get()``). All lists are empty if we don't have the requested tier.
+        """
+        tier = self.get_tier(bucket_duration)
+        if tier is None:
+            return [], [], [], []
+        return tier.get(duration, self.last_timestamp)
+
+    @property
+    def memory_size(self):
+        """Approximate amount of memory (in bytes) used by the arrays of this history and its tiers."""
+        raw_size = self._times.itemsize * len(self._times) + self._values.itemsize * len(self._values)
+        return raw_size + sum(tier.memory_size for tier in self.tiers)
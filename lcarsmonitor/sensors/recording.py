@@ -0,0 +1,187 @@
+import io
+import json
+import mmap
+import time
+import struct
+import threading
+from array import array
+from lcarsmonitor.sensors.sensors_api import Hardware
+from lcarsmonitor.sensors.snapshot import SensorSnapshot
+from lcarsmonitor.sensors.catalog import build_catalog, get_catalog_isensors
+
+RECORDING_EXTENSION = ".lcrec"
+"""File extension of sensor recordings."""
+
+
+class RecordingFormat:
+    """Binary format of sensor recordings.
+
+    A recording is an append-only file with:
+    * A fixed-size header (see ``HEADER``): magic, format version, number of sensors and size of the catalog.
+    * The sensor catalog (see ``build_catalog()``), as JSON. Padded with spaces to a multiple of 8 bytes.
+    * Any number of fixed-width frames, one per recorded poll: the frame's timestamp (float64, seconds since the recording started),
+      followed by the value of each sensor (float32, NaN for no value) in catalog row order.
+
+    Since frames are fixed-width, the number of frames is derived from the file size (a partially written last frame is ignored),
+    and any frame can be read directly by its index.
+    """
+
+    HEADER = struct.Struct("<8sHHIQ")
+    """Header layout: magic, version, reserved, number of sensors, catalog size."""
+    MAGIC = b"LCARSREC"
+    VERSION = 1
+    TIMESTAMP = struct.Struct("<d")
+
+    @classmethod
+    def frame_size(cls, sensor_count: int):
+        """Size in bytes of each frame of a recording with the given number of sensors."""
+        return cls.TIMESTAMP.size + 4 * sensor_count
+
+    @classmethod
+    def read_header(cls, file: io.BufferedIOBase):
+        """Reads the header and catalog of a recording from the given file (at its start).
+
+        Returns:
+            tuple[dict, int, int]: a ``(catalog, sensor_count, frames_offset)`` tuple.
+
+        Raises:
+            ValueError: if the file isn't a valid recording.
+        """
+        header = file.read(cls.HEADER.size)
+        if len(header) < cls.HEADER.size:
+            raise ValueError("file too small")
+        magic, version, _, sensor_count, catalog_size = cls.HEADER.unpack(header)
+        if magic != cls.MAGIC:
+            raise ValueError("not a sensor recording")
+        if version != cls.VERSION:
+            raise ValueError(f"unsupported recording version {version}")
+        catalog = json.loads(file.read(catalog_size))
+        return catalog, sensor_count, cls.HEADER.size + catalog_size
+
+
+class SensorRecorder:
+    """Records the values of all sensors of each poll (each SensorSnapshot) to a recording file.
+
+    See ``RecordingFormat`` for the file format. Recording is done by the ComputerSystem update thread (see ``record()``),
+    while the recorder may be closed from another thread, so writes are guarded by a lock.
+    """
+
+    def __init__(self, path: str, source_name: str, hardware: list[Hardware], flush_interval: float = 1.0):
+        """Creates a new recording at the given PATH, writing its header and catalog.
+
+        Args:
+            path (str): path of the recording file. Overwritten if it already exists.
+            source_name (str): name of the source of the sensors being recorded.
+            hardware (list[Hardware]): all hardware being recorded, including sub-hardware, parents before children.
+            flush_interval (float, optional): time (in seconds) between flushes of the file. Defaults to 1.0.
+        """
+        self.path = path
+        """Path of the recording file."""
+        self.flush_interval = flush_interval
+        """Time (in seconds) between flushes of the file, so that the recording can be read while being written."""
+        self.frame_count = 0
+        """Number of frames recorded."""
+        isensors = get_catalog_isensors(hardware)
+        self._indexes = [isensor.index for isensor in isensors]
+        # Usually catalog rows are the same as snapshot indexes, so frames are simply the snapshot values.
+        self._is_identity = self._indexes == list(range(len(self._indexes)))
+        self._start_time: float = None
+        self._last_flush = 0.0
+        self._lock = threading.Lock()
+
+        catalog = json.dumps(build_catalog(source_name, hardware)).encode()
+        catalog += b" " * (-(RecordingFormat.HEADER.size + len(catalog)) % 8)
+        self._file = open(path, "wb")
+        self._file.write(RecordingFormat.HEADER.pack(RecordingFormat.MAGIC, RecordingFormat.VERSION, 0, len(isensors), len(catalog)))
+        self._file.write(catalog)
+        self._file.flush()
+
+    @property
+    def is_open(self):
+        """If this recorder is still recording."""
+        return self._file is not None
+
+    @property
+    def duration(self) -> float:
+        """Time (in seconds) since the first recorded frame."""
+        if self._start_time is None:
+            return 0.0
+        return time.perf_counter() - self._start_time
+
+    def record(self, snapshot: SensorSnapshot):
+        """Appends a frame with the values of the given snapshot to the recording."""
+        values = snapshot.values
+        if self._is_identity and len(values) == len(self._indexes):
+            frame = array("f", values)
+        else:
+            frame = array("f", [values[index] if 0 <= index < len(values) else float("nan") for index in self._indexes])
+        with self._lock:
+            if self._file is None:
+                return
+            if self._start_time is None:
+                self._start_time = snapshot.timestamp
+            self._file.write(RecordingFormat.TIMESTAMP.pack(snapshot.timestamp - self._start_time))
+            self._file.write(frame.tobytes())
+            self.frame_count += 1
+            if snapshot.timestamp - self._last_flush >= self.flush_interval:
+                self._file.flush()
+                self._last_flush = snapshot.timestamp
+
+    def close(self):
+        """Closes the recording file. Further calls to ``record()`` are ignored."""
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+
+class RecordingReader:
+    """Memory-mapped reader of a sensor recording (see ``RecordingFormat``).
+
+    Opening only reads the header and catalog, so even multi-hour recordings open instantly. Frames are read directly from
+    the memory-map, and finding the frame at a given time is a binary search over the frame timestamps.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        """Path of the recording file."""
+        self._file = open(path, "rb")
+        try:
+            self.catalog, self.sensor_count, self.frames_offset = RecordingFormat.read_header(self._file)
+            self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except Exception:
+            self._file.close()
+            raise
+        self.frame_size = RecordingFormat.frame_size(self.sensor_count)
+        """Size in bytes of each frame."""
+        self.frame_count = max(0, (len(self._mmap) - self.frames_offset) // self.frame_size)
+        """Number of (complete) frames in the recording, when it was opened."""
+        self.duration = self.get_timestamp(self.frame_count - 1) if self.frame_count > 0 else 0.0
+        """Timestamp of the last frame (in seconds since the recording started)."""
+
+    def get_timestamp(self, frame: int) -> float:
+        """Gets the timestamp of the given frame index."""
+        return RecordingFormat.TIMESTAMP.unpack_from(self._mmap, self.frames_offset + frame * self.frame_size)[0]
+
+    def find_frame(self, timestamp: float) -> int:
+        """Gets the index of the last frame at or before the given timestamp (or the first frame, if the timestamp is before it)."""
+        low, high = 0, self.frame_count - 1
+        while low < high:
+            middle = (low + high + 1) // 2
+            if self.get_timestamp(middle) <= timestamp:
+                low = middle
+            else:
+                high = middle - 1
+        return low
+
+    def get_values(self, frame: int, start: int, count: int) -> memoryview:
+        """Gets a float32 view of COUNT sensor values of the given frame index, starting at sensor row START.
+        The view should be released after use (such as with a ``with`` statement)."""
+        offset = self.frames_offset + frame * self.frame_size + RecordingFormat.TIMESTAMP.size + 4 * start
+        with memoryview(self._mmap) as view:
+            return view[offset:offset + 4 * count].cast("f")
+
+    def close(self):
+        """Closes the recording. All views from ``get_values()`` should be released before this."""
+        self._mmap.close()
+        self._file.close()
@@ -0,0 +1,287 @@
+import math
+import time
+import click
+import threading
+import numpy as np
+from enum import Enum
+from collections import deque
+from fnmatch import fnmatchcase
+from typing import TYPE_CHECKING
+from lcarsmonitor.sensors.snapshot import SensorSnapshot
+from lcarsmonitor.sensors.expressions import CompiledExpression, ExpressionError, compile_expression
+
+if TYPE_CHECKING:
+    from lcarsmonitor.sensors.sensors_api import InternalSensor
+
+MAX_PENDING_ALERT_EVENTS = 256
+"""Maximum number of alert events kept in the RuleEngine queue until processed. Older events are discarded."""
+
+
+class AlertSeverity(Enum):
+    """Severity of an alert rule. Matches the types of the LCARS ``Alert`` widget."""
+    RED = "RED"
+    YELLOW = "YELLOW"
+
+
+class AlertEvent:
+    """Event of an alert rule being raised (its condition started holding) or cleared (its condition stopped holding)."""
+
+    __slots__ = ("rule", "raised", "timestamp", "value")
+
+    def __init__(self, rule: 'AlertRule', raised: bool, timestamp: float, value: float):
+        self.rule = rule
+        """The rule that emitted this event."""
+        self.raised = raised
+        """If the rule was raised (True) or cleared (False)."""
+        self.timestamp = timestamp
+        """Time (from ``time.time()``) of the event."""
+        self.value = value
+        """Result of the rule condition in the event's evaluation (1 for true, 0 for false, NaN if undefined)."""
+
+    @property
+    def message(self):
+        """Message describing this event, for logs and UIs."""
+        state = "RAISED" if self.raised else "CLEARED"
+        return f"{self.rule.severity.value} ALERT {state}: {self.rule.name}"
+
+
+class AlertRule:
+    """An alert rule: a condition over sensor values, that raises an alert while it holds for at least some duration.
+
+    Conditions are sensor expressions with condition syntax enabled (see ``lcarsmonitor.sensors.expressions.compile_expression()``),
+    such as ``sensor("/cpu/0/temperature/0") > limit("/cpu/0/temperature/0")`` or
+    ``sensor("/fan/0") == 0 and rate(sensor("/cpu/0/temperature/0")) > 0``.
+
+    While enabled, a rule subscribes itself to the sensors used by its condition, so their hardware are polled even if no
+    Sensor node uses them. It also acts as a subscriber for these sensors, but is never notified of their changes, since
+    rules are evaluated by the RuleEngine.
+    """
+
+    def __init__(self, definition: dict):
+        self.name: str = definition["name"]
+        """Name of this rule."""
+        self.condition: str = definition["condition"]
+        """Condition expression of this rule."""
+        self.duration: float = float(definition.get("duration", 0.0))
+        """Time (in seconds) the condition needs to hold for the rule to be raised."""
+        self.severity = AlertSeverity(definition.get("severity", AlertSeverity.RED.value))
+        """Severity of this rule."""
+        self.error: str = None
+        """Error message of our condition, if it's invalid. Rules with invalid conditions are never raised."""
+        self.active = False
+        """If this rule is currently raised."""
+        self.value = math.nan
+        """Result of our condition in the last evaluation (1 for true, 0 for false, NaN if undefined)."""
+        self._program: CompiledExpression = None
+        self._dependencies: tuple['InternalSensor'] = ()
+        self._holding_since: float = None
+        self._previous: np.ndarray = None
+        self._previous_timestamp = 0.0
+
+    @property
+    def holding_time(self):
+        """Time (in seconds) our condition has been holding. 0 if it doesn't hold."""
+        if self._holding_since is None:
+            return 0.0
+        return time.perf_counter() - self._holding_since
+
+    def compile(self, all_isensors: dict[str, 'InternalSensor'], isensors: list['InternalSensor']):
+        """Compiles our condition, resolving its sensors from the given ones, and subscribes to them.
+        Errors are stored in ``self.error``.
+
+        Sensors are resolved the same way as with virtual sensors: ``sensor(key)`` and ``limit(key)`` by sensor ID or by
+        full name (case-insensitive), and ``sensors(pattern)`` by a glob pattern of the ID or full name.
+        """
+        def resolve_sensor(key: str):
+            isensor = all_isensors.get(key)
+            if isensor is None:
+                key = key.lower()
+                isensor = next((isensor for isensor in isensors if isensor.full_name.lower() == key), None)
+            return None if isensor is None else isensor.index
+
+        def resolve_sensors(pattern: str):
+            pattern = pattern.lower()
+            return [isensor.index for isensor in isensors
+                    if fnmatchcase(str(isensor.id).lower(), pattern) or fnmatchcase(isensor.full_name.lower(), pattern)]
+
+        self.release()
+        self.error = None
+        try:
+            self._program = compile_expression(self.condition, resolve_sensor, resolve_sensors, conditions=True)
+        except ExpressionError as e:
+            self.error = str(e)
+            click.secho(f"AlertRule '{self.name}': invalid condition '{self.condition}': {e}", fg="red")
+            return
+        self._dependencies = tuple(isensors[index] for index in self._program.dependencies)
+        for isensor in self._dependencies:
+            isensor._add(self)
+
+    def release(self):
+        """Releases our compiled condition, unsubscribing from its sensors and resetting our state."""
+        for isensor in self._dependencies:
+            isensor._remove(self)
+        self._dependencies = ()
+        self._program = None
+        self._holding_since = None
+        self._previous = None
+        self.active = False
+        self.value = math.nan
+
+    def evaluate(self, snapshot: SensorSnapshot, values: np.ndarray, limits: np.ndarray) -> AlertEvent | None:
+        """Evaluates our condition with the values of the given snapshot, updating our state.
+
+        Rules are only evaluated if at least one of the sensors they use was polled for the snapshot.
+
+        Args:
+            snapshot (SensorSnapshot): the snapshot being evaluated.
+            values (np.ndarray): the (smoothed) values of the snapshot.
+            limits (np.ndarray): the maximum limits of the snapshot.
+
+        Returns:
+            AlertEvent: the event of this rule being raised or cleared by this evaluation. None if our state didn't change.
+        """
+        if self._program is None or not any(isensor.parent.polled for isensor in self._dependencies):
+            return None
+        timestamp = snapshot.timestamp
+        delta_time = timestamp - self._previous_timestamp if self._previous is not None else 0.0
+        self.value = value = self._program.evaluate(values, self._previous, delta_time, limits)
+        self._previous = values
+        self._previous_timestamp = timestamp
+        if value > 0:  # NaN (undefined) never holds
+            if self._holding_since is None:
+                self._holding_since = timestamp
+            holds = timestamp - self._holding_since >= self.duration
+        else:
+            self._holding_since = None
+            holds = False
+        if holds == self.active:
+            return None
+        self.active = holds
+        return AlertEvent(self, holds, time.time(), value)
+
+    # SensorSubscriber interface, for the sensors used by our condition.
+    @property
+    def enabled(self):
+        """Rules are always enabled while compiled."""
+        return True
+
+    @property
+    def polling_rate(self):
+        """Rules don't request a specific polling rate."""
+        return 0.0
+
+    def detect_change(self, value: float, generation: int) -> bool:
+        """We're evaluated by the RuleEngine after each poll, so we don't need to be notified of changes."""
+        return False
+
+    def update(self):
+        """Never called, since we never detect changes."""
+
+
+class RuleEngine:
+    """Evaluates alert rules against each poll snapshot, on the ComputerSystem update thread.
+
+    Rules are defined by ``definitions``: dicts with the ``name``, ``condition``, ``duration`` and ``severity`` of each rule.
+    They're compiled when the ComputerSystem is opened (see ``compile()``), and then evaluated after each poll (see
+    ``evaluate()``). This way, rules keep being evaluated at the polling rate regardless of the UI frame rate (or if
+    the window is minimized).
+
+    Raised and cleared alerts are logged when they happen, and queued as AlertEvents. The render thread processes
+    queued events once per frame (see ``process_events()``), notifying the listeners of each rule (such as SensorAlert nodes).
+    """
+
+    def __init__(self):
+        self.definitions: list[dict] = []
+        """Definitions of our rules: dicts with their ``name``, ``condition``, ``duration`` and ``severity`` (an AlertSeverity value)."""
+        self._rules: dict[str, AlertRule] = {}
+        self._events: deque[AlertEvent] = deque(maxlen=MAX_PENDING_ALERT_EVENTS)
+        self._listeners: dict[str, list] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def rules(self) -> list[AlertRule]:
+        """Our compiled rules, in definition order."""
+        return list(self._rules.values())
+
+    @property
+    def active_rules(self) -> list[AlertRule]:
+        """Our currently raised rules."""
+        return [rule for rule in self._rules.values() if rule.active]
+
+    def get_rule(self, name: str) -> AlertRule | None:
+        """Gets the compiled rule with the given name (case-insensitive). None if it doesn't exist or we're not compiled."""
+        return self._rules.get(name.lower())
+
+    def compile(self, all_isensors: dict[str, 'InternalSensor']):
+        """Compiles our rules, resolving the sensors they use.
+
+        This should be called after the index of all sensors is set, since compiled conditions use sensor indexes.
+
+        Args:
+            all_isensors (dict[str, InternalSensor]): all sensors of the ComputerSystem, by ID.
+        """
+        self.release()
+        isensors = list(all_isensors.values())
+        for definition in self.definitions:
+            rule = AlertRule(definition)
+            rule.compile(all_isensors, isensors)
+            self._rules[rule.name.lower()] = rule
+
+    def release(self):
+        """Releases all compiled rules, and discards pending events."""
+        for rule in self._rules.values():
+            rule.release()
+        self._rules = {}
+        self._events.clear()
+
+    def evaluate(self, snapshot: SensorSnapshot):
+        """Evaluates our rules with the given snapshot. Should be called by the update thread, after the snapshot is published.
+
+        Raised/cleared alerts are logged, and their events queued for ``process_events()``.
+        """
+        if len(self._rules) <= 0:
+            return
+        values = np.frombuffer(snapshot.smoothed, dtype=np.float64)
+        limits = np.frombuffer(snapshot.limits_max, dtype=np.float64)
+        with np.errstate(all="ignore"):
+            for rule in self._rules.values():
+                event = rule.evaluate(snapshot, values, limits)
+                if event is not None:
+                    color = "red" if rule.severity is AlertSeverity.RED else "yellow"
+                    click.secho(f"RuleEngine: {event.message} ({rule.condition})", fg=color if event.raised else "green")
+                    self._events.append(event)
+
+    def process_events(self):
+        """Processes pending alert events, notifying the listeners of each event's rule (see ``add_listener()``).
+
+        This should be called by the render thread, so listeners (and the flows they trigger) run on the same thread as the rendering.
+
+        Returns:
+            int: number of processed events.
+        """
+        events = self._events
+        count = 0
+        while len(events) > 0:
+            event = events.popleft()
+            with self._lock:
+                listeners = list(self._listeners.get(event.rule.name.lower(), ()))
+            for listener in listeners:
+                listener.on_alert(event)
+            count += 1
+        return count
+
+    def add_listener(self, name: str, listener):
+        """Adds a listener for the events of the rule with the given name (case-insensitive).
+
+        Listeners are kept by rule name, so they persist when rules are re-compiled. They need a ``on_alert(event: AlertEvent)``
+        method, which is called by ``process_events()``.
+        """
+        with self._lock:
+            self._listeners.setdefault(name.lower(), []).append(listener)
+
+    def remove_listener(self, name: str, listener):
+        """Removes a listener added with ``add_listener()``."""
+        with self._lock:
+            listeners = self._listeners.get(name.lower())
+            if listeners and listener in listeners:
+                listeners.remove(listener)
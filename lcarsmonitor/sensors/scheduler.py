@@ -0,0 +1,214 @@
+import time
+import heapq
+import click
+import itertools
+from enum import Enum
+from typing import Callable
+from lcarsmonitor.sensors.sensors_api import Hardware
+from lcarsmonitor.sensors.stats import RunningStats, P2Quantile
+
+DEFAULT_POLL_BUDGET = 0.25
+"""Default time budget (in seconds) of a single poll of a hardware. See ``PollScheduler.budget``."""
+DEFAULT_MAX_OVERRUNS = 3
+"""Default number of consecutive polls over budget that demote a hardware to a slower tier."""
+RECOVERY_POLLS = 20
+"""Number of consecutive polls within budget that promote a hardware in the slow tier back to the normal tier."""
+SLOW_TIER_FACTOR = 4.0
+"""Factor applied to the polling period of hardware in the slow tier."""
+QUARANTINE_PERIOD = 30.0
+"""Time (in seconds) between the probe polls of quarantined hardware."""
+
+
+class PollTier(Enum):
+    """Polling tier of a hardware, based on how long its polls take (see ``PollScheduler``)."""
+    NORMAL = "Normal"
+    SLOW = "Slow"
+    QUARANTINED = "Quarantined"
+
+
+class HardwareTiming:
+    """Timing of the polls of a single hardware, and its current polling tier.
+
+    Durations are tracked with streaming statistics (see ``lcarsmonitor.sensors.stats``), so they cost O(1) per poll.
+    """
+
+    __slots__ = ("last", "maximum", "stats", "p50", "p95", "p99", "overruns", "total_overruns", "good_polls", "tier")
+
+    def __init__(self):
+        self.last = 0.0
+        """Duration (in seconds) of the last poll."""
+        self.maximum = 0.0
+        """Longest poll duration (in seconds)."""
+        self.stats = RunningStats()
+        """Running count/mean/stddev of poll durations."""
+        self.p50 = P2Quantile(0.5)
+        """Estimated median poll duration."""
+        self.p95 = P2Quantile(0.95)
+        """Estimated 95th percentile of poll durations."""
+        self.p99 = P2Quantile(0.99)
+        """Estimated 99th percentile of poll durations."""
+        self.overruns = 0
+        """Number of consecutive polls over budget."""
+        self.total_overruns = 0
+        """Total number of polls over budget."""
+        self.good_polls = 0
+        """Number of consecutive polls within budget."""
+        self.tier = PollTier.NORMAL
+        """Current polling tier of the hardware."""
+
+    @property
+    def count(self):
+        """Number of timed polls."""
+        return self.stats.count
+
+    def add(self, duration: float):
+        """Adds the duration (in seconds) of a poll."""
+        self.last = duration
+        self.maximum = max(self.maximum, duration)
+        self.stats.add(duration)
+        self.p50.add(duration)
+        self.p95.add(duration)
+        self.p99.add(duration)
+
+
+class PollScheduler:
+    """Deadline-based scheduler for polling hardware at different rates.
+
+    Each hardware (including sub-hardware) has its own polling period, and the scheduler keeps a priority queue
+    of the next deadline at which each hardware should be polled. The ComputerSystem update thread repeatedly
+    polls the hardware that are due (``poll_due()``), and then waits until the next deadline (``next_deadline``).
+
+    Deadlines are drift-corrected: a hardware's next deadline is its previous deadline plus its period, regardless
+    of how long the poll itself took. So the effective polling period doesn't stretch under load. If a hardware
+    falls behind by more than a full period, it is rescheduled relative to the current time instead, so it doesn't
+    burst several polls to catch up.
+
+    Each poll is timed (see ``get_timing()``). Since polls can't be interrupted, a slow or hung hardware (such as a sleeping
+    disk) delays the polls of all other hardware. So hardware whose polls repeatedly take longer than our ``budget`` are
+    demoted to a slower tier, polled less often, and then quarantined: only polled once in a while, as a probe. Hardware are
+    promoted back when their polls are within budget again. This way, a single bad hardware can't drag down the refresh
+    rate of all other sensors.
+    """
+
+    def __init__(self, get_period: Callable[[Hardware], float]):
+        self.get_period = get_period
+        """Callable that returns the current polling period (in seconds) of the given hardware."""
+        self.budget = DEFAULT_POLL_BUDGET
+        """Time budget (in seconds) of a single poll of a hardware. If 0, polls have no budget and tiers are disabled."""
+        self.max_overruns = DEFAULT_MAX_OVERRUNS
+        """Number of consecutive polls over budget that demote a hardware to a slower tier."""
+        self.last_batch_time = 0.0
+        """Duration (in seconds) of the last ``poll_due()`` call that polled any hardware."""
+        self._hardware: list[Hardware] = []
+        self._queue: list[tuple[float, int, Hardware]] = []
+        self._counter = itertools.count()
+        self._timings: dict[str, HardwareTiming] = {}
+
+    def reset(self, hardware: list[Hardware], now: float):
+        """Resets this scheduler with the given hardware, scheduling all of them to be polled at NOW."""
+        self._hardware = list(hardware)
+        self._queue = [(now, next(self._counter), hw) for hw in self._hardware]
+        heapq.heapify(self._queue)
+
+    def clear(self):
+        """Clears this scheduler, removing all hardware. Hardware timings are kept (see ``clear_timings()``)."""
+        self._hardware.clear()
+        self._queue.clear()
+
+    def clear_timings(self):
+        """Clears the timings of all hardware, which also resets them to the normal tier."""
+        self._timings.clear()
+
+    def get_timing(self, hw: Hardware) -> HardwareTiming:
+        """Gets the poll timing of the given hardware."""
+        timing = self._timings.get(hw.id)
+        if timing is None:
+            timing = self._timings[hw.id] = HardwareTiming()
+        return timing
+
+    def get_tier_period(self, hw: Hardware) -> float:
+        """Gets the polling period (in seconds) of the given hardware, according to its tier."""
+        period = self.get_period(hw)
+        tier = self.get_timing(hw).tier
+        if tier is PollTier.SLOW:
+            return period * SLOW_TIER_FACTOR
+        if tier is PollTier.QUARANTINED:
+            return max(period, QUARANTINE_PERIOD)
+        return period
+
+    def release(self, hw: Hardware):
+        """Moves the given hardware back to the normal tier. Takes effect on its next poll (or on the next ``reset()``)."""
+        timing = self.get_timing(hw)
+        timing.tier = PollTier.NORMAL
+        timing.overruns = timing.good_polls = 0
+
+    @property
+    def next_deadline(self) -> float | None:
+        """Time (in ``time.perf_counter()`` terms) of the next deadline. None if we have no hardware."""
+        if len(self._queue) <= 0:
+            return None
+        return self._queue[0][0]
+
+    def poll_due(self, now: float, force: bool = False):
+        """Polls all hardware whose deadline is due (at or before NOW), and reschedules them.
+
+        The ``polled`` flag of all hardware is updated: it'll be True only for hardware that were actually polled here.
+        A due hardware is only polled if it needs polling (see ``Hardware.needs_polling``), or if FORCE is True.
+
+        Args:
+            now (float): current time (from ``time.perf_counter()``).
+            force (bool, optional): if True, due hardware are polled even if they don't have subscribers. Defaults to False.
+
+        Returns:
+            list[Hardware]: the hardware that were polled.
+        """
+        for hw in self._hardware:
+            hw.polled = False
+        polled: list[Hardware] = []
+        queue = self._queue
+        while len(queue) > 0 and queue[0][0] <= now:
+            deadline, _, hw = heapq.heappop(queue)
+            if force or hw.needs_polling:
+                start = time.perf_counter()
+                hw.poll()
+                self._record_poll(hw, time.perf_counter() - start)
+                hw.polled = True
+                polled.append(hw)
+            period = self.get_tier_period(hw)
+            next_deadline = deadline + period
+            if next_deadline <= now:
+                next_deadline = now + period
+            heapq.heappush(queue, (next_deadline, next(self._counter), hw))
+        if len(polled) > 0:
+            self.last_batch_time = time.perf_counter() - now
+        return polled
+
+    def _record_poll(self, hw: Hardware, duration: float):
+        """Records the duration of a poll of the given hardware, updating its tier according to our budget."""
+        timing = self.get_timing(hw)
+        timing.add(duration)
+        if self.budget <= 0:
+            timing.tier = PollTier.NORMAL
+            timing.overruns = timing.good_polls = 0
+            return
+        previous_tier = timing.tier
+        if duration > self.budget:
+            timing.overruns += 1
+            timing.total_overruns += 1
+            timing.good_polls = 0
+            if timing.overruns >= self.max_overruns and timing.tier is not PollTier.QUARANTINED:
+                timing.tier = PollTier.SLOW if timing.tier is PollTier.NORMAL else PollTier.QUARANTINED
+                timing.overruns = 0
+        else:
+            timing.overruns = 0
+            timing.good_polls += 1
+            if timing.tier is PollTier.QUARANTINED:
+                # probe poll was within budget
+                timing.tier = PollTier.SLOW
+                timing.good_polls = 0
+            elif timing.tier is PollTier.SLOW and timing.good_polls >= RECOVERY_POLLS:
+                timing.tier = PollTier.NORMAL
+        if timing.tier is not previous_tier:
+            color = "green" if timing.tier is PollTier.NORMAL else "yellow"
+            click.secho(f"PollScheduler: hardware '{hw.full_name}' moved to {timing.tier.value} tier "
+                        f"(last poll took {duration * 1000:.0f}ms, budget is {self.budget * 1000:.0f}ms).", fg=color)
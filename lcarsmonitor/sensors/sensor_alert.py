@@ -0,0 +1,91 @@
+from libasvat.imgui.colors import Color
+from libasvat.imgui.nodes import PinKind, Node, input_property, output_property
+from lcarsmonitor.sensors.sensors import ComputerSystem
+from lcarsmonitor.sensors.rules import AlertEvent, AlertRule
+
+
+class SensorAlert(Node):
+    """Reacts to an alert rule of the ComputerSystem being raised or cleared.
+
+    Alert rules are conditions over sensor values (such as "CPU temperature above its limit for 10 seconds"), defined in the
+    ComputerSystem settings. They're evaluated by the ComputerSystem update thread after each poll, so this node doesn't
+    compare any values itself: it's only notified, on the render thread, when its rule is raised or cleared.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self._rule_name = ""
+        self._last_event: AlertEvent = None
+        self.node_header_color = Color(0.4, 0, 0, 0.6)
+        self.node_bg_color = Color(0.2, 0.12, 0.12, 0.75)
+        from lcarsmonitor.actions import ActionFlow
+        self._on_raised_pin = ActionFlow(self, PinKind.output, "On Raised")
+        self._on_raised_pin.pin_tooltip = "Triggered when our alert rule is raised."
+        self.add_pin(self._on_raised_pin)
+        self._on_cleared_pin = ActionFlow(self, PinKind.output, "On Cleared")
+        self._on_cleared_pin.pin_tooltip = "Triggered when our alert rule is cleared."
+        self.add_pin(self._on_cleared_pin)
+        self.create_data_pins_from_properties()
+        self._update_title()
+
+    # ======= INPUT PROPERTIES (User settings)
+    @input_property()
+    def rule_name(self) -> str:
+        """Name of the alert rule to react to (case-insensitive). [GET/SET]"""
+        return self._rule_name
+
+    @rule_name.setter
+    def rule_name(self, value: str):
+        rules = ComputerSystem().rules
+        if self._rule_name:
+            rules.remove_listener(self._rule_name, self)
+        self._rule_name = value or ""
+        if self._rule_name:
+            rules.add_listener(self._rule_name, self)
+        self._last_event = None
+        self._update_title()
+
+    # ======= OUTPUT PROPERTIES (Alert data)
+    @output_property(use_prop_value=True)
+    def active(self) -> bool:
+        """If our alert rule is currently raised."""
+        rule = self.rule
+        return rule is not None and rule.active
+
+    @output_property(use_prop_value=True)
+    def severity(self) -> str:
+        """Severity of our alert rule (``RED`` or ``YELLOW``, same as the types of the Alert widget). None if the rule doesn't exist."""
+        rule = self.rule
+        return rule and rule.severity.value
+
+    @output_property(use_prop_value=True)
+    def message(self) -> str:
+        """Message of the last event (raised or cleared) of our rule. None if no events happened since this node was set."""
+        return self._last_event and self._last_event.message
+
+    # ======= PROPERTIES
+    @property
+    def rule(self) -> AlertRule | None:
+        """The compiled alert rule we react to. None if it doesn't exist, or the ComputerSystem isn't active."""
+        if not self._rule_name:
+            return None
+        return ComputerSystem().rules.get_rule(self._rule_name)
+
+    # ======= METHODS
+    def on_alert(self, event: AlertEvent):
+        """Called by the ComputerSystem's RuleEngine, on the render thread, when our rule is raised or cleared.
+        Triggers our On Raised or On Cleared flow."""
+        self._last_event = event
+        if event.raised:
+            self._on_raised_pin.trigger()
+        else:
+            self._on_cleared_pin.trigger()
+
+    def delete(self):
+        super().delete()
+        if self._rule_name:
+            ComputerSystem().rules.remove_listener(self._rule_name, self)
+
+    def _update_title(self):
+        """Updates our node title with our rule name."""
+        self.node_title = f"Sensor Alert\n{self._rule_name or '<no rule>'}"
@@ -0,0 +1,278 @@
+import numpy as np
+from fnmatch import fnmatchcase
+from libasvat.imgui.colors import Color
+from libasvat.imgui.nodes import PinKind, Node, input_property, output_property
+from lcarsmonitor.sensors.sensors import ComputerSystem
+from lcarsmonitor.sensors.sensors_api import InternalSensor
+from lcarsmonitor.sensors.snapshot import SensorSnapshot
+
+_EMPTY_REDUCTION = (0, None, None, None, None, None)
+"""Reduction of a group without values: ``(count, minimum, maximum, average, total, argmax_isensor)``."""
+
+
+def _get_selector(indexes: list[int]) -> slice | np.ndarray:
+    """Gets the object to select the given (sorted) sensor indexes from a numpy array of sensor values.
+
+    Sensors are indexed in hardware order, so groups usually select consecutive indexes. In that case a slice is returned,
+    which selects a view of the values instead of copying them. Otherwise, an array of the indexes is returned."""
+    if len(indexes) > 0 and indexes[-1] - indexes[0] == len(indexes) - 1:
+        return slice(indexes[0], indexes[-1] + 1)
+    return np.array(indexes, dtype=np.intp)
+
+
+_NO_MEMBERS: tuple[tuple[InternalSensor], slice | np.ndarray] = ((), _get_selector([]))
+"""Members of a group without sensors: ``(isensors, selector)``."""
+
+
+def _reduce(members: tuple[tuple[InternalSensor], slice | np.ndarray], snapshot: SensorSnapshot):
+    """Computes the reduction of the values of the given group members (a ``(isensors, selector)`` tuple) in the given snapshot.
+
+    Returns:
+        tuple: the ``(count, minimum, maximum, average, total, argmax_isensor)`` reduction.
+    """
+    isensors, selector = members
+    values = np.frombuffer(snapshot.smoothed, dtype=np.float64)
+    if len(isensors) <= 0 or len(values) <= isensors[-1].index:
+        return _EMPTY_REDUCTION
+    values = values[selector]
+    valid = ~np.isnan(values)
+    count = int(np.count_nonzero(valid))
+    if count <= 0:
+        return _EMPTY_REDUCTION
+    if count < len(values):
+        positions = np.flatnonzero(valid)
+        values = values[positions]
+    else:
+        positions = None
+    argmax = int(np.argmax(values))
+    total = float(values.sum())
+    argmax_isensor = isensors[argmax if positions is None else int(positions[argmax])]
+    return (count, float(values.min()), float(values[argmax]), total / count, total, argmax_isensor)
+
+
+class SensorGroup(Node):
+    """Aggregates the values of a group of sensors, such as "hottest CPU core", "average GPU load" or "total disk throughput".
+
+    Sensors are selected by their hardware, type and name (see our input properties), and the group outputs the
+    maximum/minimum/average/total of their values, and which sensor has the maximum value. At least one of the selection
+    properties needs to be set: a group without any selection selects no sensors.
+
+    The group subscribes to its sensors as a Sensor node would, so their hardware are polled. Reductions are computed
+    once per poll by the ComputerSystem update thread, with vectorized NumPy operations over the values of the group's
+    sensors in the poll's ``SensorSnapshot``. The selection of sensors is only resolved again (by the render thread) when
+    our selection properties change, or when the sensor catalog changes (such as when the ComputerSystem is re-opened).
+    Resolved members are published as a single immutable ``(isensors, selector)`` tuple, which the update thread only reads.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self._catalog = None
+        self._selection_key: tuple = None
+        self._members = _NO_MEMBERS
+        # Written only by the update thread: the (members, generation, reduction) of the latest reduction.
+        self._reduced: tuple = (_NO_MEMBERS, 0, _EMPTY_REDUCTION)
+        # Written only by the render thread: reduction of our members when they were resolved, used until the next poll.
+        self._resolved_reduction = _EMPTY_REDUCTION
+        self._is_enabled = True
+        self._changed_generation = 0
+        self._notified_generation = 0
+        self.node_header_color = Color(0.3, 0, 0, 0.6)
+        self.node_bg_color = Color(0.2, 0.12, 0.12, 0.75)
+        from lcarsmonitor.actions import ActionFlow
+        self._on_update_pin = ActionFlow(self, PinKind.output, "On Update")
+        self._on_update_pin.pin_tooltip = "Triggered when the values of this group change, after a poll of its sensors."
+        self.add_pin(self._on_update_pin)
+        self.create_data_pins_from_properties()
+        self._resolve_members()
+
+    # ======= INPUT PROPERTIES (User settings)
+    @input_property()
+    def hardware_filter(self) -> str:
+        """Selects sensors by their hardware. [GET/SET]
+
+        Sensors whose hardware full-name or type contains this text (case-insensitive) are selected, such as ``CPU``.
+        If empty (the default), sensors aren't filtered by their hardware.
+        """
+        return ""
+
+    @hardware_filter.setter
+    def hardware_filter(self, value: str):
+        self._resolve_members()
+
+    @input_property()
+    def sensor_type(self) -> str:
+        """Selects sensors by their type, such as ``Temperature`` or ``Load`` (case-insensitive). [GET/SET]
+
+        If empty (the default), sensors aren't filtered by their type.
+        """
+        return ""
+
+    @sensor_type.setter
+    def sensor_type(self, value: str):
+        self._resolve_members()
+
+    @input_property()
+    def name_pattern(self) -> str:
+        """Selects sensors by their name, with a glob pattern (case-insensitive), such as ``CPU Core #*``. [GET/SET]
+
+        If empty (the default), sensors aren't filtered by their name.
+        """
+        return ""
+
+    @name_pattern.setter
+    def name_pattern(self, value: str):
+        self._resolve_members()
+
+    @input_property()
+    def enabled(self) -> bool:
+        """If this group is enabled. [GET/SET]
+
+        Like with Sensor nodes, the hardware of our sensors is only polled for us while we're enabled. This defaults to True.
+        """
+        return True
+
+    @enabled.setter
+    def enabled(self, value: bool):
+        # Cached for detect_change(), which runs on the update thread.
+        self._is_enabled = bool(value)
+
+    @input_property()
+    def polling_rate(self) -> float:
+        """Polling rate requested by this group for its sensors, in updates per second. [GET/SET]
+
+        Same as ``Sensor.polling_rate``. If 0 (the default), this group doesn't request a specific rate.
+        """
+        return 0.0
+
+    # ======= OUTPUT PROPERTIES (Group data)
+    @output_property(use_prop_value=True)
+    def count(self) -> int:
+        """Number of sensors in this group that currently have a value."""
+        return self.reduction[0]
+
+    @output_property(use_prop_value=True)
+    def minimum(self) -> float:
+        """Lowest current value amongst our sensors. None if no sensor has a value."""
+        return self.reduction[1]
+
+    @output_property(use_prop_value=True)
+    def maximum(self) -> float:
+        """Highest current value amongst our sensors. None if no sensor has a value."""
+        return self.reduction[2]
+
+    @output_property(use_prop_value=True)
+    def average(self) -> float:
+        """Average of the current values of our sensors. None if no sensor has a value."""
+        return self.reduction[3]
+
+    @output_property(use_prop_value=True)
+    def total(self) -> float:
+        """Sum of the current values of our sensors. None if no sensor has a value."""
+        return self.reduction[4]
+
+    @output_property(use_prop_value=True)
+    def argmax(self) -> str:
+        """Name of the sensor with the highest current value (such as the hottest core). None if no sensor has a value."""
+        isensor = self.reduction[5]
+        return isensor and isensor.name
+
+    # ======= PROPERTIES
+    @property
+    def members(self) -> tuple[InternalSensor]:
+        """The InternalSensors selected by this group, ordered by their index."""
+        self._resolve_members()
+        return self._members[0]
+
+    @property
+    def reduction(self):
+        """The latest reduction of our sensor values, as a ``(count, minimum, maximum, average, total, argmax_isensor)`` tuple."""
+        self._resolve_members()
+        members, _, reduction = self._reduced
+        if members is not self._members:
+            # Not reduced by the update thread since our members were resolved.
+            return self._resolved_reduction
+        return reduction
+
+    # ======= METHODS
+    def detect_change(self, value: float, generation: int) -> bool:
+        """Checks if the values of this group changed in the snapshot of the given generation.
+
+        Called by the InternalSensors of our members from the ComputerSystem update thread, after each poll, the same way as
+        ``Sensor.detect_change()``. Our reduction is computed by the first call of each generation, and the other calls
+        only return its result. This only reads our members, which are resolved by the render thread.
+
+        Args:
+            value (float): new value of the calling sensor. Not used, since the whole group is reduced from the snapshot.
+            generation (int): generation of the snapshot with the new values.
+
+        Returns:
+            bool: if our reduction changed in this generation. Always False if this group is not enabled.
+        """
+        if not self._is_enabled:
+            return False
+        members = self._members
+        reduced_members, reduced_generation, previous = self._reduced
+        if members is not reduced_members or generation != reduced_generation:
+            reduction = _reduce(members, ComputerSystem().snapshot)
+            self._reduced = (members, generation, reduction)
+            if reduction != previous:
+                self._changed_generation = generation
+        return self._changed_generation == generation
+
+    def update(self):
+        """Triggers our On Update flow, if our values changed since the last update.
+
+        Called by the InternalSensors of our members when the ComputerSystem processes their update events, on the render thread.
+        Multiple members may call this for the same poll, but the flow is only triggered once per changed poll.
+        """
+        if not self.enabled:
+            return
+        generation = self._changed_generation
+        if generation <= self._notified_generation:
+            return
+        self._notified_generation = generation
+        self._on_update_pin.trigger()
+
+    def delete(self):
+        super().delete()
+        self._set_members([])
+
+    def _resolve_members(self):
+        """Selects our member sensors from the ComputerSystem's sensor catalog, according to our selection properties.
+        This should only be called by the render thread.
+
+        Only does anything if our selection properties or the catalog changed since the last time our members were resolved."""
+        catalog = ComputerSystem().sensor_index
+        key = ((self.hardware_filter or "").lower(), (self.sensor_type or "").lower(), (self.name_pattern or "").lower())
+        if catalog is self._catalog and key == self._selection_key:
+            return
+        self._catalog = catalog
+        self._selection_key = key
+        hardware_filter, sensor_type, name_pattern = key
+        isensors: list[InternalSensor] = []
+        # Without any selection, we select nothing, instead of subscribing to every sensor.
+        for hw, hw_isensors in (catalog.isensors.items() if any(key) else ()):
+            if hardware_filter and hardware_filter not in hw.full_name.lower() and hardware_filter not in str(hw.type).lower():
+                continue
+            for isensor in hw_isensors:
+                if isensor.index < 0:  # sensor isn't used by the ComputerSystem (it's closed)
+                    continue
+                if sensor_type and str(isensor.type).lower() != sensor_type:
+                    continue
+                if name_pattern and not fnmatchcase(isensor.name.lower(), name_pattern):
+                    continue
+                isensors.append(isensor)
+        self._set_members(sorted(isensors, key=lambda isensor: isensor.index))
+        self._resolved_reduction = _reduce(self._members, ComputerSystem().snapshot)
+        selection = " ".join(text for text in (self.hardware_filter, self.name_pattern, self.sensor_type) if text) or "<no selection>"
+        self.node_title = f"Sensor Group\n{selection} ({len(isensors)})"
+
+    def _set_members(self, isensors: list[InternalSensor]):
+        """Sets our member sensors, subscribing to their updates (and unsubscribing from previous members).
+        Our new members are published as a single tuple, so the update thread always sees a consistent ``(isensors, selector)``."""
+        previous = self._members[0]
+        for isensor in previous:
+            isensor._remove(self)
+        for isensor in isensors:
+            isensor._add(self)
+        self._members = (tuple(isensors), _get_selector([isensor.index for isensor in isensors]))
@@ -1,12 +1,17 @@
 import re
 import math
+import time
 import click
 from enum import Enum
-from libasvat.imgui.math import Vector2, multiple_lerp_with_weigths
+from functools import lru_cache
+from libasvat.imgui.math import Vector2
 from libasvat.imgui.colors import Colors, Color
 from libasvat.imgui.nodes import PinKind, Node, input_property, output_property
 from lcarsmonitor.sensors.sensors import ComputerSystem
 from lcarsmonitor.sensors.sensors_api import SensorID, SensorUnit, Hardware, InternalSensor
+from lcarsmonitor.sensors.deadband import ChangeDetector
+from lcarsmonitor.sensors.smoothing import SmoothingFilter
+from lcarsmonitor.sensors.gradients import ColorGradient, get_unit_gradient
 
 
 class SensorLimitsType(Enum):
@@ -33,6 +38,65 @@ class SensorLimitsType(Enum):
     and the first option that is valid will be used. This is the default limits type used."""
 
 
+SENSOR_ATTRIBUTE_CONVERSIONS = {
+    "min": "minimum",
+    "max": "maximum",
+    "identifier": "id",
+    "fvalue": "formatted_value"
+}
+"""Aliases of Sensor attributes that can be used with ``Sensor.get_attribute()`` and ``Sensor.format()``."""
+
+
+@lru_cache(maxsize=256)
+def _resolve_attribute_key(key: str):
+    """Gets the name of the Sensor attribute for the given key (case-insensitive, may be an alias). Cached by key."""
+    key = key.lower()
+    return SENSOR_ATTRIBUTE_CONVERSIONS.get(key, key)
+
+
+class SensorFormatTemplate:
+    """A compiled format string for ``Sensor.format()``.
+
+    The format string is parsed once into a list of literal text chunks and ``{key}`` tags. Each tag is resolved to the
+    Sensor attribute to read and its format spec. Rendering a sensor with the template then only reads these attributes
+    and joins the resulting strings.
+
+    Templates are immutable and don't depend on a specific sensor. Use ``SensorFormatTemplate.get()`` to get the cached
+    template of a format string.
+    """
+
+    TAG_PATTERN = re.compile(r"{([^}]+)}")
+    """Regex of the ``{key}`` or ``{key:spec}`` tags in format strings."""
+
+    def __init__(self, format: str):
+        self.format = format
+        """The format string of this template."""
+        self._literals: list[str] = []
+        self._tags: list[tuple[str, str]] = []
+        position = 0
+        for match in self.TAG_PATTERN.finditer(format):
+            self._literals.append(format[position:match.start()])
+            parts = match.group(1).split(":")
+            self._tags.append((_resolve_attribute_key(parts[0]), parts[1] if len(parts) > 1 else ""))
+            position = match.end()
+        self._literals.append(format[position:])
+
+    @classmethod
+    @lru_cache(maxsize=256)
+    def get(cls, format: str) -> 'SensorFormatTemplate':
+        """Gets the template for the given format string. Templates are cached (LRU) by format string."""
+        return cls(format)
+
+    def render(self, sensor: 'Sensor'):
+        """Generates the formatted string with the data of the given Sensor. See ``Sensor.format()``."""
+        literals = self._literals
+        chunks = [literals[0]]
+        for (key, spec), literal in zip(self._tags, literals[1:]):
+            chunks.append(format(getattr(sensor, key, None), spec))
+            chunks.append(literal)
+        return "".join(chunks)
+
+
 class Sensor(Node):
     """Represents a single Sensor for a hardware device.
 
@@ -46,19 +110,31 @@ class Sensor(Node):
     This class uses an InternalSensor for accessing the C# ISensor interface for the sensor with its given ID.
     As such, multiple Sensor nodes can be used with the same InternalSensor object. This is particularly useful since
     InternalSensor objects are unique for a given sensor, and are maintained by the singleton `ComputerSystem`.
+
+    Sensor data (value, min/max and limits) is read from the latest ``SensorSnapshot`` published by the `ComputerSystem`,
+    so it's safe to read it from the render thread while the sensors are being polled.
     """
 
     def __init__(self, id: SensorID = None):
         super().__init__()
         # FIXED SENSOR-RELATED ATTRIBUTES
         self._isensor: InternalSensor = None
+        self._change_detector = ChangeDetector()
+        # Copies of our change detection settings, set by their setters, for detect_change() in the update thread.
+        self._is_enabled = True
+        self._deadband = 0.0
+        self._relative_deadband = 0.0
+        self._hysteresis = 0.0
+        self._changed_generation = 0
+        self._notified_generation = 0
         self.id = id
         # NODE-RELATED ATTRIBUTES
         self.node_header_color = Color(0.3, 0, 0, 0.6)
         self.node_bg_color = Color(0.2, 0.12, 0.12, 0.75)
         from lcarsmonitor.actions import ActionFlow
         self._on_update_pin = ActionFlow(self, PinKind.output, "On Update")
-        self._on_update_pin.pin_tooltip = "Triggered when this Sensor is updated, getting a new value from the hardware."
+        self._on_update_pin.pin_tooltip = "Triggered when this Sensor is updated, getting a new value from the hardware.\n\n"
+        self._on_update_pin.pin_tooltip += "Only triggered when the value changes beyond our deadband settings."
         self.add_pin(self._on_update_pin)
         self.create_data_pins_from_properties()
 
@@ -99,6 +175,90 @@ class Sensor(Node):
         """
         return True  # data-pin from input_property holds our value. This is the default/initial value.
 
+    @enabled.setter
+    def enabled(self, value: bool):
+        self._is_enabled = bool(value)
+
+    @input_property()
+    def polling_rate(self) -> float:
+        """Polling rate requested by this sensor, in updates per second. [GET/SET]
+
+        Our hardware will be polled at least at this rate, even if its own rate (or the ComputerSystem's default rate) is lower.
+        If 0 (the default), this sensor doesn't request a specific rate.
+        """
+        return 0.0
+
+    @input_property()
+    def deadband(self) -> float:
+        """Absolute deadband for detecting changes in our value, in the sensor's unit. [GET/SET]
+
+        On Update is only triggered when our value changes by more than the deadband (from the last value that triggered it).
+        If 0 (the default), any change of value triggers an update. See also ``self.relative_deadband``.
+        """
+        return 0.0
+
+    @deadband.setter
+    def deadband(self, value: float):
+        self._deadband = float(value)
+
+    @input_property()
+    def relative_deadband(self) -> float:
+        """Relative deadband for detecting changes in our value, as a fraction of the last updated value. [GET/SET]
+
+        For example, 0.05 only triggers On Update when the value changes by more than 5%. The largest of ``self.deadband`` and
+        this relative deadband is used. If 0 (the default), only the absolute deadband is used.
+        """
+        return 0.0
+
+    @relative_deadband.setter
+    def relative_deadband(self, value: float):
+        self._relative_deadband = float(value)
+
+    @input_property()
+    def hysteresis(self) -> float:
+        """Hysteresis for detecting changes in our value, in the sensor's unit. [GET/SET]
+
+        Changes that reverse the direction of the last updated change (such as a decrease after an increase) need to exceed
+        the deadband plus this amount. This avoids flapping updates when a value oscillates around some point. Defaults to 0.
+        """
+        return 0.0
+
+    @hysteresis.setter
+    def hysteresis(self, value: float):
+        self._hysteresis = float(value)
+
+    @input_property()
+    def smoothing(self) -> SmoothingFilter:
+        """Smoothing filter applied to the sensor's values. [GET/SET]
+
+        * NONE: no smoothing, values are used as measured (the default).
+        * EMA: exponential moving average.
+        * MEDIAN: median of the last N values. Removes spikes without lagging as much as the averages.
+        * KALMAN: simple 1D Kalman filter, assuming a mostly constant value with noisy measurements.
+
+        Smoothing is applied by the ComputerSystem to all sensors at once after each poll, so our ``value`` (and other outputs
+        based on it) is the smoothed value. The filter belongs to the sensor itself, so it's shared by all Sensor nodes of the
+        same sensor: the last filter set by any of them is used. See also ``self.smoothing_strength``.
+        """
+        return SmoothingFilter.NONE
+
+    @smoothing.setter
+    def smoothing(self, value: SmoothingFilter):
+        self._update_smoothing(value, self.smoothing_strength)
+
+    @input_property()
+    def smoothing_strength(self) -> float:
+        """Strength of our smoothing filter, in [0, 1]. Higher values smooth more, but lag more behind the actual value. [GET/SET]
+
+        Strengths are capped slightly below 1 (see ``BatchSmoother.MAX_STRENGTH``), so the filter always follows new values.
+        Defaults to 0.5.
+        """
+        return 0.5
+
+    @smoothing_strength.setter
+    def smoothing_strength(self, value: float):
+        self._update_smoothing(self.smoothing, value)
+
     @input_property()
     def limits_type(self) -> SensorLimitsType:
         """How to define this sensor's min/max limits. [GET/SET]
@@ -120,6 +280,15 @@ class Sensor(Node):
         """
         return Vector2()
 
+    @input_property()
+    def gradient_colors(self) -> list[Color]:
+        """Custom color gradient used by ``self.state_color``, from our minimum to maximum limits. [GET/SET]
+
+        The colors are evenly spread between the limits. If empty (the default), the default gradient of our unit is used
+        (see ``lcarsmonitor.sensors.gradients.UNIT_GRADIENT_STOPS``).
+        """
+        return []
+
     # ======= OUTPUT PROPERTIES (Sensor data)
     @output_property(use_prop_value=True)
     def name(self) -> str:
@@ -141,8 +310,15 @@ class Sensor(Node):
 
     @output_property(use_prop_value=True)
     def value(self) -> float:
-        """The current value of this sensor."""
-        return self.isensor and self.isensor.value
+        """The current value of this sensor, after smoothing (see ``self.smoothing``)."""
+        isensor = self.isensor
+        return isensor and ComputerSystem().snapshot.get_smoothed_value(isensor.index)
+
+    @output_property(use_prop_value=True)
+    def raw_value(self) -> float:
+        """The current value of this sensor, as measured (without smoothing)."""
+        isensor = self.isensor
+        return isensor and ComputerSystem().snapshot.get_value(isensor.index)
 
     @output_property(use_prop_value=True)
     def formatted_value(self) -> str:
@@ -170,7 +346,41 @@ class Sensor(Node):
         """Gets the minimum/maximum sensor values as a (min, max) vector2.
 
         These are the min/max values recorded by the sensor since the start of this our measurement."""
-        return self.isensor and self.isensor.value_range or Vector2(math.inf, -math.inf)
+        isensor = self.isensor
+        return isensor and ComputerSystem().snapshot.get_value_range(isensor.index) or Vector2(math.inf, -math.inf)
+
+    @output_property(use_prop_value=True)
+    def avg_1m(self) -> float:
+        """Moving average of this sensor's value over the last minute (exponentially weighted).
+
+        Like the other statistics, this is computed once per poll by the ComputerSystem, and is shared by all Sensor nodes
+        of the same sensor. None if we have no values yet."""
+        stats = self.isensor and self.isensor.stats
+        return self._stat_or_none(stats and stats.average.value)
+
+    @output_property(use_prop_value=True)
+    def p95_5m(self) -> float:
+        """Estimated 95th percentile of this sensor's value, over windows of 5 minutes.
+
+        This is the percentile of the last complete 5-minute window, or of the current window while the first one isn't
+        complete. None if we have no values yet."""
+        stats = self.isensor and self.isensor.stats
+        return self._stat_or_none(stats and stats.percentile.value)
+
+    @output_property(use_prop_value=True)
+    def stddev(self) -> float:
+        """Standard deviation of this sensor's value, since measurements started. None if we have no values yet."""
+        stats = self.isensor and self.isensor.stats
+        if not stats or stats.running.count <= 0:
+            return None
+        return stats.running.stddev
+
+    @property
+    def history(self):
+        """Gets the SensorHistory of this sensor: raw samples and 1s/10s/60s min/max/avg rollups of its values.
+
+        This is shared by all Sensor nodes of the same sensor. May be None if we have no sensor."""
+        return self.isensor and self.isensor.history
 
     @output_property(use_prop_value=True)
     def type(self) -> str:
@@ -244,11 +454,22 @@ class Sensor(Node):
     def state_color(self) -> Color:
         """Gets the imgui color of this sensor, based on its current value and limits.
 
-        This uses a few color ranges according to our unit, to interpolate from using ``self.percent_value``
-        and generate the final color. Not all units supports this, in which case color defaults to white.
+        This uses our color gradient (see ``self.color_gradient``), indexed by ``self.percent_value``.
+        Not all units have a gradient, in which case color defaults to white.
         """
         return self.get_color_for_value(self.value)
 
+    @property
+    def color_gradient(self) -> ColorGradient:
+        """Gets the color gradient used for our values: the ``self.gradient_colors`` set by the user, or the default
+        gradient of our unit. None if we have no custom colors and our unit has no gradient.
+
+        Gradients are compiled to lookup tables once, and cached."""
+        colors = self.gradient_colors
+        if colors:
+            return ColorGradient.from_colors(colors)
+        return get_unit_gradient(self.unit)
+
     @output_property()
     def minmax_ever(self) -> Vector2:
         """Gets the minimum/maximum sensor values ever recorded as a (min, max) vector2.
@@ -261,17 +482,9 @@ class Sensor(Node):
 
     # ======= METHODS
     def get_attribute(self, key: str):
-        """Gets the property of this sensor whose name matches the given key"""
-        conversions = {
-            "min": "minimum",
-            "max": "maximum",
-            "identifier": "id",
-            "fvalue": "formatted_value"
-        }
-        key = key.lower()
-        key = conversions.get(key, key)
-        if hasattr(self, key):
-            return getattr(self, key)
+        """Gets the property of this sensor whose name matches the given key (case-insensitive).
+        Aliases from ``SENSOR_ATTRIBUTE_CONVERSIONS`` are also accepted. Returns None if no property matches."""
+        return getattr(self, _resolve_attribute_key(key), None)
 
     # TODO: virar action
     def format(self, format: str):
@@ -283,24 +496,47 @@ class Sensor(Node):
             The tag can include python format specifiers. For example, to get the sensor's value with 3
             decimal plates: ``{value:.3f}``.
 
+            The format string is compiled once into a cached ``SensorFormatTemplate``, so this is cheap to call every frame.
+
         Returns:
             str: the generated formatted string.
         """
-        def replace(m: re.Match):
-            pack: str = m.group(1)
-            parts = pack.split(":")
-            var_name = parts[0]
-            if len(parts) <= 1:
-                entry_format = "{}"
-            else:
-                entry_format = f"{{:{parts[1]}}}"
-            return entry_format.format(self.get_attribute(var_name))
-
-        return re.sub(r"{([^}]+)}", replace, format)
+        return SensorFormatTemplate.get(format).render(self)
+
+    def get_stored_history(self, duration: float, bucket: float = None):
+        """Gets the values of this sensor in the last DURATION seconds from the ComputerSystem's persistent time-series store,
+        aggregated in buckets. Unlike ``self.history``, this may span past executions of the app.
+
+        Args:
+            duration (float): time range to get, in seconds until now. For example, ``7 * 24 * 3600`` for the last week.
+            bucket (float, optional): duration (in seconds) of each bucket. Defaults to the resolution of the stored data for
+                the given range.
+
+        Returns:
+            list[tuple[float, float, float, float]]: ``(time, minimum, maximum, average)`` of each bucket, ordered by time
+            (wall-clock time, in seconds since the epoch). Empty if we have no sensor or the store is disabled.
+        """
+        store = ComputerSystem().sensor_data_store
+        if store is None or self.isensor is None:
+            return []
+        return store.query(str(self.id), time.time() - duration, bucket=bucket)
+
+    def _update_smoothing(self, filter: SmoothingFilter, strength: float):
+        """Internal method to set the given smoothing filter to our sensor in the ComputerSystem."""
+        isensor = self._isensor
+        if isensor is not None and isensor.index >= 0:
+            ComputerSystem().set_sensor_smoothing(isensor, filter, strength)
+
+    def _stat_or_none(self, value: float | None):
+        """Internal method to convert a statistic value to None if it has no value (is None or NaN)."""
+        if value is None or value != value:
+            return None
+        return value
 
     def _get_basic_limits(self):
         """Internal method to try to get the sensor's limits from the ISensorLimits interface."""
-        return self.isensor and self.isensor.limits
+        isensor = self.isensor
+        return isensor and ComputerSystem().snapshot.get_limits(isensor.index)
 
     def _get_custom_limits(self):
         """Internal method to get the sensor's custom (FIXED) limits."""
@@ -331,8 +567,9 @@ class Sensor(Node):
     def get_color_for_value(self, value: float) -> Color:
         """Gets the imgui color of this sensor, based on the given value and limits.
 
-        This uses a few color ranges according to our unit, to interpolate from using ``self.get_percent_of_value(value)``
-        and generate the final color. Not all units supports this, in which case color defaults to white.
+        This indexes our color gradient (see ``self.color_gradient``) using ``self.get_percent_of_value(value)``.
+        Gradients are precomputed lookup tables, so this is cheap to call for every value.
+        Not all units have a gradient, in which case color defaults to white.
 
         Args:
             value (float): any float value to calculate percent. Preferably, a past or expected
@@ -341,47 +578,53 @@ class Sensor(Node):
         Returns:
             ImVec4: sensor color based on the value.
         """
-        targets = None
-        if self.unit in (SensorUnit.PERCENT, SensorUnit.FAN):
-            targets = [
-                (Colors.magenta, 0),
-                (Colors.green, 0.0001),
-                (Colors.yellow, 0.75),
-                (Colors.red, 1),
-            ]
-        elif self.unit in (SensorUnit.TEMPERATURE, ):
-            targets = [
-                (Colors.red, 0),
-                (Colors.green, 0.001),
-                (Colors.yellow, 0.75),
-                (Colors.red, 1),
-            ]
-        elif self.unit in (SensorUnit.POWER, SensorUnit.VOLTAGE, SensorUnit.CURRENT):
-            targets = [
-                (Colors.green, 0),
-                (Colors.yellow, 0.75),
-                (Colors.red, 1),
-            ]
-        elif self.unit in (SensorUnit.THROUGHPUT, SensorUnit.CLOCK):
-            targets = [
-                (Colors.white, 0),
-                (Colors.white, 0.5),
-                (Colors.yellow, 0.75),
-                (Colors.red, 1),
-            ]
-
-        if targets is not None:
-            return multiple_lerp_with_weigths(targets, self.get_percent_of_value(value))
-        return Colors.white
+        gradient = self.color_gradient
+        if gradient is None:
+            return Colors.white
+        return gradient.get_color(self.get_percent_of_value(value))
+
+    def get_color_u32_for_value(self, value: float) -> int:
+        """Same as ``self.get_color_for_value(value)``, but the color is packed as a 32-bit RGBA integer,
+        which can be used directly with IMGUI draw lists."""
+        gradient = self.color_gradient
+        if gradient is None:
+            return 0xFFFFFFFF
+        return gradient.get_color_u32(self.get_percent_of_value(value))
+
+    def detect_change(self, value: float, generation: int) -> bool:
+        """Checks if the given new value is a meaningful change, according to our deadband settings.
+
+        Called by our InternalSensor from the ComputerSystem update thread, after each poll of our hardware. If the value
+        changed, we'll be notified (see ``self.update()``) by the render thread. Since this runs on the update thread, it only
+        uses the copies of our settings stored by their setters, instead of reading our input properties.
+
+        Args:
+            value (float): new value of our sensor (NaN for no value).
+            generation (int): generation of the snapshot with the new value.
+
+        Returns:
+            bool: if the value changed. Always False if this sensor is not enabled.
+        """
+        if not self._is_enabled:
+            return False
+        if self._change_detector.check(value, self._deadband, self._relative_deadband, self._hysteresis):
+            self._changed_generation = generation
+            return True
+        return False
 
     def update(self):
         """Updates this Sensor object.
 
-        Called by our parent Hardware when he is updated.
-        Does nothing if this sensor is not enabled.
+        Called by our InternalSensor when the ComputerSystem processes the sensor's update events, after a poll.
+        This happens on the render thread, once per frame at most, so the triggered flows can safely change widgets.
+        Does nothing if this sensor is not enabled, or if our value didn't change since the last update (see ``self.detect_change()``).
         """
         if not self.enabled:
             return
+        generation = self._changed_generation
+        if generation <= self._notified_generation:
+            return
+        self._notified_generation = generation
         # Update minmax_ever value
         prev_minmax = self.minmax_ever
         self.minmax_ever = Vector2(min(self.minimum, prev_minmax.x), max(self.maximum, prev_minmax.y))
@@ -402,10 +645,16 @@ class Sensor(Node):
             id (SensorID): ID of isensor to use.
         """
         valid_id = id is not None and len(id) > 0
-        need_update = (self._isensor is None) or (self._isensor.id != id)
+        # A isensor with negative index is no longer used by the ComputerSystem (it was closed), so we need to get the new one.
+        need_update = (self._isensor is None) or (self._isensor.index < 0) or (self._isensor.id != id)
         if valid_id and need_update:
             if self._isensor is not None:
                 self._isensor._remove(self)
+            self._change_detector.reset()
+            self._changed_generation = self._notified_generation = 0
             self._isensor = ComputerSystem().get_isensor_by_id(id)
             if self._isensor is not None:
                 self._isensor._add(self)
+                # Only set our filter if we have one, so new nodes don't reset the filter set by other nodes of the same sensor.
+                if self.smoothing != SmoothingFilter.NONE:
+                    self._update_smoothing(self.smoothing, self.smoothing_strength)
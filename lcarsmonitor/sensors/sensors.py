@@ -1,5 +1,10 @@
+import os
+import time
 import click
 import threading
+import traceback
+import numpy as np
+from array import array
 import libasvat.command_utils as cmd_utils
 import libasvat.imgui.editors.primitives as primitives
 from typing import Callable
@@ -10,8 +15,20 @@ from libasvat.imgui.colors import Colors
 from libasvat.imgui.general import adv_button
 from libasvat.imgui.editors import TypeDatabase, TypeEditor
 from libasvat.imgui.editors.controller import render_all_properties, get_all_prop_values_for_storage, restore_prop_values_to_object
-from lcarsmonitor.sensors.sensors_api import SensorSource, Hardware, InternalSensor, SensorID
+from lcarsmonitor.sensors.sensors_api import SensorSource, Hardware, InternalSensor, SensorID, SensorType
+from lcarsmonitor.sensors.snapshot import SensorSnapshot
+from lcarsmonitor.sensors.history import SensorHistory, DEFAULT_RAW_CAPACITY
+from lcarsmonitor.sensors.stats import SensorStats
+from lcarsmonitor.sensors.smoothing import BatchSmoother, SmoothingFilter
+from lcarsmonitor.sensors.timeseries import TimeSeriesStore
+from lcarsmonitor.sensors.exporter import MetricsExporter
+from lcarsmonitor.sensors.scheduler import PollScheduler, PollTier
+from lcarsmonitor.sensors.recording import SensorRecorder, RECORDING_EXTENSION
+from lcarsmonitor.sensors.catalog import SensorCatalogIndex
+from lcarsmonitor.sensors.events import SensorEventQueue
+from lcarsmonitor.sensors.rules import RuleEngine, AlertRule, AlertSeverity
 from lcarsmonitor.sensors.sources.dummy_impl import DummySensors
+from lcarsmonitor.sensors.sources.virtual_impl import VirtualSensors
 
 
 class ComputerSystem(metaclass=cmd_utils.Singleton):
@@ -25,11 +42,33 @@ class ComputerSystem(metaclass=cmd_utils.Singleton):
     def __init__(self):
         self.all_sensors: dict[str, InternalSensor] = {}
         self._update_time: float = 1.0
-        """Amount of time that must pass for our async-update-thread to trigger an actual ``update()`` (in seconds)."""
+        """Default amount of time between polls of each hardware by our async-update-thread (in seconds)."""
+        self._hardware_rates: dict[str, float] = {}
+        """User-set polling rates of hardware, by hardware ID. Rates of 0 (or missing) use the default rate."""
+        self._history_length: int = DEFAULT_RAW_CAPACITY
+        self._poll_unused_hardware: bool = False
         # Async update thread support
         self._update_thread: threading.Thread = None
         self._stop_event: threading.Event = None
-        self._lock: threading.Lock = None
+        self._snapshot: SensorSnapshot = SensorSnapshot()
+        self._scheduler = PollScheduler(self.get_polling_period)
+        self._schedule_changed = False
+        self._recordings_folder: str = ""
+        self._recorder: SensorRecorder = None
+        self._sensor_index: SensorCatalogIndex = None
+        self._events = SensorEventQueue()
+        self._smoother: BatchSmoother = None
+        self._store_sensor_data = False
+        self._sensor_data_path: str = ""
+        self._store: TimeSeriesStore = None
+        self._exporter = MetricsExporter(lambda: self._snapshot)
+        self._export_metrics = False
+        self._metrics_host = "127.0.0.1"
+        self._metrics_port = 9184
+        self._max_events_per_frame: int = 0
+        self._virtual_sensor_form = {"name": "", "expression": "", "type": SensorType.Unknown.value}
+        self._rules = RuleEngine()
+        self._alert_rule_form = {"name": "", "condition": "", "duration": 0.0, "severity": AlertSeverity.RED.value}
 
         cache = DataCache()
         cache.add_shutdown_listener(self._on_shutdown)
@@ -37,10 +76,14 @@ class ComputerSystem(metaclass=cmd_utils.Singleton):
         self._available_sources = {name: source() for name, source in SensorSource.get_all_subclasses().items()}
         self._selected_source: str = "None"
         self._dummy_source = DummySensors()
+        self._virtual_source = VirtualSensors()
 
         # Load stored data from cache
         data: dict = cache.get_data("computersystem_data", {}).copy()
         sources_data: dict = data.pop("sources_data", {})
+        self._hardware_rates = data.pop("hardware_rates", {})
+        self._virtual_source.definitions = data.pop("virtual_sensors", [])
+        self._rules.definitions = data.pop("alert_rules", [])
         restore_prop_values_to_object(self, data)
         for source_name, source_data in sources_data.items():
             source = self._available_sources.get(source_name)
@@ -49,9 +92,10 @@ class ComputerSystem(metaclass=cmd_utils.Singleton):
 
     @property
     def update_time(self) -> float:
-        """Time between sensor updates (in seconds).
+        """Default time between sensor updates (in seconds).
 
         Every this amount of time, the sensors will be polled for new data, updating their values.
+        Each hardware may have its own polling rate, which overrides this (see ``self.get_polling_period()``).
 
         Lower values will make the sensors update more often, but will also increase CPU usage.
         Default is 1 second.
@@ -61,10 +105,14 @@ class ComputerSystem(metaclass=cmd_utils.Singleton):
     @update_time.setter
     def update_time(self, value: float):
         self._update_time = value
+        self._schedule_changed = True
 
     @primitives.int_property(min=1, max=60, is_slider=True)
     def sensor_polling_rate(self) -> int:
-        """Number of times per second the sensors will be polled for new data, updating their values.
+        """Default number of times per second the sensors will be polled for new data, updating their values.
+
+        Each hardware may have its own polling rate (see the Hardware Polling Rates menu), and Sensor nodes may request
+        higher rates for their hardware. Hardware without these use this default rate.
 
         Higher values will make the sensors update more often, but will also increase CPU usage.
         Default is 1 update per second.
@@ -75,11 +123,192 @@ class ComputerSystem(metaclass=cmd_utils.Singleton):
     def sensor_polling_rate(self, value: int):
         self.update_time = 1.0 / max(1, value)
 
+    @primitives.int_property(min=10, max=36000)
+    def history_length(self) -> int:
+        """Number of raw samples kept in the history of each sensor.
+
+        Besides the raw samples, each sensor history also keeps 1s/10s/60s min/max/avg rollups of its values (about 5KB).
+        Higher values allow longer raw trends, at the cost of memory (12 bytes per sample per sensor: 1.2MB per 1000 samples
+        with 100 sensors). Changing this resets the history of all sensors. Default is 300 samples (30 seconds when polling at 10Hz).
+        """
+        return self._history_length
+
+    @history_length.setter
+    def history_length(self, value: int):
+        if value == self._history_length:
+            return
+        self._history_length = value
+        self._reset_histories()
+
+    @primitives.bool_property()
+    def poll_unused_hardware(self) -> bool:
+        """If all hardware should be polled on every update, even those without subscribers.
+
+        By default (unchecked), only hardware that have sensors being used by Sensor nodes in opened UISystems are polled,
+        which may greatly reduce the cost of each update. Sensors of unpolled hardware keep their last known values.
+        """
+        return self._poll_unused_hardware
+
+    @poll_unused_hardware.setter
+    def poll_unused_hardware(self, value: bool):
+        self._poll_unused_hardware = value
+
+    @primitives.string_property(is_folder=True)
+    def recordings_folder(self) -> str:
+        """Folder where sensor recordings are saved [GET/SET].
+
+        If empty, recordings are saved in the same folder as our data cache. See the Recording section of this menu.
+        """
+        return self._recordings_folder
+
+    @recordings_folder.setter
+    def recordings_folder(self, value: str):
+        self._recordings_folder = value
+
+    @primitives.int_property(min=0, max=100000)
+    def max_sensor_events_per_frame(self) -> int:
+        """Maximum number of sensor update events processed per frame [GET/SET].
+
+        Sensor nodes are notified of updates (triggering their On Update flows) by the render thread, once per frame. This limits
+        how many sensors are notified in a single frame, spreading the work across frames when many sensors update at once.
+        Pending updates of a sensor are coalesced, so delayed sensors are still notified only once, with their latest value.
+        If 0 (the default), all pending updates are processed every frame.
+        """
+        return self._max_events_per_frame
+
+    @max_sensor_events_per_frame.setter
+    def max_sensor_events_per_frame(self, value: int):
+        self._max_events_per_frame = value
+
+    @primitives.int_property(min=0, max=10000)
+    def hardware_poll_budget(self) -> int:
+        """Time budget of a single poll of a hardware, in milliseconds [GET/SET].
+
+        Polls can't be interrupted, so a slow or hung hardware (such as some SuperIO chips, sleeping disks or USB coolers)
+        delays the polls of all other hardware. Hardware whose polls repeatedly exceed this budget are moved to a slower
+        polling tier, and then quarantined (only probed once in a while), until their polls are within budget again.
+        See the Hardware Timing menu. If 0, there's no budget. Default is 250ms.
+        """
+        return round(self._scheduler.budget * 1000)
+
+    @hardware_poll_budget.setter
+    def hardware_poll_budget(self, value: int):
+        self._scheduler.budget = max(0, value) / 1000
+
+    @property
+    def scheduler(self) -> PollScheduler:
+        """The scheduler used by our update thread to poll hardware. Provides the poll timing of each hardware."""
+        return self._scheduler
+
+    @property
+    def sensor_events(self) -> SensorEventQueue:
+        """Queue of sensor update events, pushed after each poll and processed by ``self.process_sensor_events()``."""
+        return self._events
+
+    @primitives.bool_property()
+    def store_sensor_data(self) -> bool:
+        """If the values of all polled sensors are stored in a persistent time-series database [GET/SET].
+
+        The database keeps 1s data for 24 hours, 1 minute rollups for 30 days, and hourly rollups forever (see ``TimeSeriesStore``),
+        so long-term trends of sensors can be shown without keeping them in memory. See ``self.sensor_data_path``.
+        """
+        return self._store_sensor_data
+
+    @store_sensor_data.setter
+    def store_sensor_data(self, value: bool):
+        self._store_sensor_data = value
+        if self.is_active:
+            if value:
+                self._open_store()
+            else:
+                self._close_store()
+
+    @primitives.string_property()
+    def sensor_data_path(self) -> str:
+        """Path of the time-series database file used when ``store_sensor_data`` is enabled [GET/SET].
+
+        If empty, a ``sensor_data.db`` file in the same folder as our data cache is used. Changes are applied when the system is re-opened.
+        """
+        return self._sensor_data_path
+
+    @sensor_data_path.setter
+    def sensor_data_path(self, value: str):
+        self._sensor_data_path = value
+
+    @primitives.bool_property()
+    def export_metrics(self) -> bool:
+        """If a local HTTP endpoint exporting all sensors as OpenMetrics/Prometheus gauges is enabled [GET/SET].
+
+        Metrics are served at ``http://<metrics_host>:<metrics_port>/metrics``, rendered from our latest snapshot, so scraping
+        doesn't cause any extra polling of the sensors. Disabled by default.
+        """
+        return self._export_metrics
+
+    @export_metrics.setter
+    def export_metrics(self, value: bool):
+        self._export_metrics = value
+        self._update_exporter()
+
+    @primitives.string_property()
+    def metrics_host(self) -> str:
+        """Host address of the metrics endpoint (see ``export_metrics``) [GET/SET].
+
+        Defaults to ``127.0.0.1`` (only local access). Use ``0.0.0.0`` to allow access from other machines.
+        """
+        return self._metrics_host
+
+    @metrics_host.setter
+    def metrics_host(self, value: str):
+        if value != self._metrics_host:
+            self._metrics_host = value
+            self._update_exporter()
+
+    @primitives.int_property(min=1, max=65535)
+    def metrics_port(self) -> int:
+        """Port of the metrics endpoint (see ``export_metrics``) [GET/SET]. Defaults to 9184."""
+        return self._metrics_port
+
+    @metrics_port.setter
+    def metrics_port(self, value: int):
+        if value != self._metrics_port:
+            self._metrics_port = value
+            self._update_exporter()
+
+    @property
+    def metrics_exporter(self) -> MetricsExporter:
+        """The exporter of sensor metrics. See ``export_metrics``."""
+        return self._exporter
+
+    def _update_exporter(self):
+        """Starts, restarts or stops the metrics exporter, according to our settings."""
+        if self._export_metrics:
+            self._exporter.start(self._metrics_host, self._metrics_port)
+        else:
+            self._exporter.stop()
+
+    @property
+    def sensor_data_store(self) -> TimeSeriesStore | None:
+        """The persistent time-series store of sensor values. None if ``store_sensor_data`` is disabled or we're closed."""
+        return self._store
+
     @property
     def current_source(self):
         """Gets the currently selected SensorSource instance."""
         return self._available_sources.get(self._selected_source)
 
+    def get_source(self, name: str = None) -> SensorSource | None:
+        """Gets the available SensorSource instance with the given name (its class name), with its persisted settings loaded.
+
+        Args:
+            name (str, optional): class name of the SensorSource. Defaults to None, which returns the currently selected source.
+
+        Returns:
+            SensorSource: the source instance, or None if no source with the given name is available.
+        """
+        if name is None:
+            return self.current_source
+        return self._available_sources.get(name)
+
     @primitives.string_property(options=["None"])
     def selected_source(self) -> str:
         """Name of the currently active SensorSource [GET/SET]
@@ -105,6 +334,24 @@ class ComputerSystem(metaclass=cmd_utils.Singleton):
         if was_initialized:
             self.open()
 
+    @property
+    def snapshot(self) -> SensorSnapshot:
+        """Gets the latest published SensorSnapshot, containing the values of all sensors from the last poll.
+
+        Snapshots are immutable and are atomically swapped by the update thread after each poll, so this can be safely
+        read from any thread. Readers should get the snapshot once and use it for a related set of reads.
+        """
+        return self._snapshot
+
+    @property
+    def sensor_index(self) -> SensorCatalogIndex:
+        """Index of our hardware tree and sensor names, for quickly filtering sensors (such as in sensor selection menus).
+
+        The index is built when first needed, and rebuilt after the system is re-opened."""
+        if self._sensor_index is None:
+            self._sensor_index = SensorCatalogIndex(list(self))
+        return self._sensor_index
+
     @property
     def is_active(self):
         """Checks if the ComputerSystem was opened."""
@@ -129,7 +376,22 @@ class ComputerSystem(metaclass=cmd_utils.Singleton):
             if is_ok:
                 self.current_source.initialize()
         self._dummy_source.initialize()
+        self._virtual_source.initialize()
         self.all_sensors = {sensor.id: sensor for sensor in self.get_all_isensors()}
+        self._sensor_index = None
+        for index, isensor in enumerate(self.all_sensors.values()):
+            isensor.index = index
+        self._virtual_source.compile(self.all_sensors)
+        self._rules.compile(self.all_sensors)
+        self._scheduler.clear_timings()
+        self._smoother = BatchSmoother(len(self.all_sensors))
+        self._exporter.set_sensors(list(self.all_sensors.values()))
+        if self._store_sensor_data:
+            self._open_store()
+        for hw in self.get_all_hardware():
+            hw.polling_rate = self._hardware_rates.get(hw.id, 0.0)
+        self._reset_histories()
+        self._publish_snapshot()
         msg_color = "green" if is_ok else "yellow"
         click.secho(f"ComputerSystem: Initialized with Source '{self._source_name}': {click.style(error_msg, fg=msg_color)}!", fg="magenta")
         self.start_async_update()
@@ -142,10 +404,22 @@ class ComputerSystem(metaclass=cmd_utils.Singleton):
             click.secho("ComputerSystem: tried to close() while already closed.", fg="yellow")
             return
         self.stop_async_update()
+        self.stop_recording()
+        self._close_store()
+        self._rules.release()
+        for isensor in self.all_sensors.values():
+            # Marks the sensor as no longer indexed, so Sensor nodes know to get the new InternalSensor if we're re-opened.
+            isensor.index = -1
         self.all_sensors.clear()
+        self._exporter.set_sensors([])
+        self._events.clear()
+        self._smoother = None
+        self._sensor_index = None
+        self._snapshot = SensorSnapshot()
         if self.current_source:
             self.current_source.shutdown()
         self._dummy_source.shutdown()
+        self._virtual_source.shutdown()
         click.secho(f"ComputerSystem: Closed Computer (source: {self._source_name}).", fg="magenta")
 
     @property
@@ -159,37 +433,330 @@ class ComputerSystem(metaclass=cmd_utils.Singleton):
     def update(self):
         """Updates our hardware, to update all of our sensors.
 
+        After the sources are updated, a new SensorSnapshot is built and published (see ``self.snapshot``), and then
+        update events are queued for the Sensor nodes (see ``self.process_sensor_events()``).
+
         NOTE: this is a costly call! Updating the native sensors takes time. So its preferable to call
         this asynchronously, using ``self.start_async_update()``.
         """
+        force = self._poll_unused_hardware
+        # Sources may not visit all of their hardware, so flags from previous updates (such as a forced one) are reset here.
+        for hw in self.get_all_hardware():
+            hw.polled = False
         if self.current_source:
-            self.current_source.update()
-        self._dummy_source.update()
+            self.current_source.update(force)
+        self._dummy_source.update(force)
+        self._virtual_source.update(force)
+        self._on_polled([hw for hw in self.get_all_hardware() if hw.polled])
+
+    def _on_polled(self, polled: list[Hardware]):
+        """Publishes a new snapshot after hardware were polled, and queues update events for the used sensors of polled hardware.
+
+        Change detection is done here, in a single pass over the sensors of the polled hardware: events are only queued for sensors
+        whose value changed beyond the deadband of at least one of their Sensor nodes (see ``InternalSensor.detect_changes()``).
+
+        Args:
+            polled (list[Hardware]): the hardware that were polled.
+        """
+        updated = self._publish_snapshot(polled)
+        snapshot = self._snapshot
+        values, generation = snapshot.smoothed, snapshot.generation
+        updated = [isensor for isensor in updated
+                   if isensor.subscribers > 0 and isensor.detect_changes(values[isensor.index], generation)]
+        if len(updated) > 0:
+            self._events.push(updated, generation)
+        self._rules.evaluate(snapshot)
+
+    def process_sensor_events(self):
+        """Processes pending sensor update events, notifying the Sensor nodes of each updated sensor.
+
+        This should be called once per frame by the render thread, so the flows triggered by Sensor nodes (and any widget changes
+        they do) run on the same thread as the rendering. At most ``max_sensor_events_per_frame`` events are processed per call.
+        Pending alert events are also processed (see ``self.rules``).
+
+        Returns:
+            int: number of processed sensor events.
+        """
+        isensors = self._events.drain(self._max_events_per_frame)
+        for isensor in isensors:
+            if isensor.index >= 0:  # sensor may have been removed since its event was queued
+                isensor.notify_sensors()
+        self._rules.process_events()
+        return len(isensors)
+
+    def _publish_snapshot(self, polled: list[Hardware] = None):
+        """Builds a new SensorSnapshot from the current data of our sensors, and publishes it as our latest snapshot.
+
+        Only the sensors of the polled hardware are read, appended to their history and smoothed: data of all other sensors
+        is kept from the previous snapshot. So the cost of a publish depends on the polled hardware, not on all our sensors.
+
+        Publishing is a single reference swap, so readers in other threads will either see the previous or the new
+        snapshot, never a partially built one.
+
+        Args:
+            polled (list[Hardware], optional): the hardware that were polled. If None, all sensors are read. Defaults to None.
+
+        Returns:
+            list[InternalSensor]: the sensors updated in the new snapshot: those of polled hardware, including the
+            virtual sensors if any was evaluated.
+        """
+        previous = self._snapshot
+        if polled is None:
+            polled = self.get_all_hardware()
+        virtual_hardware = self._virtual_source.get_all_hardware()
+        read = [isensor for hw in polled if hw not in virtual_hardware for isensor in hw.isensors]
+        snapshot = SensorSnapshot.from_isensors(self.all_sensors.values(), previous.generation + 1, previous, read)
+        # Virtual sensors are computed from the values of the other sensors, so they're evaluated directly in the new snapshot.
+        self._virtual_source.evaluate(snapshot)
+        updated = [isensor for hw in polled if hw.polled and hw not in virtual_hardware for isensor in hw.isensors]
+        for hw in virtual_hardware:
+            if hw.polled:
+                updated.extend(hw.isensors)
+        smoother = self._smoother
+        if smoother is not None and smoother.is_active:
+            # Smoothing is applied to all sensor values at once, before the snapshot is published.
+            mask = np.zeros(len(snapshot), dtype=bool)
+            mask[np.fromiter((isensor.index for isensor in updated), dtype=np.intp, count=len(updated))] = True
+            smoothed = smoother.apply(np.frombuffer(snapshot.values, dtype=np.float64), mask)
+            snapshot.smoothed = array("d", smoothed.tobytes())
+        self._snapshot = snapshot
+        self._record_history(snapshot, updated)
+        recorder = self._recorder
+        if recorder is not None:
+            recorder.record(snapshot)
+        return updated
+
+    def _record_history(self, snapshot: SensorSnapshot, isensors: list[InternalSensor]):
+        """Appends the values of the given snapshot to the history and streaming statistics of the given (updated) sensors.
+        Sensors without a value are skipped."""
+        timestamp = snapshot.timestamp
+        values = snapshot.values
+        store = self._store
+        stored_samples = []
+        for isensor in isensors:
+            value = values[isensor.index]
+            if value == value and isensor.history is not None:  # value==value skips NaN values
+                isensor.history.append(timestamp, value)
+                isensor.stats.add(timestamp, value)
+                if store is not None:
+                    stored_samples.append((isensor.index, value))
+        if len(stored_samples) > 0:
+            store.add(timestamp, stored_samples)
+
+    def set_sensor_smoothing(self, isensor: InternalSensor, filter: SmoothingFilter, strength: float):
+        """Sets the smoothing filter of the given sensor. The filter is applied to the sensor's values starting on the next poll,
+        and the smoothed values are available in our snapshots (see ``SensorSnapshot.smoothed``).
+
+        Smoothing is done for all sensors at once, by a vectorized ``BatchSmoother``. Since it's set per sensor, the filter is shared
+        by all Sensor nodes of the same sensor. Filters are reset when the system is re-opened.
+
+        Args:
+            isensor (InternalSensor): the sensor to set. Should be one of our current sensors.
+            filter (SmoothingFilter): the filter to use.
+            strength (float): strength of the filter, in [0, 1].
+        """
+        if self._smoother is not None:
+            self._smoother.configure(isensor.index, filter, strength)
+
+    @property
+    def virtual_sensors(self) -> list[dict]:
+        """Definitions of the user-defined virtual sensors, as dicts with their ``name``, ``expression`` and ``type``.
+
+        Virtual sensors are computed from expressions over the values of other sensors, and are available as any other sensor,
+        under the ``Virtual`` hardware. See ``lcarsmonitor.sensors.sources.virtual_impl.VirtualSensors``."""
+        return self._virtual_source.definitions
+
+    def add_virtual_sensor(self, name: str, expression: str, stype: SensorType = SensorType.Unknown):
+        """Adds a new virtual sensor. If we're active, we're re-opened in order to load it.
+
+        Args:
+            name (str): name of the sensor. Must be unique amongst virtual sensors.
+            expression (str): expression that computes the sensor value (see ``lcarsmonitor.sensors.expressions.compile_expression()``).
+            stype (SensorType, optional): type of the sensor, which defines its unit. Defaults to Unknown.
+
+        Returns:
+            bool: if the sensor was added.
+        """
+        if any(definition["name"].lower() == name.lower() for definition in self.virtual_sensors):
+            click.secho(f"ComputerSystem: a virtual sensor named '{name}' already exists.", fg="yellow")
+            return False
+        self.virtual_sensors.append({"name": name, "expression": expression, "type": stype.value})
+        self._reopen()
+        return True
+
+    def remove_virtual_sensor(self, name: str):
+        """Removes the virtual sensor with the given name. If we're active, we're re-opened in order to unload it."""
+        self._virtual_source.definitions = [definition for definition in self.virtual_sensors if definition["name"] != name]
+        self._reopen()
+
+    @property
+    def rules(self) -> RuleEngine:
+        """The alert rule engine, which evaluates the user-defined alert rules after each poll, on the update thread.
+        See ``lcarsmonitor.sensors.rules.RuleEngine``."""
+        return self._rules
+
+    @property
+    def alert_rules(self) -> list[dict]:
+        """Definitions of the user-defined alert rules, as dicts with their ``name``, ``condition``, ``duration`` and ``severity``."""
+        return self._rules.definitions
+
+    def add_alert_rule(self, name: str, condition: str, duration: float = 0.0, severity: AlertSeverity = AlertSeverity.RED):
+        """Adds a new alert rule. If we're active, the rule is compiled and starts being evaluated right away.
+
+        Args:
+            name (str): name of the rule. Must be unique amongst rules.
+            condition (str): condition of the rule (see ``lcarsmonitor.sensors.rules.AlertRule``).
+            duration (float, optional): time (in seconds) the condition needs to hold for the rule to be raised. Defaults to 0.
+            severity (AlertSeverity, optional): severity of the rule. Defaults to RED.
+
+        Returns:
+            bool: if the rule was added.
+        """
+        if any(definition["name"].lower() == name.lower() for definition in self.alert_rules):
+            click.secho(f"ComputerSystem: an alert rule named '{name}' already exists.", fg="yellow")
+            return False
+        self.alert_rules.append({"name": name, "condition": condition, "duration": duration, "severity": severity.value})
+        self._recompile_rules()
+        return True
+
+    def remove_alert_rule(self, name: str):
+        """Removes the alert rule with the given name."""
+        self._rules.definitions = [definition for definition in self.alert_rules if definition["name"] != name]
+        self._recompile_rules()
+
+    def _recompile_rules(self):
+        """Compiles our alert rules again, if we're active. The update thread is paused while doing so."""
+        if self.is_active:
+            self.stop_async_update()
+            self._rules.compile(self.all_sensors)
+            self.start_async_update()
+
+    def _reopen(self):
+        """Closes and opens this system again, if we're active. Used to reload our sensors."""
+        if self.is_active:
+            self.close()
+            self.open()
+
+    @property
+    def recorder(self) -> SensorRecorder | None:
+        """The active SensorRecorder, recording all polls. None if we're not recording."""
+        return self._recorder
+
+    def start_recording(self, path: str = None):
+        """Starts recording the values of all sensors from our current source on every poll, to a recording file.
+
+        Recordings can be replayed with the ``ReplaySensors`` source. If already recording, the previous recording is stopped.
+
+        Args:
+            path (str, optional): path of the recording file. Defaults to a timestamped file in our ``recordings_folder``.
+
+        Returns:
+            str: the path of the recording file.
+        """
+        if not self.is_active:
+            click.secho("ComputerSystem: can't record while closed.", fg="yellow")
+            return
+        self.stop_recording()
+        if path is None:
+            folder = self._recordings_folder or os.path.dirname(DataCache().data_path)
+            path = os.path.join(folder, f"recording_{time.strftime('%Y%m%d_%H%M%S')}{RECORDING_EXTENSION}")
+        # Dummy sensors are only recorded if we have no real sensors, since the dummy source is always added when replaying.
+        source = self.current_source or self._dummy_source
+        hardware = [hw for root_hw in source.get_all_hardware() for hw in root_hw.get_all_hardware()]
+        self._recorder = SensorRecorder(path, source.pretty_name, hardware)
+        click.secho(f"ComputerSystem: started recording sensors to '{path}'.", fg="magenta")
+        return path
+
+    def stop_recording(self):
+        """Stops the current recording, if any."""
+        recorder = self._recorder
+        if recorder is not None:
+            self._recorder = None
+            recorder.close()
+            click.secho(f"ComputerSystem: stopped recording ({recorder.frame_count} frames) to '{recorder.path}'.", fg="magenta")
+
+    def _open_store(self):
+        """Opens our time-series store (see ``self.store_sensor_data``), if not opened already."""
+        if self._store is not None:
+            return
+        path = self._sensor_data_path or os.path.join(os.path.dirname(DataCache().data_path), "sensor_data.db")
+        try:
+            store = TimeSeriesStore(path)
+            store.set_sensors([str(isensor.id) for isensor in self.all_sensors.values()])
+        except Exception as e:
+            click.secho(f"ComputerSystem: failed to open sensor data store at '{path}': {e}", fg="red")
+            return
+        self._store = store
+        click.secho(f"ComputerSystem: storing sensor data at '{path}'.", fg="magenta")
+
+    def _close_store(self):
+        """Closes our time-series store, if opened, writing all pending data."""
+        store = self._store
+        if store is not None:
+            self._store = None
+            store.close()
+
+    def _reset_histories(self):
+        """Creates a new (empty) history and streaming statistics for each of our sensors, using our ``history_length``."""
+        for isensor in self.all_sensors.values():
+            isensor.history = SensorHistory(self._history_length)
+            isensor.stats = SensorStats()
+
+    def get_polling_period(self, hw: Hardware) -> float:
+        """Gets the current polling period (in seconds) of the given hardware.
+
+        The hardware's rate is its own ``polling_rate`` if set, or our default ``sensor_polling_rate`` otherwise.
+        However, if Sensor nodes of this hardware request a higher rate (see ``Hardware.requested_polling_rate``), that is used instead.
+        """
+        base_rate = hw.polling_rate if hw.polling_rate > 0 else (1.0 / self.update_time)
+        rate = max(base_rate, hw.requested_polling_rate)
+        return 1.0 / max(rate, 0.01)
+
+    def set_hardware_polling_rate(self, hw: Hardware, rate: float):
+        """Sets the polling rate of the given hardware (in updates per second). A rate of 0 makes the hardware use the default rate.
+        The rate is persisted, by hardware ID."""
+        hw.polling_rate = rate
+        if rate > 0:
+            self._hardware_rates[hw.id] = rate
+        else:
+            self._hardware_rates.pop(hw.id, None)
+        self._schedule_changed = True
 
     def start_async_update(self):
-        """Starts a background thread to periodically call ``update()`` on hardware sensors.
-        Uses ``self.update_time`` as the interval between updates (can be changed at runtime).
+        """Starts a background thread to periodically poll the hardware sensors.
+
+        Each hardware is polled at its own rate (see ``self.get_polling_period()``), by a deadline-based scheduler.
+        After each batch of polled hardware, a new snapshot is published and update events are queued for related Sensor nodes.
 
         This is started by default when ``self.open()`` is called.
         """
         if self._update_thread and self._update_thread.is_alive():
             return  # Already running
         self._stop_event = threading.Event()
-        self._lock = threading.Lock()
+        self._schedule_changed = True
 
         def _async_update_loop():
             while not self._stop_event.is_set():
-                with self._lock:
-                    self.update()
-                # Use the current value of self.update_time for each wait
-                self._stop_event.wait(self.update_time)
-        self._update_thread = threading.Thread(target=_async_update_loop, daemon=True)
-        # NOTE: if we need to get a thread-safe something, use:
-        #   if lock:
-        #       with lock:
-        #           get/copy stuff
-        #   else:
-        #       get/copy stuff
+                try:
+                    if self._schedule_changed:
+                        self._schedule_changed = False
+                        self._scheduler.reset(self.get_all_hardware(), time.perf_counter())
+                    polled = self._scheduler.poll_due(time.perf_counter(), self._poll_unused_hardware)
+                    if len(polled) > 0:
+                        self._on_polled(polled)
+                except Exception:
+                    # An error here (such as from a sensor source or a rule) shouldn't stop all polling.
+                    click.secho(f"ComputerSystem: error in sensor update thread:\n{traceback.format_exc()}", fg="red")
+                    # Deadlines might not have advanced, so back off instead of retrying (and logging) in a busy loop.
+                    self._stop_event.wait(self.update_time)
+                    continue
+                # Wait until the next deadline. The wait is capped so changes in polling rates are picked up quickly.
+                next_deadline = self._scheduler.next_deadline
+                wait_time = self.update_time if next_deadline is None else (next_deadline - time.perf_counter())
+                self._stop_event.wait(min(max(0.0, wait_time), 0.5))
+        # NOTE: readers in other threads should only access sensor data through our immutable `self.snapshot`,
+        #   which is swapped atomically by update(). So no locks are needed.
+        self._update_thread = threading.Thread(target=_async_update_loop, name="Sensor Update Thread", daemon=True)
         self._update_thread.start()
 
     def stop_async_update(self):
@@ -201,7 +768,7 @@ class ComputerSystem(metaclass=cmd_utils.Singleton):
             self._update_thread.join()
         self._update_thread = None
         self._stop_event = None
-        self._lock = None
+        self._scheduler.clear()
 
     def get_all_isensors(self):
         """Gets a list of all internal sensors of this system.
@@ -214,6 +781,17 @@ class ComputerSystem(metaclass=cmd_utils.Singleton):
             sensors += list(hardware.get_all_isensors())
         return sensors
 
+    def get_all_hardware(self):
+        """Gets a list of all hardware of this system, including all sub-hardware.
+
+        Returns:
+            list[Hardware]: list of hardware
+        """
+        all_hw: list[Hardware] = []
+        for hardware in self:
+            all_hw += list(hardware.get_all_hardware())
+        return all_hw
+
     def get_isensor_by_id(self, id_obj: str):
         """Gets the sensor with the given ID.
 
@@ -231,11 +809,54 @@ class ComputerSystem(metaclass=cmd_utils.Singleton):
         render_all_properties(self)
 
         if self.is_active:
-            num_sensors = len(self.all_sensors)
-            imgui.text_colored(Colors.green, f"Status: System active with {num_sensors-2} sensors (+2 dummy/test sensors).")
+            num_virtual = len(self._virtual_source.isensors)
+            num_sensors = len(self.all_sensors) - num_virtual
+            imgui.text_colored(Colors.green, f"Status: System active with {num_sensors-2} sensors (+2 dummy/test sensors, +{num_virtual} virtual).")
         else:
             imgui.text_colored(Colors.red, "Status: System not activated. Select a source to activate.")
 
+        if self.is_active and imgui.collapsing_header("Sensor Events"):
+            events = self._events
+            imgui.text_wrapped("Sensor update events, queued after each poll and processed by the render thread once per frame.")
+            imgui.text(f"Pending: {events.depth}")
+            imgui.text(f"Processed: {events.processed} (last frame: {events.last_drained})")
+            imgui.text(f"Dropped (coalesced): {events.dropped} of {events.pushed}")
+
+        if imgui.collapsing_header("Virtual Sensors"):
+            self._render_virtual_sensors_menu()
+
+        if imgui.collapsing_header("Alert Rules"):
+            self._render_alert_rules_menu()
+
+        if imgui.collapsing_header("Metrics Exporter"):
+            imgui.text_wrapped("Exports all sensors as OpenMetrics/Prometheus gauges. Enable it with the `export_metrics` setting above.")
+            if self._exporter.is_running:
+                imgui.text_colored(Colors.green, f"Serving at {self._exporter.address}")
+                imgui.text(f"Requests served: {self._exporter.requests}")
+            else:
+                imgui.text_colored(Colors.red, "Not running.")
+
+        if self.is_active and imgui.collapsing_header("Hardware Timing"):
+            self._render_hardware_timing_menu()
+
+        if self.is_active and imgui.collapsing_header("Hardware Polling Rates"):
+            imgui.text_wrapped("Polling rate (updates per second) of each hardware. Rate 0 uses the default `sensor_polling_rate`.")
+            for hardware in self:
+                self._render_hardware_rate_menu(hardware)
+
+        if self.is_active and imgui.collapsing_header("Recording"):
+            imgui.text_wrapped("Records the values of all sensors on every poll, to replay later with the Recording Replay source.")
+            recorder = self._recorder
+            if recorder is None:
+                if imgui.button("Start Recording"):
+                    self.start_recording()
+            else:
+                if imgui.button("Stop Recording"):
+                    self.stop_recording()
+                imgui.same_line()
+                imgui.text_colored(Colors.red, f"Recording: {recorder.frame_count} frames ({recorder.duration:.0f}s)")
+                imgui.text_wrapped(f"File: {recorder.path}")
+
         prev_source_id = self._selected_source
         tooltip = "Change the currently active Sensor Source to this."
         for source_id, source in self._available_sources.items():
@@ -258,6 +879,124 @@ class ComputerSystem(metaclass=cmd_utils.Singleton):
                     imgui.same_line()
                     imgui.text_colored(Colors.green, "[ACTIVE]")
 
+    def _render_virtual_sensors_menu(self):
+        """Renders the IMGUI controls for listing, adding and removing virtual sensors."""
+        imgui.text_wrapped("Virtual sensors are computed from expressions over other sensors, such as "
+                           "`sensor(\"/cpu/0/power/0\") + sensor(\"/gpu/0/power/0\")` or `max(sensors(\"*core*temp*\")) - 30`. "
+                           "See `lcarsmonitor.sensors.expressions` for the expression syntax.")
+        vsensors = {vsensor.name: vsensor for vsensor in self._virtual_source.isensors}
+        for definition in list(self.virtual_sensors):
+            name = definition["name"]
+            imgui.push_id(name)
+            if imgui.small_button("X"):
+                self.remove_virtual_sensor(name)
+            imgui.set_item_tooltip("Remove this virtual sensor.")
+            imgui.same_line()
+            imgui.text(f"{name} ({definition['type']}): {definition['expression']}")
+            vsensor = vsensors.get(name)
+            if vsensor is not None and vsensor.error:
+                imgui.text_colored(Colors.red, f"ERROR: {vsensor.error}")
+            imgui.pop_id()
+        imgui.separator()
+        form = self._virtual_sensor_form
+        _, form["name"] = imgui.input_text("Name", form["name"])
+        _, form["expression"] = imgui.input_text("Expression", form["expression"])
+        types = [stype.value for stype in SensorType]
+        _, type_index = imgui.combo("Type", types.index(form["type"]), types)
+        form["type"] = types[type_index]
+        if adv_button("Add Virtual Sensor", "Adds the virtual sensor. The ComputerSystem is re-opened to load it.",
+                      is_enabled=bool(form["name"] and form["expression"])):
+            if self.add_virtual_sensor(form["name"], form["expression"], SensorType(form["type"])):
+                form["name"], form["expression"] = "", ""
+
+    def _render_alert_rules_menu(self):
+        """Renders the IMGUI controls for listing, adding and removing alert rules."""
+        imgui.text_wrapped("Alert rules are conditions over sensors, evaluated after each poll, such as "
+                           "`sensor(\"/cpu/0/temperature/0\") > limit(\"/cpu/0/temperature/0\")` or "
+                           "`sensor(\"/fan/0\") == 0 and rate(sensor(\"/cpu/0/temperature/0\")) > 0`. "
+                           "Use `Sensor Alert` nodes or the `alert_rule` of Alert widgets to react to them.")
+        for definition in list(self.alert_rules):
+            name = definition["name"]
+            imgui.push_id(name)
+            if imgui.small_button("X"):
+                self.remove_alert_rule(name)
+            imgui.set_item_tooltip("Remove this alert rule.")
+            imgui.same_line()
+            rule: AlertRule = self._rules.get_rule(name)
+            if rule is not None and rule.active:
+                imgui.text_colored(Colors.red if rule.severity is AlertSeverity.RED else Colors.yellow, "[ACTIVE]")
+                imgui.same_line()
+            imgui.text(f"{name} ({definition['severity']}, for {definition['duration']}s): {definition['condition']}")
+            if rule is not None and rule.error:
+                imgui.text_colored(Colors.red, f"ERROR: {rule.error}")
+            imgui.pop_id()
+        imgui.separator()
+        form = self._alert_rule_form
+        _, form["name"] = imgui.input_text("Name##AlertRule", form["name"])
+        _, form["condition"] = imgui.input_text("Condition##AlertRule", form["condition"])
+        _, form["duration"] = imgui.input_float("Duration (s)##AlertRule", form["duration"])
+        severities = [severity.value for severity in AlertSeverity]
+        _, severity_index = imgui.combo("Severity##AlertRule", severities.index(form["severity"]), severities)
+        form["severity"] = severities[severity_index]
+        if adv_button("Add Alert Rule", "Adds the alert rule. It starts being evaluated right away.",
+                      is_enabled=bool(form["name"] and form["condition"])):
+            if self.add_alert_rule(form["name"], form["condition"], max(0.0, form["duration"]), AlertSeverity(form["severity"])):
+                form["name"], form["condition"] = "", ""
+
+    def _render_hardware_timing_menu(self):
+        """Renders the IMGUI table of the poll timing and tier of each polled hardware."""
+        scheduler = self._scheduler
+        imgui.text_wrapped("Duration of the polls of each hardware (in milliseconds). Hardware that exceed the `hardware_poll_budget` "
+                           "are moved to a slower tier or quarantined.")
+        imgui.text(f"Last poll batch: {scheduler.last_batch_time * 1000:.1f}ms")
+        flags = imgui.TableFlags_.row_bg | imgui.TableFlags_.borders | imgui.TableFlags_.sizing_fixed_fit
+        if not imgui.begin_table("HardwareTiming", 8, flags):
+            return
+        for header in ("Hardware", "Polls", "Last", "P50", "P95", "P99", "Max", "Tier"):
+            imgui.table_setup_column(header)
+        imgui.table_headers_row()
+        for hw in self.get_all_hardware():
+            timing = scheduler.get_timing(hw)
+            if timing.count <= 0:
+                continue
+            imgui.push_id(hw.id)
+            imgui.table_next_row()
+            imgui.table_next_column()
+            imgui.text(hw.full_name)
+            imgui.table_next_column()
+            imgui.text(str(timing.count))
+            for duration in (timing.last, timing.p50.value, timing.p95.value, timing.p99.value, timing.maximum):
+                imgui.table_next_column()
+                imgui.text(f"{duration * 1000:.1f}")
+            imgui.table_next_column()
+            if timing.tier is PollTier.NORMAL:
+                imgui.text_colored(Colors.green, timing.tier.value)
+            else:
+                imgui.text_colored(Colors.yellow if timing.tier is PollTier.SLOW else Colors.red, timing.tier.value)
+                imgui.same_line()
+                if imgui.small_button("Release"):
+                    scheduler.release(hw)
+                    self._schedule_changed = True
+                imgui.set_item_tooltip(f"Moves this hardware back to the normal tier.\nOverruns: {timing.total_overruns}")
+            imgui.pop_id()
+        imgui.end_table()
+
+    def _render_hardware_rate_menu(self, hw: Hardware):
+        """Renders the IMGUI tree-node for editing the polling rate of the given hardware, recursively for its sub-hardware."""
+        imgui.push_id(hw.id)
+        opened = imgui.tree_node(hw.name)
+        imgui.set_item_tooltip(f"ID: {hw.id}\nTYPE: {hw.type}\nSubscribers: {hw.subscribers}")
+        if opened:
+            changed, rate = imgui.slider_float("Rate", hw.polling_rate, 0.0, 60.0, "%.1f")
+            if changed:
+                self.set_hardware_polling_rate(hw, rate)
+            imgui.same_line()
+            imgui.text(f"(current: {1.0 / self._scheduler.get_tier_period(hw):.1f})")
+            for child in hw.children:
+                self._render_hardware_rate_menu(child)
+            imgui.tree_pop()
+        imgui.pop_id()
+
     def save(self):
         """Saves persisted data from the ComputerSystem and its available Sensor Sources to the DataCache."""
         cache = DataCache()
@@ -266,20 +1005,28 @@ class ComputerSystem(metaclass=cmd_utils.Singleton):
         for source_name, source in self._available_sources.items():
             sources_data[source_name] = source.get_data()
         data["sources_data"] = sources_data
+        data["hardware_rates"] = self._hardware_rates
+        data["virtual_sensors"] = self._virtual_source.definitions
+        data["alert_rules"] = self._rules.definitions
         cache.set_data("computersystem_data", data)
 
     def _on_shutdown(self):
         """Application shutdown callback"""
         if self.is_active:
             self.close()
+        self._exporter.stop()
         self.save()
 
-    def __iter__(self) -> Iterator[Hardware]:
-        all_hw = []
+    @property
+    def sources(self) -> list[SensorSource]:
+        """The sensor sources in use: the selected source (if any), and the internal dummy and virtual sources."""
+        sources = [self._dummy_source, self._virtual_source]
         if self.current_source:
-            all_hw.extend(self.current_source.get_all_hardware())
-        all_hw.extend(self._dummy_source.get_all_hardware())
-        return iter(all_hw)
+            sources.insert(0, self.current_source)
+        return sources
+
+    def __iter__(self) -> Iterator[Hardware]:
+        return iter([hw for source in self.sources for hw in source.get_all_hardware()])
 
     def _update_selected_source_editor(self, editor: primitives.StringEditor):
         """Update callback for our `selected_source` property editor."""
@@ -316,42 +1063,51 @@ class InternalSensorEditor(TypeEditor):
         return changed, new_value
 
 
-def render_create_sensor_menu(sensor_tooltip_suffix: str = "", filter: Callable[[InternalSensor], bool] = None) -> InternalSensor | None:
+def render_create_sensor_menu(sensor_tooltip_suffix: str = "", filter: Callable[[InternalSensor], bool] = None,
+                              name_filter: str = None) -> InternalSensor | None:
     """Renders the contents for a menu that allows the user to select a computer sensor.
 
+    The sensor tree is traversed using the ComputerSystem's ``sensor_index``, which caches the results of NAME_FILTER. So
+    this is cheap to call every frame, and only does any actual filtering work when the filter text changes.
+
     Args:
         sensor_tooltip_suffix (str, optional): Extra text to display at the end of the tooltip for each sensor. Defaults to "".
         filter (Callable[[InternalSensor], bool], optional): optional callable that receives a InternalSensor and returns a boolean
             indicating if the sensor can be displayed for the user to select. This only applies to the sensor itself -
             subclasses of the sensor/hardware are checked separately. If None (the default), all sensors are allowed.
+            Unlike NAME_FILTER, this is checked on every call, for every sensor matching the name filter.
+        name_filter (str, optional): optional text to filter sensors by name (case-insensitive). Only sensors whose name contain
+            this text are displayed. If None or empty (the default), all sensors are allowed.
 
     Returns:
         InternalSensor: the InternalSensor object from the ComputerSystem singleton. The object is only returned in the frame the user
         clicked to select that sensor. All other times this will return None.
     """
-    def check_hw(hw: Hardware) -> bool:
-        """Checks if any sensor in the given hardware (or its children hardware) can be displayed."""
-        for sub_hw in hw.children:
-            if check_hw(sub_hw):
-                return True
-        for isensor in hw.isensors:
-            if filter is None or filter(isensor.name):
-                return True
-        return False
+    index = ComputerSystem().sensor_index
+    result = index.filter(name_filter)
+    matches, visible_hardware = result.matches, result.visible_hardware
+    if filter is not None:
+        # Custom filters can't be cached, so we find the visible hardware again with a single pass over the matched sensors.
+        matches = {isensor for isensor in matches if filter(isensor)}
+        visible_hardware = set()
+        for isensor in matches:
+            hw = isensor.parent
+            while hw is not None and hw not in visible_hardware:
+                visible_hardware.add(hw)
+                hw = hw.parent
 
     def render_hw(hw: Hardware) -> InternalSensor | None:
         ret = None
-        if not check_hw(hw):
-            return ret
         opened = imgui.begin_menu(hw.name)
         imgui.set_item_tooltip(f"ID: {hw.id}\nTYPE: {hw.type}\n\n{hw.__doc__}")
         if opened:
-            for sub_hw in hw.children:
-                sub_ret = render_hw(sub_hw)
-                if sub_ret:
-                    ret = sub_ret
-            for isensor in hw.isensors:
-                if filter is None or filter(isensor.name):
+            for sub_hw in index.children[hw]:
+                if sub_hw in visible_hardware:
+                    sub_ret = render_hw(sub_hw)
+                    if sub_ret:
+                        ret = sub_ret
+            for isensor in index.isensors[hw]:
+                if isensor in matches:
                     imgui.push_id(repr(isensor))
                     if adv_button(f"{isensor.name} ({isensor.type}: {isensor.unit})", f"{isensor.info}\n\n{sensor_tooltip_suffix}", in_menu=True):
                         ret = isensor
@@ -360,19 +1116,15 @@ def render_create_sensor_menu(sensor_tooltip_suffix: str = "", filter: Callable[
         return ret
 
     new_sensor = None
-    # Check which of the root hardware objects of the Computer can be displayed
-    checked_hardware: list[Hardware] = []
-    for hardware in ComputerSystem():
-        if check_hw(hardware):
-            checked_hardware.append(hardware)
-    if len(checked_hardware) > 0:
-        # Only display the Sensor menu if we have at least one hardware to display.
+    # Only display the Sensor menu if we have at least one hardware to display.
+    if len(visible_hardware) > 0:
         opened = imgui.begin_menu("Sensors:")
         imgui.set_item_tooltip("Select a sensor to create.\n\nA 'empty' sensor or one already set can be created directly.")
         if opened:
-            for hardware in checked_hardware:
-                ret = render_hw(hardware)
-                if ret:
-                    new_sensor = ret
+            for hardware in index.roots:
+                if hardware in visible_hardware:
+                    ret = render_hw(hardware)
+                    if ret:
+                        new_sensor = ret
             imgui.end_menu()
     return new_sensor
@@ -3,7 +3,7 @@ import math
 import itertools
 from enum import Enum
 from dataclasses import dataclass
-from typing import Iterator, TYPE_CHECKING
+from typing import Iterator, Protocol, TYPE_CHECKING
 from libasvat.utils import format_bytes
 from libasvat.imgui.math import Vector2
 from libasvat.imgui.general import is_user_creatable
@@ -11,6 +11,8 @@ from libasvat.imgui.editors.controller import render_all_properties, get_all_pro
 
 if TYPE_CHECKING:
     from lcarsmonitor.sensors.sensor_node import Sensor
+    from lcarsmonitor.sensors.history import SensorHistory
+    from lcarsmonitor.sensors.stats import SensorStats
 
 
 class SensorSource:
@@ -88,16 +90,20 @@ class SensorSource:
         """
         return self._pretty_name
 
-    def update(self):
+    def update(self, force: bool = False):
         """Updates our hardware, to update all of our sensors.
 
-        The base implementation in SensorSource calls `update()` in all our hardware objects.
+        The base implementation in SensorSource calls `update(force)` in all our hardware objects. Hardware are only
+        actually polled if they have subscribers (Sensor nodes using their sensors), unless ``force`` is True.
 
         This is expected to be a costly call, performance wise. Usually the ComputerSystem singleton
         will call this asynchronously.
+
+        Args:
+            force (bool, optional): if True, all hardware are polled, regardless of subscribers. Defaults to False.
         """
         for hw in self.get_all_hardware():
-            hw.update()
+            hw.update(force)
 
     def render_editor(self):
         """Renders IMGUI controls to edit settings of this SensorSource instance.
@@ -230,6 +236,15 @@ class Hardware:
         self._parent = parent
         self._isensors: list[InternalSensor] = isensors
         self._children: list[Hardware] = children
+        self._subscribers: int = 0
+        self._own_subscribers: int = 0
+        self.polled: bool = False
+        """If this hardware's own data was polled in the last update. Used by the ComputerSystem to only read new
+        data from sensors of polled hardware."""
+        self.polling_rate: float = 0.0
+        """User-set polling rate of this hardware (in updates per second). If 0, the ComputerSystem's default rate is used.
+
+        This is set by the ComputerSystem (see its hardware polling menu)."""
 
     @property
     def id(self) -> str:
@@ -283,7 +298,7 @@ class Hardware:
 
     @property
     def enabled(self):
-        """Checks if this hardware is enabled. That is, if at least one of its sensors (recursively through sub-hardware)
+        """Checks if this hardware is enabled. That is, if at least one of its Sensor nodes (recursively through sub-hardware)
         is enabled"""
         for sensor in self:
             if sensor.enabled:
@@ -292,7 +307,9 @@ class Hardware:
 
     @enabled.setter
     def enabled(self, value: bool):
-        """Sets the 'enabled' flag on all of our sensors to the given value.
+        """Sets the 'enabled' flag on all of our Sensor nodes (recursively through sub-hardware) to the given value.
+
+        Other subscribers of our sensors (such as alert rules) aren't changed, since they're enabled by their own logic.
 
         Args:
             value (bool): if sensors will be enabled or not
@@ -301,27 +318,96 @@ class Hardware:
             sensor.enabled = value
 
     @property
-    def sensors(self):
-        """Gets a list of all existing Sensor objects that use a InternalSensor from this hardware
+    def sensors(self) -> list['Sensor']:
+        """Gets a list of all existing Sensor nodes that use a InternalSensor from this hardware
         (does not include sensors from children hardware).
+
+        Other subscribers of our sensors (such as SensorGroups or alert rules) aren't included. See ``InternalSensor.sensors``.
         """
-        return sum((isen.sensors for isen in self.isensors), [])
+        from lcarsmonitor.sensors.sensor_node import Sensor
+        return [sensor for isen in self.isensors for sensor in isen.sensors if isinstance(sensor, Sensor)]
 
-    def update(self):
-        """Updates this hardware, updating all of our sensors if we're enabled.
+    @property
+    def subscribers(self) -> int:
+        """Number of Sensor nodes subscribed to sensors of this hardware (recursively through sub-hardware).
+
+        Sensor nodes subscribe to their InternalSensor when they start using it, and unsubscribe when they stop using it
+        (or are deleted). Since nodes only exist in opened UISystems, this counts the sensors of this hardware that are
+        actually being used."""
+        return self._subscribers
+
+    @property
+    def is_subscribed(self):
+        """If this hardware (or any of its sub-hardware) has subscribers. Only subscribed hardware are polled on update."""
+        return self._subscribers > 0
+
+    @property
+    def needs_polling(self):
+        """If this hardware's own data needs to be polled. That is, if at least one enabled subscriber (such as a Sensor node)
+        is subscribed to one of our own InternalSensors (sub-hardware are not considered)."""
+        if self._own_subscribers <= 0:
+            return False
+        return any(sensor.enabled for isensor in self._isensors for sensor in isensor.sensors)
+
+    @property
+    def requested_polling_rate(self) -> float:
+        """Highest polling rate (in updates per second) requested by the enabled subscribers of our own sensors.
+        0 if no subscriber requested a specific rate."""
+        rates = [sensor.polling_rate for isensor in self._isensors for sensor in isensor.sensors if sensor.enabled]
+        return max(rates, default=0.0)
+
+    def _add_subscribers(self, amount: int, own: bool = True):
+        """Updates our subscriber counters by the given amount, recursively updating our parent's counters as well.
+
+        Args:
+            amount (int): amount to change. Positive to add subscribers, negative to remove.
+            own (bool, optional): if the subscribers are from our own sensors. Defaults to True.
+        """
+        self._subscribers += amount
+        if own:
+            self._own_subscribers += amount
+        if self._parent is not None:
+            self._parent._add_subscribers(amount, False)
+
+    def update(self, force: bool = False):
+        """Updates this hardware and our children hardware, polling them if they have subscribers.
+
+        Our own data is only polled (see ``self.poll()``) if we need polling (see ``self.needs_polling``), while our
+        children hardware are updated if any of them is subscribed. The ``polled`` flag of all hardware in our tree is
+        updated: children that aren't updated are flagged as not polled.
+
+        Args:
+            force (bool, optional): if True, this hardware and all sub-hardware are polled, regardless of subscribers.
+                Defaults to False.
+        """
+        self.polled = force or self.needs_polling
+        if self.polled:
+            self.poll()
+        if force or self.is_subscribed:
+            for child in self._children:
+                child.update(force)
+        else:
+            for child in self._children:
+                for hw in child.get_all_hardware():
+                    hw.polled = False
+
+    def poll(self):
+        """Polls this hardware's data, updating our InternalSensors. Children hardware are not polled.
 
         Subclasses might need to override this method to perform their own hardware update logic.
-        Remember to call this base method to also update our InternalSensors and children hardware.
+        Remember to call this base method to also update our InternalSensors.
         """
-        if self.enabled:
-            for isensor in self.isensors:
-                isensor.update()
-            for child in self.children:
-                child.update()
+        for isensor in self._isensors:
+            isensor.update()
 
     def __iter__(self) -> Iterator['Sensor']:
+        """Iterates over our Sensor nodes (see ``self.sensors``), and those of all sub-hardware recursively."""
         return itertools.chain(iter(self.sensors), *(iter(child) for child in self.children))
 
+    def get_all_hardware(self) -> Iterator['Hardware']:
+        """Returns an iterator of this hardware and recursively of all sub-hardware we have."""
+        return itertools.chain((self,), *(child.get_all_hardware() for child in self._children))
+
     def get_all_isensors(self) -> Iterator['InternalSensor']:
         """Returns an iterator of all InternalSensors of this hardware and recursively of all sub-hardware we have."""
         return itertools.chain(iter(self.isensors), *(child.get_all_isensors() for child in self.children))
@@ -427,6 +513,31 @@ class SensorUnit(SensorUnitData, Enum):
         return self.UNKNOWN
 
 
+class SensorSubscriber(Protocol):
+    """Interface of the objects that subscribe to an InternalSensor (see ``InternalSensor.sensors``).
+
+    These are Sensor nodes, SensorGroup nodes, virtual sensors (subscribed to the sensors used by their expressions) and alert
+    rules (subscribed to the sensors used by their conditions). Their ``enabled`` flag and ``polling_rate`` are read when
+    scheduling polls, and ``detect_change()`` is called from the ComputerSystem update thread after each poll. ``update()``
+    is called from the render thread, for sensors whose change was detected.
+    """
+
+    @property
+    def enabled(self) -> bool:
+        """If this subscriber is enabled. Hardware are only polled for enabled subscribers."""
+
+    @property
+    def polling_rate(self) -> float:
+        """Polling rate requested by this subscriber, in updates per second. 0 if it doesn't request a specific rate."""
+
+    def detect_change(self, value: float, generation: int) -> bool:
+        """Checks if the given new value of the sensor (from the snapshot of the given generation) is a change for this subscriber.
+        If it is, we'll be notified with ``update()``."""
+
+    def update(self):
+        """Notifies this subscriber that the sensor changed."""
+
+
 class InternalSensor:
     """Represents a single sensor from a hardware device.
 
@@ -441,16 +552,32 @@ class InternalSensor:
     A ``InternalSensor`` contains refs to all ``Sensor`` nodes that use it. The ``Sensor`` class is the proper API to access/use sensor
     data, and it uses its ``InternalSensor`` object internally to access the underlying data.
 
+    The `limits`, `value` and `value_range` properties read live data from the sensor source, which might be changed by the
+    ComputerSystem update thread at any moment. They are read by the ComputerSystem itself to build its ``SensorSnapshot`` after
+    each poll. Other code (such as Sensor nodes) should read these values from the latest snapshot instead.
+
     NOTE: this base class has abstract properties that need to be overriden by subclasses in order to properly implement the
     class to their sensor source. These are: `id`, `name`, `type`, `limits`, `value` and `value_range`.
     """
 
     def __init__(self, parent_hw: Hardware):
         # FIXED SENSOR-RELATED ATTRIBUTES
-        self._sensors: list[Sensor] = []
+        self._sensors: list[SensorSubscriber] = []
         self.parent = parent_hw
         """Parent hardware of this sensor."""
         self._unit: SensorUnit = None
+        self.index: int = -1
+        """Index of this sensor in the ComputerSystem's ``SensorSnapshot`` arrays.
+
+        This is set by the ComputerSystem when it is opened. Its -1 while the sensor isn't indexed."""
+        self.history: SensorHistory = None
+        """History of this sensor's values, with raw samples and min/max/avg rollups.
+
+        This is created by the ComputerSystem when it is opened, and is appended after each poll by its update thread."""
+        self.stats: SensorStats = None
+        """Streaming statistics of this sensor's values: mean/stddev, moving average and percentile.
+
+        Like the history, this is created by the ComputerSystem when it is opened, and is updated after each poll by its update thread."""
 
     @property
     def id(self) -> SensorID:
@@ -542,12 +669,16 @@ class InternalSensor:
         return self.name
 
     @property
-    def sensors(self):
+    def sensors(self) -> list[SensorSubscriber]:
         """Gets the Sensor nodes associated with this InternalSensor/SensorID.
 
         A Sensor node is the proper API for accessing/changing sensor data within the LCARSMonitor,
         while this InternalSensor is only mostly a wrapper to the native sensor data source.
 
+        SensorGroup nodes also subscribe to their member sensors, and are included here as well. So do virtual sensors and
+        alert rules (see ``lcarsmonitor.sensors.rules.AlertRule``) with the sensors used by their expressions. All of them
+        implement the ``SensorSubscriber`` interface.
+
         See ``self.create()`` to create and associate a Sensor to this InternalSensor.
         """
         return self._sensors
@@ -563,21 +694,57 @@ class InternalSensor:
         self._add(sensor)
         return sensor
 
-    def _add(self, sensor: 'Sensor'):
-        """Adds the given Sensor object to our list of sensors, if we haven't already.
+    @property
+    def subscribers(self) -> int:
+        """Number of Sensor nodes subscribed to (using) this InternalSensor."""
+        return len(self._sensors)
+
+    def _add(self, sensor: SensorSubscriber):
+        """Adds the given Sensor object to our list of sensors, if we haven't already, subscribing it to our updates.
         This is used internally when ``self.create()``ing a new sensor object.
         """
         if sensor not in self._sensors:
             self._sensors.append(sensor)
+            if self.parent is not None:
+                self.parent._add_subscribers(1)
 
-    def _remove(self, sensor: 'Sensor'):
-        """Clears our associated Sensor object, if any.
+    def _remove(self, sensor: SensorSubscriber):
+        """Clears our associated Sensor object, if any, unsubscribing it from our updates.
         This is used internally by the Sensor when it is destroyed.
         """
         if sensor in self._sensors:
             self._sensors.remove(sensor)
+            if self.parent is not None:
+                self.parent._add_subscribers(-1)
 
     def update(self):
-        """Updates this InternalSensor, calling update() on all our existing Sensor nodes."""
+        """Updates this InternalSensor's data from its source.
+
+        This is called by our parent Hardware when it is updated, from the ComputerSystem update thread. The base
+        implementation does nothing. Subclasses may override it if they need to refresh their data per-sensor.
+
+        Note that Sensor nodes using this InternalSensor aren't updated here: after the poll's ``SensorSnapshot`` is published,
+        the ComputerSystem queues an update event for this sensor, and notifies the nodes from the render thread
+        (see ``self.notify_sensors()`` and ``ComputerSystem.process_sensor_events()``).
+        """
+        pass
+
+    def detect_changes(self, value: float, generation: int) -> bool:
+        """Checks if the given new value of this sensor is a meaningful change for any of our Sensor nodes.
+
+        Each node checks the value against its own deadband settings (see ``Sensor.detect_change()``). This is called by the
+        ComputerSystem update thread after each poll, with the value and generation of the new snapshot.
+
+        Returns:
+            bool: if at least one of our Sensor nodes detected a change, and thus needs to be notified.
+        """
+        changed = False
+        for sensor in self._sensors:
+            if sensor.detect_change(value, generation):
+                changed = True
+        return changed
+
+    def notify_sensors(self):
+        """Calls update() on all our existing Sensor nodes, notifying them that a new sensor value is available."""
         for sensor in self.sensors:
             sensor.update()
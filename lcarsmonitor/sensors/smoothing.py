@@ -0,0 +1,139 @@
+import threading
+import numpy as np
+from enum import Enum
+
+
+class SmoothingFilter(Enum):
+    """Smoothing filters that can be applied to the values of a sensor.
+    * NONE: no smoothing, values are used as measured.
+    * EMA: exponential moving average.
+    * MEDIAN: median of the last N values. Removes spikes without lagging as much as the averages.
+    * KALMAN: simple 1D Kalman filter, assuming a mostly constant value with noisy measurements.
+    """
+    NONE = "NONE"
+    """No smoothing: values are used as measured."""
+    EMA = "EMA"
+    """Exponential moving average. Higher strengths give less weight to new values."""
+    MEDIAN = "MEDIAN"
+    """Median of the last N values. Higher strengths use more values (up to ``BatchSmoother.MAX_MEDIAN_WINDOW``)."""
+    KALMAN = "KALMAN"
+    """Simple 1D Kalman filter. Higher strengths assume measurements are noisier, relative to actual value changes."""
+
+
+_FILTER_CODES = {filter: code for code, filter in enumerate(SmoothingFilter)}
+_NONE, _EMA, _MEDIAN, _KALMAN = (_FILTER_CODES[filter] for filter in SmoothingFilter)
+
+
+class BatchSmoother:
+    """Applies smoothing filters to the values of all sensors at once, with vectorized NumPy operations.
+
+    Each sensor (by its index in the ComputerSystem's snapshots) may use a different filter (see ``SmoothingFilter``) with its own
+    strength, in [0, ``MAX_STRENGTH``]. The state of all filters is kept in flat arrays, so each poll is a few vectorized operations over the
+    sensors of each filter type, instead of per-sensor python code.
+
+    Filters are configured by any thread with ``configure()``, and these changes are applied by the ComputerSystem update thread
+    in its next ``apply()``.
+    """
+
+    MAX_MEDIAN_WINDOW = 15
+    """Maximum number of values used by the MEDIAN filter (with the maximum strength)."""
+    MAX_STRENGTH = 0.99
+    """Maximum strength of the filters. Strengths are clamped to this, since with a strength of 1 the EMA and KALMAN filters
+    would ignore new values, freezing the smoothed value."""
+
+    def __init__(self, count: int):
+        self.count = count
+        """Number of sensors."""
+        self._filters = np.zeros(count, dtype=np.int8)
+        self._strengths = np.zeros(count)
+        self._estimates = np.full(count, np.nan)
+        self._variances = np.ones(count)
+        self._windows = np.full((count, self.MAX_MEDIAN_WINDOW), np.nan)
+        self._window_sizes = np.ones(count, dtype=np.intp)
+        self._heads = np.zeros(count, dtype=np.intp)
+        self._pending: dict[int, tuple[SmoothingFilter, float]] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def is_active(self):
+        """If any sensor has a smoothing filter (or a filter change is pending)."""
+        return len(self._pending) > 0 or bool(self._filters.any())
+
+    def configure(self, index: int, filter: SmoothingFilter, strength: float):
+        """Sets the smoothing filter of the sensor with the given index, resetting its filter state.
+
+        Args:
+            index (int): index of the sensor.
+            filter (SmoothingFilter): filter to use.
+            strength (float): strength of the filter, in [0, 1]. Clamped to ``MAX_STRENGTH``.
+        """
+        if 0 <= index < self.count:
+            with self._lock:
+                self._pending[index] = (filter, min(self.MAX_STRENGTH, max(0.0, strength)))
+
+    def get_filter(self, index: int) -> SmoothingFilter:
+        """Gets the smoothing filter currently used by the sensor with the given index."""
+        return list(SmoothingFilter)[self._filters[index]]
+
+    def _apply_pending(self):
+        """Applies pending filter changes, resetting the state of the changed sensors."""
+        with self._lock:
+            pending, self._pending = self._pending, {}
+        for index, (filter, strength) in pending.items():
+            self._filters[index] = _FILTER_CODES[filter]
+            self._strengths[index] = strength
+            self._estimates[index] = np.nan
+            self._variances[index] = 1.0
+            self._windows[index] = np.nan
+            self._window_sizes[index] = 1 + round(strength * (self.MAX_MEDIAN_WINDOW - 1))
+            self._heads[index] = 0
+
+    def apply(self, values: np.ndarray, polled: np.ndarray) -> np.ndarray:
+        """Applies the smoothing filters to the given sensor values.
+
+        Args:
+            values (np.ndarray): the new values of all sensors (NaN for no value).
+            polled (np.ndarray): boolean mask of the sensors with new values. The state of other sensors isn't changed,
+                and their smoothed value stays the same.
+
+        Returns:
+            np.ndarray: the smoothed values. Sensors without filters have their given value.
+        """
+        self._apply_pending()
+        filters = self._filters
+        updated = polled & ~np.isnan(values)
+        smoothed = values.copy()
+
+        # EMA: estimate += alpha * (value - estimate), with alpha = 1 - strength.
+        ema = np.flatnonzero(updated & (filters == _EMA))
+        if len(ema) > 0:
+            estimates = self._estimates[ema]
+            new_values = values[ema]
+            alphas = 1.0 - self._strengths[ema]
+            self._estimates[ema] = np.where(np.isnan(estimates), new_values, estimates + alphas * (new_values - estimates))
+
+        # MEDIAN: ring-buffer of the last N values of each sensor. Unused slots are NaN, and are ignored by the median.
+        median = np.flatnonzero(updated & (filters == _MEDIAN))
+        if len(median) > 0:
+            heads = self._heads[median]
+            self._windows[median, heads] = values[median]
+            self._heads[median] = (heads + 1) % self._window_sizes[median]
+            self._estimates[median] = np.nanmedian(self._windows[median], axis=1)
+
+        # KALMAN: constant-value model. Measurement noise is 1, and the process noise is derived from the strength, so the
+        # filter gain (and thus the smoothing) only depends on the strength, regardless of the scale of the values.
+        kalman = np.flatnonzero(updated & (filters == _KALMAN))
+        if len(kalman) > 0:
+            estimates = self._estimates[kalman]
+            new_values = values[kalman]
+            strengths = np.maximum(self._strengths[kalman], 1e-3)
+            process_noise = ((1.0 - strengths) / strengths) ** 2
+            variances = self._variances[kalman] + process_noise
+            gains = variances / (variances + 1.0)
+            first = np.isnan(estimates)
+            self._estimates[kalman] = np.where(first, new_values, estimates + gains * (new_values - estimates))
+            self._variances[kalman] = np.where(first, 1.0, (1.0 - gains) * variances)
+
+        filtered = (filters != _NONE) & ~np.isnan(values)
+        smoothed[filtered] = self._estimates[filtered]
+        return smoothed
@@ -0,0 +1,168 @@
+import math
+import time
+from array import array
+from typing import Collection, Sequence, TYPE_CHECKING
+from libasvat.imgui.math import Vector2
+
+if TYPE_CHECKING:
+    from lcarsmonitor.sensors.sensors_api import InternalSensor
+
+
+class SensorSnapshot:
+    """Immutable snapshot of the values of all sensors from the ComputerSystem, taken at a single poll.
+
+    The ComputerSystem update thread builds a new snapshot after each poll, reading all sensor data from the
+    sensor sources, and then publishes it by simply swapping its reference to the new snapshot object. Since
+    a snapshot is never changed after being published, readers (the render thread, Sensor nodes, exporters, etc)
+    can read it without locks and without the risk of getting torn reads (such as a value from the current poll
+    and a min/max from the previous one).
+
+    Sensor data is stored in flat arrays, indexed by each InternalSensor's ``index`` (set by the ComputerSystem when opened).
+    Missing data (such as a sensor with no value or no limits) is stored as NaN.
+
+    Readers should get the snapshot object once (``ComputerSystem().snapshot``) and use it for a related set of reads,
+    in order to keep these reads consistent between themselves.
+    """
+
+    __slots__ = ("generation", "timestamp", "values", "smoothed", "minimums", "maximums", "limits_min", "limits_max",
+                 "_shared_ranges")
+
+    def __init__(self, generation: int = 0, timestamp: float = 0.0, values: array = None, minimums: array = None,
+                 maximums: array = None, limits_min: array = None, limits_max: array = None, smoothed: array = None):
+        self.generation = generation
+        """Generation counter of this snapshot. Each newly published snapshot has a generation 1 higher than the previous one.
+        The empty snapshot (before the first poll) has generation 0."""
+        self.timestamp = timestamp
+        """Time (from ``time.perf_counter()``) at which this snapshot was built."""
+        self.values: array = values if values is not None else array("d")
+        """Current values of all sensors, by sensor index."""
+        self.smoothed: array = smoothed if smoothed is not None else self.values
+        """Current values of all sensors after smoothing, by sensor index. Sensors without a smoothing filter have the same values
+        as in ``self.values`` (if no sensor has a filter, this is the same array)."""
+        self.minimums: array = minimums if minimums is not None else array("d")
+        """Minimum recorded values of all sensors, by sensor index."""
+        self.maximums: array = maximums if maximums is not None else array("d")
+        """Maximum recorded values of all sensors, by sensor index."""
+        self.limits_min: array = limits_min if limits_min is not None else array("d")
+        """Minimum limit of all sensors, by sensor index. NaN if the sensor has no limits."""
+        self.limits_max: array = limits_max if limits_max is not None else array("d")
+        """Maximum limit of all sensors, by sensor index. NaN if the sensor has no limits."""
+        self._shared_ranges = False
+
+    @classmethod
+    def from_isensors(cls, isensors: Collection['InternalSensor'], generation: int, previous: 'SensorSnapshot' = None,
+                      polled: Sequence['InternalSensor'] = None):
+        """Builds a new snapshot by reading the data of the given InternalSensors.
+
+        This reads data from the sensors themselves, which means it may call native APIs of the sensor source,
+        so this is expected to be called from the ComputerSystem update thread.
+
+        Args:
+            isensors (Collection[InternalSensor]): all sensors, indexed by their ``index``.
+            generation (int): generation number of the new snapshot.
+            previous (SensorSnapshot, optional): the previously published snapshot. If given (and with the same sensors), only
+                sensors whose hardware were polled in the last update are read, while the data of all other sensors is copied
+                from this previous snapshot. Otherwise all sensors are read.
+            polled (Sequence[InternalSensor], optional): the sensors whose hardware were polled in the last update, when the
+                caller already knows them. With a valid ``previous`` snapshot, only these sensors are read, instead of checking
+                the ``polled`` flag of the hardware of all sensors.
+
+        Returns:
+            SensorSnapshot: the new snapshot.
+        """
+        count = len(isensors)
+        if previous is not None and len(previous) == count:
+            # Ranges and limits rarely change, so the previous arrays are shared until a read sensor changes them.
+            values = array("d", previous.values)
+            minimums, maximums = previous.minimums, previous.maximums
+            limits_min, limits_max = previous.limits_min, previous.limits_max
+            shared_ranges = shared_limits = True
+            if polled is None:
+                polled = [isensor for isensor in isensors if isensor.parent.polled]
+        else:
+            values = array("d", bytes(8 * count))
+            minimums = array("d", values)
+            maximums = array("d", values)
+            limits_min = array("d", values)
+            limits_max = array("d", values)
+            shared_ranges = shared_limits = False
+            polled = isensors
+        nan = math.nan
+        for isensor in polled:
+            index = isensor.index
+            value = isensor.value
+            values[index] = nan if value is None else value
+            value_range = isensor.value_range
+            low, high = value_range.x, value_range.y
+            if shared_ranges and (_differs(minimums[index], low) or _differs(maximums[index], high)):
+                minimums, maximums = array("d", minimums), array("d", maximums)
+                shared_ranges = False
+            minimums[index] = low
+            maximums[index] = high
+            limits = isensor.limits
+            low, high = (nan, nan) if limits is None else (limits.x, limits.y)
+            if shared_limits and (_differs(limits_min[index], low) or _differs(limits_max[index], high)):
+                limits_min, limits_max = array("d", limits_min), array("d", limits_max)
+                shared_limits = False
+            limits_min[index] = low
+            limits_max[index] = high
+        snapshot = cls(generation, time.perf_counter(), values, minimums, maximums, limits_min, limits_max)
+        snapshot._shared_ranges = shared_ranges
+        return snapshot
+
+    def set_value_range(self, index: int, minimum: float, maximum: float):
+        """Sets the (min, max) recorded values of the sensor with the given index, while this snapshot is being built
+        (such as by virtual sensors, before the snapshot is published). Published snapshots should never be changed.
+
+        The range arrays may be shared with the previous snapshot (see ``from_isensors()``), so they're copied before the first change.
+        """
+        if self._shared_ranges:
+            if not _differs(self.minimums[index], minimum) and not _differs(self.maximums[index], maximum):
+                return
+            self.minimums, self.maximums = array("d", self.minimums), array("d", self.maximums)
+            self._shared_ranges = False
+        self.minimums[index] = minimum
+        self.maximums[index] = maximum
+
+    def __len__(self):
+        return len(self.values)
+
+    def has_index(self, index: int):
+        """Checks if the given sensor index exists in this snapshot."""
+        return 0 <= index < len(self.values)
+
+    def get_value(self, index: int) -> float | None:
+        """Gets the value of the sensor with the given index. None if the sensor has no value or index is invalid."""
+        if not self.has_index(index):
+            return None
+        value = self.values[index]
+        return None if math.isnan(value) else value
+
+    def get_smoothed_value(self, index: int) -> float | None:
+        """Gets the smoothed value of the sensor with the given index. None if the sensor has no value or index is invalid."""
+        if not self.has_index(index):
+            return None
+        value = self.smoothed[index]
+        return None if math.isnan(value) else value
+
+    def get_value_range(self, index: int) -> Vector2:
+        """Gets the (min, max) recorded values of the sensor with the given index.
+        Returns ``(inf, -inf)`` if index is invalid."""
+        if not self.has_index(index):
+            return Vector2(math.inf, -math.inf)
+        return Vector2(self.minimums[index], self.maximums[index])
+
+    def get_limits(self, index: int) -> Vector2 | None:
+        """Gets the (min, max) limits of the sensor with the given index. None if the sensor has no limits or index is invalid."""
+        if not self.has_index(index):
+            return None
+        low = self.limits_min[index]
+        high = self.limits_max[index]
+        if math.isnan(low) or math.isnan(high):
+            return None
+        return Vector2(low, high)
+
+
+def _differs(a: float, b: float):
+    """Checks if the given floats are different, considering NaN equal to NaN."""
+    return a != b and (a == a or b == b)
@@ -0,0 +1,110 @@
+##################################
+# Sensor API implementation for the LCARS SENSOR DAEMON!
+###
+# Proxies the sensors published in shared memory by a `lcarsmonitor sensord` process, which runs
+# another SensorSource out-of-process. See `lcarsmonitor.sensors.daemon`.
+##################################
+import math
+import time
+import libasvat.imgui.editors.primitives as primitives
+from array import array
+from lcarsmonitor.sensors.sensors_api import SensorSource
+from lcarsmonitor.sensors.catalog import CatalogHardware, CatalogSensor
+from lcarsmonitor.sensors.daemon import SharedSensorTable, DEFAULT_SHARED_MEMORY_NAME, SENSOR_FIELDS, STALE_TIMEOUT, read_catalog
+
+
+class DaemonSensors(SensorSource):
+    """LCARSMonitor Sensor Source implementation that reads sensors from a Sensor Daemon process.
+
+    The sensor daemon (started with the ``lcarsmonitor sensord`` command) runs another SensorSource in a separate process, publishing
+    its sensors in shared memory. This source exposes the same hardware and sensors, but polling them only copies their latest values
+    from shared memory. So slow native hardware updates happen in the daemon process, without affecting our GUI's rendering.
+
+    Several GUI processes can use the same daemon at the same time.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self._pretty_name = "Sensor Daemon"
+        self._shared_memory_name = DEFAULT_SHARED_MEMORY_NAME
+        self._table: SharedSensorTable = None
+        self._last_check: tuple[float, bool, str] = (-math.inf, False, "")
+
+    @primitives.string_property()
+    def shared_memory_name(self) -> str:
+        """Name of the shared memory published by the sensor daemon [GET/SET].
+
+        This should match the ``--name`` option given to ``lcarsmonitor sensord``. The default value is the default of that command.
+        """
+        return self._shared_memory_name
+
+    @shared_memory_name.setter
+    def shared_memory_name(self, value: str):
+        self._shared_memory_name = value
+        self._last_check = (-math.inf, False, "")
+
+    def check_availability(self):
+        # This is called often, and attaching to the shared memory isn't free, so we only check once per second.
+        check_time, is_ok, message = self._last_check
+        now = time.perf_counter()
+        if now - check_time < 1.0:
+            return is_ok, message
+        if self._table is not None:
+            heartbeat = self._table.heartbeat
+        else:
+            try:
+                table = SharedSensorTable.attach(self._shared_memory_name)
+            except (FileNotFoundError, ValueError):
+                heartbeat = None
+            else:
+                heartbeat = table.heartbeat
+                table.close()
+        if heartbeat is None:
+            is_ok, message = False, f"Sensor daemon '{self._shared_memory_name}' not found. Run `lcarsmonitor sensord` to start it"
+        elif time.time() - heartbeat > STALE_TIMEOUT:
+            is_ok, message = False, f"Sensor daemon '{self._shared_memory_name}' isn't updating"
+        else:
+            is_ok, message = True, f"Sensor daemon '{self._shared_memory_name}' is running"
+        self._last_check = (now, is_ok, message)
+        return is_ok, message
+
+    def initialize(self):
+        catalog = read_catalog(f"{self._shared_memory_name}_catalog")
+        self._table = SharedSensorTable.attach(self._shared_memory_name)
+        roots, _ = DaemonHardware.build_tree(catalog, self._table)
+        self._hardwares.extend(roots)
+        self._pretty_name = f"Sensor Daemon ({catalog['source']})"
+
+    def shutdown(self):
+        super().shutdown()
+        if self._table is not None:
+            self._table.close()
+            self._table = None
+        self._pretty_name = "Sensor Daemon"
+
+
+class DaemonSensor(CatalogSensor):
+    """A sensor from the daemon's catalog. Its data is read from the rows copied by our parent hardware."""
+
+    def update(self):
+        row = (self.row - self.parent.start) * SENSOR_FIELDS
+        self.set_data(*self.parent._rows[row:row + SENSOR_FIELDS])
+
+
+class DaemonHardware(CatalogHardware):
+    """A hardware from the daemon's catalog. Polling copies the rows of our sensors from the shared table."""
+
+    SENSOR_CLASS = DaemonSensor
+
+    def __init__(self, table: SharedSensorTable, index: int, record: dict, parent: 'DaemonHardware' = None):
+        super().__init__(index, record, parent)
+        self._table = table
+        self._rows = array("d", [math.nan] * (SENSOR_FIELDS * len(self._isensors)))
+        """Rows of our sensors, copied from the shared table on the last poll."""
+        self._rows_view = memoryview(self._rows).cast("B")
+
+    def poll(self):
+        # Tells the daemon we're using this hardware, so it keeps polling it.
+        self._table.demand[self.index] = time.time()
+        if len(self._rows) > 0 and self._table.read_rows(self.start, self._rows_view):
+            return super().poll()
@@ -0,0 +1,262 @@
+##################################
+# Sensor API implementation for Linux HWMON!
+# See https://www.kernel.org/doc/html/latest/hwmon/sysfs-interface.html
+###
+# Reads sensor data directly from the sysfs interface of the Linux kernel's hardware monitoring
+# drivers (usually at /sys/class/hwmon). No external libraries or apps are needed.
+##################################
+import os
+import re
+import math
+import click
+import libasvat.imgui.editors.primitives as primitives
+from libasvat.imgui.math import Vector2
+from lcarsmonitor.sensors.sensors_api import SensorSource, SensorID, HardwareType, SensorType, Hardware, InternalSensor
+
+HWMON_KINDS: dict[str, tuple[SensorType, float]] = {
+    "temp": (SensorType.Temperature, 1e-3),  # millidegree Celsius
+    "fan": (SensorType.Fan, 1.0),  # RPM
+    "in": (SensorType.Voltage, 1e-3),  # millivolts
+    "power": (SensorType.Power, 1e-6),  # microwatts
+    "curr": (SensorType.Current, 1e-3),  # milliamperes
+}
+"""Supported hwmon sensor kinds (the prefix of the sysfs attribute names), mapped to their ``(SensorType, scale)``.
+The scale converts the raw sysfs value to the SI unit used by the SensorType."""
+
+HWMON_INPUT_PATTERN = re.compile(r"^(temp|fan|in|power|curr)(\d+)_input$")
+"""Regex matching the sysfs attribute files with the current value of a hwmon sensor."""
+
+HWMON_HARDWARE_TYPES: dict[str, HardwareType] = {
+    "coretemp": HardwareType.CPU,
+    "k10temp": HardwareType.CPU,
+    "k8temp": HardwareType.CPU,
+    "zenpower": HardwareType.CPU,
+    "cpu_thermal": HardwareType.CPU,
+    "amdgpu": HardwareType.GPU,
+    "radeon": HardwareType.GPU,
+    "nouveau": HardwareType.GPU,
+    "i915": HardwareType.GPU,
+    "nvme": HardwareType.Storage,
+    "drivetemp": HardwareType.Storage,
+    "acpitz": HardwareType.Motherboard,
+    "pch_cannonlake": HardwareType.Motherboard,
+    "spd5118": HardwareType.Memory,
+    "jc42": HardwareType.Memory,
+    "iwlwifi_1": HardwareType.Network,
+    "r8169": HardwareType.Network,
+    "BAT0": HardwareType.Battery,
+    "BAT1": HardwareType.Battery,
+}
+"""Known hwmon chip names (contents of the ``name`` attribute), mapped to their HardwareType.
+Names matching ``SUPERIO_PREFIXES`` are SuperIO chips, and any other unknown name is of Unknown type."""
+
+SUPERIO_PREFIXES = ("nct", "it8", "w83", "f71", "asus", "dell_smm", "thinkpad")
+"""Prefixes of hwmon chip names that are SuperIO/embedded-controller chips in the motherboard."""
+
+
+def read_sysfs_text(path: str, default: str = None):
+    """Reads the given sysfs attribute file as stripped text. Returns DEFAULT if the file can't be read."""
+    try:
+        with open(path, "r") as f:
+            return f.read().strip()
+    except OSError:
+        return default
+
+
+def read_sysfs_number(path: str, scale: float = 1.0, default: float = None):
+    """Reads the given sysfs attribute file as a number, multiplied by SCALE. Returns DEFAULT if the file can't be read."""
+    text = read_sysfs_text(path)
+    if text is None:
+        return default
+    try:
+        return int(text) * scale
+    except ValueError:
+        return default
+
+
+class HwmonSensors(SensorSource):
+    """LCARSMonitor Sensor Source implementation using the Linux kernel's HWMON sysfs interface.
+
+    Each folder in the hwmon class folder (``/sys/class/hwmon/hwmon*``) is a hardware monitoring chip, which becomes a Hardware.
+    Each ``{temp,fan,in,power,curr}*_input`` attribute file of a chip is a sensor, which becomes a InternalSensor with the appropriate
+    SensorType and scaled to our SI units.
+
+    The sensor's attribute files are opened when this source is initialized, and their file descriptors are kept open until shutdown.
+    Each poll then only re-reads the files with ``os.pread`` (sysfs regenerates the file contents when reading from offset 0), avoiding
+    the open/close syscalls of every read.
+
+    The path to the hwmon class folder is configurable, so this source can also read from a copy or fake of the sysfs tree.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self._pretty_name = "Linux HWMON"
+        self._sysfs_path = "/sys/class/hwmon"
+
+    @primitives.string_property(is_folder=True)
+    def sysfs_path(self) -> str:
+        """Path to the hwmon class folder in sysfs [GET/SET].
+
+        This folder should contain the ``hwmon*`` folders (usually symlinks) of each hardware monitoring chip. The default
+        ``/sys/class/hwmon`` is the correct path in any Linux system, so this should only be changed for testing with a fake tree.
+
+        Changing this while this source is in use won't change the loaded sensors. Re-select the source to reload them.
+        """
+        return self._sysfs_path
+
+    @sysfs_path.setter
+    def sysfs_path(self, value: str):
+        self._sysfs_path = value
+
+    def check_availability(self):
+        if not hasattr(os, "pread"):
+            return False, "HWMON is only available on Linux"
+        if not self._sysfs_path or not os.path.isdir(self._sysfs_path):
+            return False, f"HWMON folder '{self._sysfs_path}' not found"
+        return True, "HWMON folder found"
+
+    def initialize(self):
+        chips: list[tuple[str, str, str]] = []
+        for entry in os.listdir(self._sysfs_path):
+            path = os.path.join(self._sysfs_path, entry)
+            if not entry.startswith("hwmon") or not os.path.isdir(path):
+                continue
+            # Some older drivers place their attributes in the device folder instead.
+            if not os.path.isfile(os.path.join(path, "name")) and os.path.isfile(os.path.join(path, "device", "name")):
+                path = os.path.join(path, "device")
+            name = read_sysfs_text(os.path.join(path, "name"), entry)
+            # The hwmonN numbering may change between boots, so chips are sorted (and identified) by their name and device path.
+            device = os.path.realpath(os.path.join(path, "device"))
+            chips.append((name, device, path))
+        chips.sort()
+
+        name_counts: dict[str, int] = {}
+        for name, _, path in chips:
+            index = name_counts.get(name, 0)
+            name_counts[name] = index + 1
+            hw = HwmonHardware(path, name, index)
+            if len(hw.isensors) > 0:
+                self._hardwares.append(hw)
+            else:
+                hw.close()
+
+    def shutdown(self):
+        for hw in self._hardwares:
+            hw.close()
+        super().shutdown()
+
+
+class HwmonHardware(Hardware):
+    """A hardware monitoring chip from HWMON. Its sensors are all attribute files in the chip's sysfs folder."""
+
+    def __init__(self, path: str, name: str, index: int):
+        super().__init__(None, [], [])
+        self.path = path
+        """Path to this chip's sysfs folder."""
+        self._name = name
+        self._id = f"/hwmon/{name}/{index}"
+        self._type = HWMON_HARDWARE_TYPES.get(name)
+        if self._type is None:
+            self._type = HardwareType.SuperIO if name.lower().startswith(SUPERIO_PREFIXES) else HardwareType.Unknown
+
+        attributes = []
+        for filename in os.listdir(path):
+            match = HWMON_INPUT_PATTERN.match(filename)
+            if match:
+                attributes.append((match.group(1), int(match.group(2))))
+        attributes.sort()
+        for kind, number in attributes:
+            try:
+                self._isensors.append(HwmonSensor(self, kind, number))
+            except OSError as e:
+                click.secho(f"[HwmonSensors] Couldn't open sensor '{kind}{number}' of '{path}': {e}", fg="yellow")
+
+    @property
+    def id(self):
+        return self._id
+
+    @property
+    def name(self):
+        return self._name
+
+    @property
+    def type(self):
+        return self._type
+
+    def close(self):
+        """Closes the file descriptors of all our sensors."""
+        for isensor in self._isensors:
+            isensor.close()
+
+
+class HwmonSensor(InternalSensor):
+    """A single sensor from a HWMON chip, such as ``temp1`` or ``fan2``.
+
+    Keeps the ``<kind><number>_input`` attribute file of the sensor open, re-reading it with ``os.pread`` on each update.
+    The sensor's name and limits are read once, on creation.
+    """
+
+    def __init__(self, parent_hw: HwmonHardware, kind: str, number: int):
+        super().__init__(parent_hw)
+        self._type, self._scale = HWMON_KINDS[kind]
+        self._id = SensorID(f"{parent_hw.id}/{self._type.value.lower()}/{number}")
+        prefix = os.path.join(parent_hw.path, f"{kind}{number}")
+        self._name = read_sysfs_text(f"{prefix}_label") or f"{self._type.value} #{number}"
+
+        low = read_sysfs_number(f"{prefix}_min", self._scale)
+        high = read_sysfs_number(f"{prefix}_crit", self._scale)
+        if high is None:
+            high = read_sysfs_number(f"{prefix}_max", self._scale)
+        self._limits: Vector2 = None
+        if high is not None:
+            self._limits = Vector2(low if low is not None else 0.0, high)
+
+        self._value: float = None
+        self._min = math.inf
+        self._max = -math.inf
+        self._fd = os.open(f"{prefix}_input", os.O_RDONLY)
+
+    @property
+    def id(self):
+        return self._id
+
+    @property
+    def name(self):
+        return self._name
+
+    @property
+    def type(self):
+        return self._type
+
+    @property
+    def limits(self):
+        return self._limits
+
+    @property
+    def value(self):
+        return self._value
+
+    @property
+    def value_range(self):
+        return Vector2(self._min, self._max)
+
+    def update(self):
+        if self._fd < 0:
+            return
+        try:
+            value = int(os.pread(self._fd, 32, 0)) * self._scale
+        except (OSError, ValueError):
+            # Some drivers fail reads while the device is sleeping/unavailable (such as EIO or ENODATA).
+            self._value = None
+            return
+        self._value = value
+        if value < self._min:
+            self._min = value
+        if value > self._max:
+            self._max = value
+
+    def close(self):
+        """Closes our attribute file descriptor. Can be called multiple times."""
+        if self._fd >= 0:
+            os.close(self._fd)
+            self._fd = -1
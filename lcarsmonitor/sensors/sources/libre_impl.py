@@ -648,14 +648,17 @@ class LibreHardware(Hardware):
         self._hw = hw
         """Internal IHardware object from native C#"""
         self._type: HardwareType = None
+        # Identification values are fixed, so we cache them to avoid native calls whenever they're used.
+        self._id = str(hw.Identifier)
+        self._name = str(hw.Name)
 
     @property
     def id(self):
-        return str(self._hw.Identifier)
+        return self._id
 
     @property
     def name(self):
-        return str(self._hw.Name)
+        return self._name
 
     @property
     def type(self):
@@ -663,10 +666,9 @@ class LibreHardware(Hardware):
             self._type = HardwareType.from_obj(self._hw.HardwareType)
         return self._type
 
-    def update(self):
-        if self.enabled:
-            self._hw.Update()
-            return super().update()
+    def poll(self):
+        self._hw.Update()
+        return super().poll()
 
 
 class LibreSensor(InternalSensor):
@@ -687,14 +689,18 @@ class LibreSensor(InternalSensor):
         self.isensor = internal_sensor  # LibreHardwareMonitor.Hardware.ISensor
         """Internal, fixed, ISensor object from LibreHardwareMonitor to access sensor data."""
         self._type: SensorType = None
+        # Identification values are fixed, so we cache them to avoid native calls whenever they're used
+        # (Sensor nodes check their ID on every data access).
+        self._id = SensorID(internal_sensor.Identifier)
+        self._name = str(internal_sensor.Name)
 
     @property
     def id(self):
-        return SensorID(self.isensor.Identifier)
+        return self._id
 
     @property
     def name(self):
-        return str(self.isensor.Name)
+        return self._name
 
     @property
     def type(self):
@@ -0,0 +1,494 @@
+##################################
+# Sensor API implementation for Linux PROCFS!
+# See https://www.kernel.org/doc/html/latest/filesystems/proc.html
+###
+# Derives CPU load, memory usage, disk and network throughput from the kernel's procfs files
+# (usually at /proc). Most of these are counters, so the values are deltas between consecutive polls.
+##################################
+import os
+import re
+import math
+import time
+import click
+import libasvat.imgui.editors.primitives as primitives
+from array import array
+from typing import Sequence
+from libasvat.imgui.math import Vector2
+from lcarsmonitor.sensors.sensors_api import SensorSource, SensorID, HardwareType, SensorType, Hardware, InternalSensor
+
+IGNORED_DISKS_PATTERN = re.compile(r"^(loop|ram|zram|sr|fd|dm-|md)\d*|^(sd|hd|vd|xvd)[a-z]+\d+$|^(nvme\d+n\d+|mmcblk\d+)p\d+$")
+"""Regex matching the names of block devices from ``/proc/diskstats`` that are ignored: virtual devices and partitions."""
+IGNORED_NICS = (b"lo",)
+"""Names of network interfaces from ``/proc/net/dev`` that are ignored."""
+KB_TO_GB = 1.0 / (1024 * 1024)
+SECTOR_SIZE = 512
+"""Size in bytes of the sectors counted in ``/proc/diskstats``. This is always 512, regardless of the device."""
+
+
+class ProcFile:
+    """A procfs file kept open for repeated reading.
+
+    The file descriptor is opened on creation and kept open until ``close()``. Each ``read()`` re-reads the whole file
+    with ``os.pread``, since procfs regenerates the file contents when reading from offset 0.
+    """
+
+    def __init__(self, path: str, chunk_size: int = 65536):
+        self.path = path
+        """Path to the file."""
+        self.chunk_size = chunk_size
+        """Amount of bytes read at each ``os.pread`` call."""
+        self._fd = os.open(path, os.O_RDONLY)
+
+    def read(self) -> bytes:
+        """Reads the whole contents of the file."""
+        data = os.pread(self._fd, self.chunk_size, 0)
+        if len(data) < self.chunk_size:
+            return data
+        chunks = [data]
+        offset = len(data)
+        while len(data) > 0:
+            data = os.pread(self._fd, self.chunk_size, offset)
+            chunks.append(data)
+            offset += len(data)
+        return b"".join(chunks)
+
+    def close(self):
+        """Closes our file descriptor. Can be called multiple times."""
+        if self._fd >= 0:
+            os.close(self._fd)
+            self._fd = -1
+
+
+class ProcSensors(SensorSource):
+    """LCARSMonitor Sensor Source implementation using the Linux kernel's procfs files.
+
+    Provides the following hardware, each reading a single procfs file:
+    * CPU: total and per-core Load, from ``/proc/stat``.
+    * Memory: used/available Data and Load of physical and virtual (swap) memory, from ``/proc/meminfo``.
+    * Storage: per-disk read/write Throughput and activity Load, from ``/proc/diskstats``.
+    * Network: per-interface download/upload Throughput, from ``/proc/net/dev``.
+
+    Each file is kept open, and is read and parsed only once per poll of its hardware. Parsing matches the lines we need with a
+    compiled regex, which captures only the counters we use (see ``counters_pattern()``), writing them into preallocated arrays.
+    Values are then computed from the delta between the counters of consecutive polls, so the first poll of a counter-based sensor
+    yields no value.
+
+    The path to the procfs root is configurable, so this source can also read recorded procfs fixtures (a folder with the ``stat``,
+    ``meminfo``, ``diskstats`` and ``net/dev`` files).
+    """
+
+    def __init__(self):
+        super().__init__()
+        self._pretty_name = "Linux PROCFS"
+        self._procfs_path = "/proc"
+
+    @primitives.string_property(is_folder=True)
+    def procfs_path(self) -> str:
+        """Path to the procfs root folder [GET/SET].
+
+        The default ``/proc`` is the correct path in any Linux system, so this should only be changed for testing with recorded
+        procfs files. Changing this while this source is in use won't change the loaded sensors. Re-select the source to reload them.
+        """
+        return self._procfs_path
+
+    @procfs_path.setter
+    def procfs_path(self, value: str):
+        self._procfs_path = value
+
+    def check_availability(self):
+        if not hasattr(os, "pread"):
+            return False, "PROCFS is only available on Linux"
+        if not self._procfs_path or not os.path.isfile(os.path.join(self._procfs_path, "stat")):
+            return False, f"PROCFS folder '{self._procfs_path}' not found"
+        return True, "PROCFS folder found"
+
+    def initialize(self):
+        for hw_class in PROC_HARDWARE_CLASSES:
+            path = os.path.join(self._procfs_path, hw_class.FILENAME)
+            try:
+                hw = hw_class.from_file(path)
+            except OSError as e:
+                click.secho(f"[ProcSensors] Couldn't open '{path}': {e}", fg="yellow")
+                continue
+            except (ValueError, IndexError) as e:
+                click.secho(f"[ProcSensors] Couldn't parse '{path}': {e}", fg="yellow")
+                continue
+            if len(hw.isensors) > 0:
+                self._hardwares.append(hw)
+            else:
+                hw.close()
+
+    def shutdown(self):
+        for hw in self._hardwares:
+            hw.close()
+        super().shutdown()
+
+
+def counters_pattern(label: bytes, fields: Sequence[int]) -> re.Pattern:
+    """Compiles a regex matching the lines of a procfs file that start with a label followed by space-separated counters.
+
+    Args:
+        label (bytes): regex of the start of the line (after any leading spaces). It should have a single group, capturing
+            the line's label, and also match the separator between the label and the first counter.
+        fields (Sequence[int]): positions (starting at 1, in increasing order) of the counters after the label to capture.
+
+    Returns:
+        re.Pattern: the compiled regex. Its first group is the label, followed by one group per captured counter.
+    """
+    parts = [rb"^ *", label]
+    for position in range(1, fields[-1] + 1):
+        if position > 1:
+            parts.append(rb" +")
+        parts.append(rb"(\d+)" if position in fields else rb"\d+")
+    return re.compile(b"".join(parts), re.MULTILINE)
+
+
+class ProcHardware(Hardware):
+    """Base class for hardware that read their sensors from a single procfs file.
+
+    The lines of the file we read are matched by our ``PATTERN``, which captures each line's label (such as a CPU or disk name)
+    and the counters we use, so parsing doesn't need to split the whole file. Counters of each label are stored contiguously
+    in our ``_counters`` array (see ``_labels``).
+
+    Hardware are created from the contents of their file, so they can also be created from recorded data. Use ``from_file()``
+    to create one that keeps its file open, re-reading it on each poll.
+
+    Subclasses should implement ``_add_label_sensors()`` to create the sensors of each label found in the file, and
+    ``_compute_values()`` to fill the ``_values`` array (read by our sensors) from the counters. They may override
+    ``_accepts_label()`` to ignore some labels, ``_build_layout()`` to set the labels themselves, or ``_read_line()``
+    to store something other than the captured counters.
+    """
+
+    FILENAME: str = None
+    """Path of the procfs file read by this hardware, relative to the procfs root."""
+    PATTERN: re.Pattern = None
+    """Regex matching the lines of our file we read (see ``counters_pattern()``)."""
+    COUNTERS_PER_LINE: int = None
+    """Number of counters stored from each line (see ``_read_line()``). Defaults to the number of counters captured by ``PATTERN``."""
+
+    def __init__(self, data: bytes, hw_id: str, name: str, hw_type: HardwareType, file: ProcFile = None):
+        super().__init__(None, [], [])
+        self._id = hw_id
+        self._name = name
+        self._type = hw_type
+        self._file = file
+        self._timestamp: float = None
+        self._previous_timestamp: float = None
+        self._width = self.COUNTERS_PER_LINE or self.PATTERN.groups - 1
+        """Number of counters stored from each line."""
+        self._labels: list[bytes] = []
+        """Labels of the lines we read. The counters of each label start at its index times ``_width``."""
+        self._build_layout(data)
+        self._offsets = [0] * len(self._labels)
+        """Byte offset of the line of each label, in the last read contents. Lines only move when a number before them changes
+        its amount of digits, so each line is first matched at its previous offset."""
+        num_counters = self._width * len(self._labels)
+        self._counters = array("d", bytes(8 * num_counters))
+        """Counters read in the last poll."""
+        self._previous = array("d", self._counters)
+        """Counters read in the previous poll."""
+        self._values = array("d", [math.nan] * len(self._isensors))
+        """Current values of our sensors, by their ``slot``. NaN if a sensor has no value."""
+
+    @classmethod
+    def from_file(cls, path: str):
+        """Creates this hardware from the procfs file at the given path, keeping the file open for our polls.
+        The file is closed if we can't be created (such as if its contents can't be parsed)."""
+        file = ProcFile(path)
+        try:
+            return cls(file.read(), file)
+        except Exception:
+            file.close()
+            raise
+
+    @property
+    def id(self):
+        return self._id
+
+    @property
+    def name(self):
+        return self._name
+
+    @property
+    def type(self):
+        return self._type
+
+    def _add_sensor(self, stype: SensorType, name: str, id_suffix: str):
+        """Creates a new ProcSensor of this hardware, whose value is at the next slot of our ``_values`` array."""
+        self._isensors.append(ProcSensor(self, len(self._isensors), stype, name, SensorID(f"{self._id}/{id_suffix}")))
+
+    def parse(self, data: bytes, timestamp: float):
+        """Parses the given contents of our file, read at TIMESTAMP, updating our sensor values."""
+        self._counters, self._previous = self._previous, self._counters
+        self._previous_timestamp, self._timestamp = self._timestamp, timestamp
+        self._read_counters(data)
+        self._compute_values()
+
+    def poll(self):
+        if self._file is not None:
+            self.parse(self._file.read(), time.perf_counter())
+        return super().poll()
+
+    def close(self):
+        """Closes our procfs file, if we have one."""
+        if self._file is not None:
+            self._file.close()
+
+    def _build_layout(self, data: bytes):
+        """Finds the labels in the given contents of our file, adding them to our ``_labels`` and creating their sensors."""
+        for match in self.PATTERN.finditer(data):
+            label = match.group(1)
+            if label not in self._labels and self._accepts_label(label):
+                self._labels.append(label)
+                self._add_label_sensors(label.decode())
+
+    def _accepts_label(self, label: bytes) -> bool:
+        """Checks if we should read the line with the given label. By default, all lines matching our pattern are read."""
+        return True
+
+    def _add_label_sensors(self, label: str):
+        """Creates the sensors of the given label, found when building our layout."""
+        raise NotImplementedError()
+
+    def _read_counters(self, data: bytes):
+        """Reads our counters from the given contents of our file into our ``_counters`` array.
+        Counters of labels missing from DATA are NaN."""
+        counters, offsets, width = self._counters, self._offsets, self._width
+        match_line, read_line = self.PATTERN.match, self._read_line
+        for slot, label in enumerate(self._labels):
+            match = match_line(data, offsets[slot])
+            if match is None or match.group(1) != label:
+                match = self._find_line(data, slot)
+            if match is None:
+                for index in range(slot * width, (slot + 1) * width):
+                    counters[index] = math.nan
+            else:
+                read_line(match.groups()[1:], counters, slot * width)
+
+    def _read_line(self, fields: tuple[bytes, ...], counters: array, index: int):
+        """Stores the counters captured from a line (FIELDS) in the given COUNTERS array, starting at INDEX.
+        By default, each captured counter is stored as is."""
+        for field in fields:
+            counters[index] = int(field)
+            index += 1
+
+    def _find_line(self, data: bytes, slot: int) -> re.Match | None:
+        """Finds the line of the label at the given slot in DATA, updating the offsets of all our labels.
+        Returns the match of the line, or None if the label wasn't found."""
+        slots = {label: index for index, label in enumerate(self._labels)}
+        found = None
+        for match in self.PATTERN.finditer(data):
+            index = slots.get(match.group(1))
+            if index is not None:
+                self._offsets[index] = match.start()
+                if index == slot:
+                    found = match
+        return found
+
+    def _compute_values(self):
+        """Computes the values of our sensors into our ``_values`` array, from our current and previous counters."""
+        raise NotImplementedError()
+
+    @property
+    def delta_time(self):
+        """Time between our last two polls, in seconds. None if we haven't polled twice."""
+        if self._previous_timestamp is None:
+            return None
+        return self._timestamp - self._previous_timestamp
+
+
+class ProcCpuHardware(ProcHardware):
+    """CPU load from the ``cpu`` lines of ``/proc/stat``.
+
+    Each line has the times spent by the CPU (or core) in each state since boot: ``user nice system idle iowait irq softirq steal``
+    (followed by guest times, which are already included in user/nice). Load is the non-idle percentage of the time delta.
+    """
+
+    FILENAME = "stat"
+    NUM_STATES = 8
+    """Number of CPU state counters read from each cpu line."""
+    PATTERN = counters_pattern(rb"(cpu\d*) +", range(1, NUM_STATES + 1))
+    COUNTERS_PER_LINE = 2
+
+    def __init__(self, data: bytes, file: ProcFile = None):
+        super().__init__(data, "/proc/cpu", "CPU", HardwareType.CPU, file)
+
+    def _add_label_sensors(self, label):
+        if label == "cpu":
+            self._add_sensor(SensorType.Load, "CPU Total", "load/0")
+        else:
+            core = int(label[3:])
+            self._add_sensor(SensorType.Load, f"CPU Core #{core + 1}", f"load/{core + 1}")
+
+    def _read_line(self, fields, counters, index):
+        # Two counters per line: total time and idle time (idle + iowait).
+        states = [int(field) for field in fields]
+        counters[index] = sum(states)
+        counters[index + 1] = states[3] + states[4]
+
+    def _compute_values(self):
+        if self.delta_time is None:
+            return
+        counters, previous, values = self._counters, self._previous, self._values
+        for index in range(len(values)):
+            delta_total = counters[2 * index] - previous[2 * index]
+            delta_idle = counters[2 * index + 1] - previous[2 * index + 1]
+            if delta_total > 0:
+                values[index] = 100.0 * (1.0 - delta_idle / delta_total)
+            elif math.isnan(delta_total):
+                values[index] = math.nan
+
+
+class ProcMemoryHardware(ProcHardware):
+    """Physical and virtual (swap) memory usage from ``/proc/meminfo``. These aren't counters, so no deltas are needed."""
+
+    FILENAME = "meminfo"
+    KEYS = (b"MemTotal", b"MemAvailable", b"SwapTotal", b"SwapFree")
+    """Keys of the meminfo lines we read (in kB), in the order of our counters."""
+    PATTERN = counters_pattern(rb"(" + b"|".join(KEYS) + rb"): +", (1,))
+
+    def __init__(self, data: bytes, file: ProcFile = None):
+        super().__init__(data, "/proc/ram", "Memory", HardwareType.Memory, file)
+
+    def _build_layout(self, data):
+        # Our sensors use all keys, so their slots are fixed, even if some key is missing from this file.
+        self._labels = list(self.KEYS)
+        self._add_sensor(SensorType.Load, "Memory", "load/0")
+        self._add_sensor(SensorType.Data, "Memory Used", "data/0")
+        self._add_sensor(SensorType.Data, "Memory Available", "data/1")
+        self._add_sensor(SensorType.Load, "Virtual Memory", "load/1")
+        self._add_sensor(SensorType.Data, "Virtual Memory Used", "data/2")
+        self._add_sensor(SensorType.Data, "Virtual Memory Available", "data/3")
+
+    def _compute_values(self):
+        mem_total, mem_available, swap_total, swap_free = self._counters
+        self._compute_usage(mem_total, mem_available, 0)
+        self._compute_usage(swap_total, swap_free, 3)
+
+    def _compute_usage(self, total: float, available: float, slot: int):
+        """Computes the Load/Used/Available values starting at SLOT, from the given total/available memory in kB."""
+        values = self._values
+        used = total - available
+        values[slot] = 100.0 * used / total if total > 0 else math.nan
+        values[slot + 1] = used * KB_TO_GB
+        values[slot + 2] = available * KB_TO_GB
+
+
+class ProcDisksHardware(ProcHardware):
+    """Disk read/write throughput and activity from ``/proc/diskstats``. Virtual devices and partitions are ignored.
+
+    Each line is ``major minor name`` followed by the I/O counters of the device since boot. We use: sectors read (3rd),
+    sectors written (7th) and time spent doing I/O in milliseconds (10th).
+    """
+
+    FILENAME = "diskstats"
+    FIELDS = (3, 7, 10)
+    """Positions (after the device name) of the counters we read from each line."""
+    PATTERN = counters_pattern(rb"\d+ +\d+ (\S+) +", FIELDS)
+
+    def __init__(self, data: bytes, file: ProcFile = None):
+        super().__init__(data, "/proc/storage", "Storage", HardwareType.Storage, file)
+
+    def _accepts_label(self, label):
+        return not IGNORED_DISKS_PATTERN.match(label.decode())
+
+    def _add_label_sensors(self, disk):
+        self._add_sensor(SensorType.Throughput, f"{disk} Read Rate", f"{disk}/throughput/0")
+        self._add_sensor(SensorType.Throughput, f"{disk} Write Rate", f"{disk}/throughput/1")
+        self._add_sensor(SensorType.Load, f"{disk} Total Activity", f"{disk}/load/0")
+
+    def _compute_values(self):
+        delta_time = self.delta_time
+        if not delta_time:
+            return
+        counters, previous, values = self._counters, self._previous, self._values
+        for index in range(0, len(values), 3):
+            values[index] = (counters[index] - previous[index]) * SECTOR_SIZE / delta_time
+            values[index + 1] = (counters[index + 1] - previous[index + 1]) * SECTOR_SIZE / delta_time
+            values[index + 2] = min(100.0, (counters[index + 2] - previous[index + 2]) / (10.0 * delta_time))
+
+
+class ProcNetworkHardware(ProcHardware):
+    """Network interfaces download/upload throughput from ``/proc/net/dev``.
+
+    After two header lines, each line is ``interface: <8 receive counters> <8 transmit counters>``. We read the first receive
+    and transmit counters, which are the total bytes received/transmitted.
+    """
+
+    FILENAME = os.path.join("net", "dev")
+    FIELDS = (1, 9)
+    """Positions (after the interface name) of the counters we read from each line."""
+    # The colon after the interface name may be glued to the first counter. Header lines have no colon, so they never match.
+    PATTERN = counters_pattern(rb"([^\s:]+): *", FIELDS)
+
+    def __init__(self, data: bytes, file: ProcFile = None):
+        super().__init__(data, "/proc/network", "Network", HardwareType.Network, file)
+
+    def _accepts_label(self, label):
+        return label not in IGNORED_NICS
+
+    def _add_label_sensors(self, nic):
+        self._add_sensor(SensorType.Throughput, f"{nic} Download Speed", f"{nic}/throughput/0")
+        self._add_sensor(SensorType.Throughput, f"{nic} Upload Speed", f"{nic}/throughput/1")
+
+    def _compute_values(self):
+        delta_time = self.delta_time
+        if not delta_time:
+            return
+        counters, previous, values = self._counters, self._previous, self._values
+        for index in range(len(values)):
+            values[index] = (counters[index] - previous[index]) / delta_time
+
+
+PROC_HARDWARE_CLASSES: tuple[type[ProcHardware], ...] = (ProcCpuHardware, ProcMemoryHardware, ProcDisksHardware, ProcNetworkHardware)
+"""Hardware classes provided by the ProcSensors source, one per procfs file."""
+
+
+class ProcSensor(InternalSensor):
+    """A single sensor from a ProcHardware. Its value is computed by the hardware when it's polled."""
+
+    def __init__(self, parent_hw: ProcHardware, slot: int, stype: SensorType, name: str, sensor_id: SensorID):
+        super().__init__(parent_hw)
+        self.slot = slot
+        """Index of this sensor's value in the ``_values`` array of our parent hardware."""
+        self._type = stype
+        self._name = name
+        self._id = sensor_id
+        self._value: float = None
+        self._min = math.inf
+        self._max = -math.inf
+
+    @property
+    def id(self):
+        return self._id
+
+    @property
+    def name(self):
+        return self._name
+
+    @property
+    def type(self):
+        return self._type
+
+    @property
+    def limits(self):
+        return None
+
+    @property
+    def value(self):
+        return self._value
+
+    @property
+    def value_range(self):
+        return Vector2(self._min, self._max)
+
+    def update(self):
+        value = self.parent._values[self.slot]
+        if math.isnan(value):
+            self._value = None
+            return
+        self._value = value
+        if value < self._min:
+            self._min = value
+        if value > self._max:
+            self._max = value
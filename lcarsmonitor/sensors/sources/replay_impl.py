@@ -0,0 +1,153 @@
+##################################
+# Sensor API implementation for REPLAYING SENSOR RECORDINGS!
+###
+# Plays back a sensor recording made by the ComputerSystem (see `lcarsmonitor.sensors.recording`),
+# exposing the recorded hardware/sensors as if they were real. Useful for reproducing issues and
+# deterministic benchmarks without the real hardware (or admin rights).
+##################################
+import os
+import time
+import libasvat.imgui.editors.primitives as primitives
+from lcarsmonitor.sensors.sensors_api import SensorSource
+from lcarsmonitor.sensors.catalog import CatalogHardware, CatalogSensor
+from lcarsmonitor.sensors.recording import RecordingFormat, RecordingReader
+
+
+class ReplaySensors(SensorSource):
+    """LCARSMonitor Sensor Source implementation that replays a sensor recording.
+
+    Recordings are made by the ComputerSystem (see the Recording section of its settings), storing the values of all sensors
+    on every poll. This source recreates the recorded hardware and sensors, and polling them reads the values of the recording's
+    frame at the current playback time.
+
+    Playback starts when the source is initialized, at the configured speed: 1x being real-time, or any faster/slower multiplier.
+    A speed of 0 plays back as fast as possible: each poll of a hardware reads the next frame.
+
+    The recording is memory-mapped, so even multi-hour recordings open instantly.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self._pretty_name = "Recording Replay"
+        self._recording_path: str = ""
+        self._playback_speed = 1.0
+        self._loop = True
+        self._reader: RecordingReader = None
+        self._start_time = 0.0
+        self._last_check: tuple[tuple, bool, str] = (None, False, "")
+
+    @primitives.string_property()
+    def recording_path(self) -> str:
+        """Path to the sensor recording file to replay [GET/SET].
+
+        Changing this while this source is in use won't change the loaded recording. Re-select the source to reload it.
+        """
+        return self._recording_path
+
+    @recording_path.setter
+    def recording_path(self, value: str):
+        self._recording_path = value
+
+    @primitives.float_property(min=0.0, max=100.0, format="%.1fx")
+    def playback_speed(self) -> float:
+        """Playback speed multiplier [GET/SET].
+
+        1 plays the recording in real-time, 2 at twice the speed, and so on. 0 plays as fast as possible: each poll of a hardware
+        reads its next frame, regardless of time.
+        """
+        return self._playback_speed
+
+    @playback_speed.setter
+    def playback_speed(self, value: float):
+        if self._reader is not None and value != self._playback_speed:
+            # Keep the current playback position when changing speeds.
+            position = self.playback_time
+            self._start_time = time.perf_counter() - (position / value if value > 0 else 0.0)
+        self._playback_speed = value
+
+    @primitives.bool_property()
+    def loop(self) -> bool:
+        """If the recording restarts after reaching its end. Otherwise the last frame is kept [GET/SET]."""
+        return self._loop
+
+    @loop.setter
+    def loop(self, value: bool):
+        self._loop = value
+
+    @property
+    def playback_time(self) -> float:
+        """Current playback time (in seconds since the start of the recording) for timed playback."""
+        if self._reader is None or self._playback_speed <= 0:
+            return 0.0
+        position = (time.perf_counter() - self._start_time) * self._playback_speed
+        duration = self._reader.duration
+        if self._loop and duration > 0:
+            return position % duration
+        return min(position, duration)
+
+    def check_availability(self):
+        path = self._recording_path
+        if not path or not os.path.isfile(path):
+            return False, "Recording file not found. Set the `recording_path` property"
+        # Only re-check the file's header if it changed.
+        stat = os.stat(path)
+        key = (path, stat.st_mtime, stat.st_size)
+        if key != self._last_check[0]:
+            try:
+                with open(path, "rb") as file:
+                    catalog, sensor_count, frames_offset = RecordingFormat.read_header(file)
+            except Exception as e:
+                self._last_check = (key, False, f"Invalid recording: {e}")
+            else:
+                frame_count = (stat.st_size - frames_offset) // RecordingFormat.frame_size(sensor_count)
+                message = f"Recording of '{catalog['source']}' with {sensor_count} sensors and {frame_count} frames"
+                self._last_check = (key, frame_count > 0, message)
+        return self._last_check[1], self._last_check[2]
+
+    def initialize(self):
+        self._reader = RecordingReader(self._recording_path)
+        roots, _ = ReplayHardware.build_tree(self._reader.catalog, self)
+        self._hardwares.extend(roots)
+        self._start_time = time.perf_counter()
+
+    def shutdown(self):
+        super().shutdown()
+        if self._reader is not None:
+            self._reader.close()
+            self._reader = None
+
+    def get_frame(self, hw: 'ReplayHardware') -> int:
+        """Gets the index of the recording frame the given hardware should read in this poll."""
+        frame_count = self._reader.frame_count
+        if self._playback_speed > 0:
+            return self._reader.find_frame(self.playback_time)
+        frame = hw.frame + 1
+        if frame >= frame_count:
+            frame = 0 if self._loop else frame_count - 1
+        return frame
+
+
+class ReplaySensor(CatalogSensor):
+    """A sensor from a recording. Its value is set by its parent hardware from the current frame."""
+
+
+class ReplayHardware(CatalogHardware):
+    """A hardware from a recording. Polling reads the values of our sensors from the current frame."""
+
+    SENSOR_CLASS = ReplaySensor
+
+    def __init__(self, source: ReplaySensors, index: int, record: dict, parent: 'ReplayHardware' = None):
+        super().__init__(index, record, parent)
+        self._source = source
+        self.frame = -1
+        """Index of the frame read in our last poll."""
+
+    def poll(self):
+        self.frame = self._source.get_frame(self)
+        count = len(self._isensors)
+        if count <= 0:
+            return
+        with self._source._reader.get_values(self.frame, self.start, count) as values:
+            for isensor, value in zip(self._isensors, values):
+                isensor.set_value(value)
+        return super().poll()
@@ -0,0 +1,194 @@
+##################################
+# Synthetic Sensor API implementation
+###
+# This SensorSource creates a configurable (and possibly large) amount of synthetic hardware and sensors,
+# with generated values. Used to exercise and benchmark the sensor pipeline at realistic scales, without
+# needing real hardware.
+##################################
+import math
+import time
+import random
+import libasvat.imgui.editors.primitives as primitives
+from libasvat.imgui.math import Vector2
+from lcarsmonitor.sensors.sensors_api import SensorSource, SensorID, HardwareType, SensorType, Hardware, InternalSensor
+
+SYNTHETIC_SENSOR_TYPES = (SensorType.Load, SensorType.Temperature, SensorType.Clock, SensorType.Power, SensorType.Fan,
+                          SensorType.Voltage, SensorType.Throughput)
+"""Types of the synthetic sensors. Each hardware cycles through these types for its sensors."""
+SYNTHETIC_GENERATORS = ["sine", "ramp", "random", "random_walk", "constant"]
+"""Names of the available value generators of synthetic sensors."""
+
+
+class SyntheticSensors(SensorSource):
+    """Synthetic SensorSource. Provides a configurable amount of synthetic hardware/sensors with generated values.
+
+    Creates ``hardware_count`` root hardware, each with ``sensors_per_hardware`` sensors and a tree of ``sub_hardware_count``
+    sub-hardware per level, up to ``sub_hardware_depth`` levels (with the same amount of sensors each). Sensor values are
+    generated on each poll, by the selected ``generator``, within the default limits of each sensor's unit.
+
+    This is meant for testing and benchmarking the sensor pipeline (polling, snapshots, histories, Sensor nodes and UI) at
+    scale, such as with thousands of sensors.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self._pretty_name = "Synthetic Sensors"
+        self._hardware_count = 4
+        self._sensors_per_hardware = 10
+        self._sub_hardware_count = 1
+        self._sub_hardware_depth = 1
+        self._generator = "sine"
+
+    @primitives.int_property(min=1, max=10000)
+    def hardware_count(self) -> int:
+        """Number of root hardware to create [GET/SET]."""
+        return self._hardware_count
+
+    @hardware_count.setter
+    def hardware_count(self, value: int):
+        self._hardware_count = value
+
+    @primitives.int_property(min=0, max=1000)
+    def sensors_per_hardware(self) -> int:
+        """Number of sensors of each hardware (including sub-hardware) [GET/SET]."""
+        return self._sensors_per_hardware
+
+    @sensors_per_hardware.setter
+    def sensors_per_hardware(self, value: int):
+        self._sensors_per_hardware = value
+
+    @primitives.int_property(min=0, max=10)
+    def sub_hardware_count(self) -> int:
+        """Number of sub-hardware of each hardware, for each level of sub-hardware [GET/SET]."""
+        return self._sub_hardware_count
+
+    @sub_hardware_count.setter
+    def sub_hardware_count(self, value: int):
+        self._sub_hardware_count = value
+
+    @primitives.int_property(min=0, max=5)
+    def sub_hardware_depth(self) -> int:
+        """Number of levels of sub-hardware below each root hardware [GET/SET]."""
+        return self._sub_hardware_depth
+
+    @sub_hardware_depth.setter
+    def sub_hardware_depth(self, value: int):
+        self._sub_hardware_depth = value
+
+    @primitives.string_property(options=SYNTHETIC_GENERATORS)
+    def generator(self) -> str:
+        """Generator of the sensor values [GET/SET].
+
+        * sine: sine wave, with a different period and phase for each sensor.
+        * ramp: increases linearly until the max limit, then restarts from the min limit.
+        * random: uniformly random values.
+        * random_walk: each value is a small random step from the previous value.
+        * constant: always the same value (the middle of the limits).
+        """
+        return self._generator
+
+    @generator.setter
+    def generator(self, value: str):
+        self._generator = value
+
+    @property
+    def total_sensors(self):
+        """Total number of sensors created with the current settings."""
+        hardware_per_root = sum(self._sub_hardware_count ** level for level in range(self._sub_hardware_depth + 1))
+        return self._hardware_count * hardware_per_root * self._sensors_per_hardware
+
+    def check_availability(self):
+        return True, f"Always Available ({self.total_sensors} sensors with current settings)"
+
+    def initialize(self):
+        for index in range(self._hardware_count):
+            self._hardwares.append(SyntheticHardware(self, None, f"/synthetic/{index}", f"Synthetic #{index}", self._sub_hardware_depth))
+
+
+class SyntheticHardware(Hardware):
+
+    def __init__(self, source: SyntheticSensors, parent: 'SyntheticHardware', hw_id: str, name: str, depth: int):
+        super().__init__(parent, [], [])
+        self._id = hw_id
+        self._name = name
+        for index in range(source.sensors_per_hardware):
+            stype = SYNTHETIC_SENSOR_TYPES[index % len(SYNTHETIC_SENSOR_TYPES)]
+            self._isensors.append(SyntheticSensor(self, f"{hw_id}/{stype.value.lower()}/{index}", f"{stype} #{index}", stype, source.generator))
+        if depth > 0:
+            for index in range(source.sub_hardware_count):
+                self._children.append(SyntheticHardware(source, self, f"{hw_id}/{index}", f"Sub #{index}", depth - 1))
+
+    @property
+    def id(self):
+        return self._id
+
+    @property
+    def name(self):
+        return self._name
+
+    @property
+    def type(self):
+        return HardwareType.CPU if self.parent is None else HardwareType.Unknown
+
+
+class SyntheticSensor(InternalSensor):
+
+    def __init__(self, parent_hw: SyntheticHardware, sensor_id: str, name: str, stype: SensorType, generator: str):
+        super().__init__(parent_hw)
+        self._id = SensorID(sensor_id)
+        self._name = name
+        self._type = stype
+        self._generator = generator
+        limits = self.unit.limits
+        self._low = limits.x if math.isfinite(limits.x) else 0.0
+        self._high = limits.y if math.isfinite(limits.y) and limits.y > self._low else self._low + 100.0
+        self._period = random.uniform(5.0, 60.0)
+        self._phase = random.uniform(0.0, 2 * math.pi)
+        self._value = (self._low + self._high) * 0.5
+        self._min = math.inf
+        self._max = -math.inf
+
+    @property
+    def id(self):
+        return self._id
+
+    @property
+    def name(self):
+        return self._name
+
+    @property
+    def type(self):
+        return self._type
+
+    @property
+    def limits(self):
+        return Vector2(self._low, self._high)
+
+    @property
+    def value(self):
+        return self._value
+
+    @property
+    def value_range(self):
+        return Vector2(self._min, self._max)
+
+    def update(self):
+        low, high = self._low, self._high
+        generator = self._generator
+        if generator == "sine":
+            factor = 0.5 + 0.5 * math.sin(self._phase + 2 * math.pi * time.perf_counter() / self._period)
+            value = low + (high - low) * factor
+        elif generator == "ramp":
+            factor = ((time.perf_counter() + self._phase) % self._period) / self._period
+            value = low + (high - low) * factor
+        elif generator == "random":
+            value = random.uniform(low, high)
+        elif generator == "random_walk":
+            value = min(high, max(low, self._value + (high - low) * random.uniform(-0.02, 0.02)))
+        else:
+            value = (low + high) * 0.5
+        self._value = value
+        if value < self._min:
+            self._min = value
+        if value > self._max:
+            self._max = value
@@ -0,0 +1,246 @@
+##################################
+# Virtual Sensor API implementation
+###
+# This SensorSource provides user-defined virtual sensors, whose values are computed by expressions over the values
+# of other sensors (such as ``sensor("/gpu/power") + sensor("/cpu/package-power")``).
+#
+# Like the DummySensors, the main ComputerSystem class uses this SensorSource directly, alongside the selected source.
+# Virtual sensors are evaluated by the ComputerSystem update thread, right after the other sensors are polled, directly
+# over the values of the new SensorSnapshot before it's published.
+##################################
+import re
+import math
+import click
+import numpy as np
+from fnmatch import fnmatchcase
+from libasvat.imgui.math import Vector2
+from libasvat.imgui.general import not_user_creatable
+from lcarsmonitor.sensors.sensors_api import (SensorSource, SensorID, HardwareType, SensorType, Hardware, InternalSensor,
+                                              SensorSubscriber)
+from lcarsmonitor.sensors.snapshot import SensorSnapshot
+from lcarsmonitor.sensors.expressions import CompiledExpression, ExpressionError, compile_expression
+
+
+@not_user_creatable
+class VirtualSensors(SensorSource):
+    """Virtual SensorSource. Provides user-defined virtual sensors, computed from expressions over other sensors.
+
+    Virtual sensors are defined by ``definitions``: dicts with the ``name``, ``expression`` and ``type`` of each sensor.
+    Expressions are compiled when the ComputerSystem is opened (see ``compile()``), and then evaluated on every poll of
+    the sensors they use (see ``evaluate()``). See ``lcarsmonitor.sensors.expressions.compile_expression()`` for the
+    expression syntax.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.definitions: list[dict] = []
+        """Definitions of our virtual sensors: dicts with their ``name``, ``expression`` and ``type`` (a SensorType value)."""
+
+    @property
+    def isensors(self) -> list['VirtualSensor']:
+        """Our virtual sensors, in definition order."""
+        return [isensor for hw in self._hardwares for isensor in hw.isensors]
+
+    def initialize(self):
+        if len(self.definitions) > 0:
+            self._hardwares.append(VirtualHardware(self.definitions))
+
+    def compile(self, all_isensors: dict[str, InternalSensor]):
+        """Compiles the expressions of our virtual sensors, resolving the sensors they use.
+
+        This should be called after the index of all sensors is set, since compiled expressions use sensor indexes.
+
+        Args:
+            all_isensors (dict[str, InternalSensor]): all sensors of the ComputerSystem (including ours), by ID.
+        """
+        isensors = list(all_isensors.values())
+        for vsensor in self.isensors:
+            vsensor.compile(all_isensors, isensors)
+
+    def evaluate(self, snapshot: SensorSnapshot):
+        """Evaluates our virtual sensors with the values of the given (not yet published) snapshot, writing their results in it.
+
+        Sensors are evaluated in definition order, and only if at least one of the sensors they use was polled (or if they
+        don't have a value yet). Our hardware is flagged as ``polled`` if any sensor was evaluated.
+        """
+        if len(self._hardwares) <= 0:
+            return
+        hardware = self._hardwares[0]
+        values = np.frombuffer(snapshot.values, dtype=np.float64)
+        evaluated = False
+        with np.errstate(all="ignore"):
+            for vsensor in hardware.isensors:
+                if vsensor.needs_evaluation and 0 <= vsensor.index < len(values):
+                    value = vsensor.evaluate(values)
+                    value_range = vsensor.value_range
+                    values[vsensor.index] = value
+                    snapshot.set_value_range(vsensor.index, value_range.x, value_range.y)
+                    evaluated = True
+        hardware.polled = evaluated
+
+
+class VirtualHardware(Hardware):
+    """Hardware containing all virtual sensors."""
+
+    def __init__(self, definitions: list[dict]):
+        super().__init__(None, [], [])
+        self._isensors.extend(VirtualSensor(self, definition) for definition in definitions)
+
+    @property
+    def id(self):
+        return "/virtual"
+
+    @property
+    def name(self):
+        return "Virtual"
+
+    @property
+    def type(self):
+        return HardwareType.Unknown
+
+
+class VirtualSensor(InternalSensor):
+    """A virtual sensor, whose value is computed by an expression over the values of other sensors.
+
+    While used (subscribed by Sensor nodes), a virtual sensor subscribes itself to the sensors used by its expression, so
+    their hardware are polled as well. It also acts as a subscriber, reporting the ``enabled`` flag and ``polling_rate``
+    of its own nodes to those sensors.
+    """
+
+    def __init__(self, parent_hw: VirtualHardware, definition: dict):
+        super().__init__(parent_hw)
+        self._name: str = definition["name"]
+        self.expression: str = definition["expression"]
+        """Expression that computes our value."""
+        self._type = SensorType.from_obj(definition.get("type", SensorType.Unknown.value))
+        slug = re.sub(r"[^a-z0-9]+", "-", self._name.lower()).strip("-")
+        self._id = SensorID(f"/virtual/{self._type.value.lower()}/{slug}")
+        self.error: str = None
+        """Error message of our expression, if it's invalid. Sensors with invalid expressions never have values."""
+        self._program: CompiledExpression = None
+        self._dependencies: tuple[InternalSensor] = ()
+        self._value: float = None
+        self._value_range = Vector2(math.inf, -math.inf)
+
+    @property
+    def id(self):
+        return self._id
+
+    @property
+    def name(self):
+        return self._name
+
+    @property
+    def type(self):
+        return self._type
+
+    @property
+    def limits(self):
+        return None
+
+    @property
+    def value(self):
+        return self._value
+
+    @property
+    def value_range(self):
+        return self._value_range
+
+    @property
+    def info(self):
+        lines = [super().info, f"Expression: {self.expression}"]
+        if self.error:
+            lines.append(f"ERROR: {self.error}")
+        return "\n".join(lines)
+
+    @property
+    def needs_evaluation(self):
+        """If we should be evaluated in the current poll: if we're compiled, and any of the sensors we use was polled
+        (or we don't have a value yet)."""
+        if self._program is None:
+            return False
+        return self._value is None or any(isensor.parent.polled for isensor in self._dependencies)
+
+    def compile(self, all_isensors: dict[str, InternalSensor], isensors: list[InternalSensor]):
+        """Compiles our expression, resolving its sensors from the given ones. Errors are stored in ``self.error``.
+
+        ``sensor(key)`` resolves by sensor ID, or by full name (case-insensitive). ``sensors(pattern)`` resolves all
+        sensors whose ID or full name match the glob pattern (case-insensitive). Our own sensor is never resolved.
+        """
+        def resolve_sensor(key: str):
+            isensor = all_isensors.get(key)
+            if isensor is None:
+                key = key.lower()
+                isensor = next((isensor for isensor in isensors if isensor.full_name.lower() == key), None)
+            return None if isensor is None or isensor is self else isensor.index
+
+        def resolve_sensors(pattern: str):
+            pattern = pattern.lower()
+            return [isensor.index for isensor in isensors if isensor is not self and
+                    (fnmatchcase(str(isensor.id).lower(), pattern) or fnmatchcase(isensor.full_name.lower(), pattern))]
+
+        self._set_dependencies([])
+        self._program = None
+        self.error = None
+        try:
+            self._program = compile_expression(self.expression, resolve_sensor, resolve_sensors)
+        except ExpressionError as e:
+            self.error = str(e)
+            click.secho(f"VirtualSensor '{self.name}': invalid expression '{self.expression}': {e}", fg="red")
+            return
+        self._set_dependencies([isensors[index] for index in self._program.dependencies])
+
+    def evaluate(self, values: np.ndarray) -> float:
+        """Evaluates our expression with the given sensor values, updating our value and min/max values.
+
+        Returns:
+            float: our new value (NaN for no value).
+        """
+        value = self._program.evaluate(values)
+        if math.isnan(value):
+            self._value = None
+            return value
+        self._value = value
+        value_range = self._value_range
+        if value < value_range.x or value > value_range.y:
+            self._value_range = Vector2(min(value, value_range.x), max(value, value_range.y))
+        return value
+
+    def _set_dependencies(self, isensors: list[InternalSensor]):
+        """Sets the sensors used by our expression, moving our subscription to them if we're subscribed."""
+        if self.subscribers > 0:
+            for isensor in self._dependencies:
+                isensor._remove(self)
+            for isensor in isensors:
+                isensor._add(self)
+        self._dependencies = tuple(isensors)
+
+    def _add(self, sensor: SensorSubscriber):
+        subscribed = self.subscribers > 0
+        super()._add(sensor)
+        if not subscribed and self.subscribers > 0:
+            for isensor in self._dependencies:
+                isensor._add(self)
+
+    def _remove(self, sensor: SensorSubscriber):
+        subscribed = self.subscribers > 0
+        super()._remove(sensor)
+        if subscribed and self.subscribers <= 0:
+            for isensor in self._dependencies:
+                isensor._remove(self)
+
+    # SensorSubscriber interface, for the sensors used by our expression.
+    @property
+    def enabled(self):
+        """If any of our Sensor nodes is enabled."""
+        return any(sensor.enabled for sensor in self.sensors)
+
+    @property
+    def polling_rate(self):
+        """Highest polling rate requested by our enabled Sensor nodes."""
+        return max((sensor.polling_rate for sensor in self.sensors if sensor.enabled), default=0.0)
+
+    # (``update()`` from InternalSensor already does nothing, so we're never notified.)
+    def detect_change(self, value: float, generation: int) -> bool:
+        """We're evaluated in the same poll as the sensors we use, so we don't need to be notified of their changes."""
+        return False
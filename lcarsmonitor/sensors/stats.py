@@ -0,0 +1,211 @@
+import math
+
+DEFAULT_AVERAGE_WINDOW = 60.0
+"""Default time window (in seconds) of the moving average of SensorStats."""
+DEFAULT_PERCENTILE = 0.95
+"""Default quantile estimated by SensorStats."""
+DEFAULT_PERCENTILE_WINDOW = 300.0
+"""Default time window (in seconds) of the quantile estimated by SensorStats."""
+
+
+class RunningStats:
+    """Running mean and variance of a stream of values, using Welford's algorithm.
+
+    This is numerically stable and O(1) per sample, without storing the samples.
+    """
+
+    __slots__ = ("count", "mean", "_m2")
+
+    def __init__(self):
+        self.count = 0
+        """Number of samples added."""
+        self.mean = math.nan
+        """Mean of all samples. NaN if there are no samples."""
+        self._m2 = 0.0
+
+    def add(self, value: float):
+        """Adds a sample."""
+        self.count += 1
+        if self.count == 1:
+            self.mean = value
+            return
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self._m2 += delta * (value - self.mean)
+
+    @property
+    def variance(self):
+        """Sample variance of all samples. 0 if there are less than 2 samples."""
+        if self.count < 2:
+            return 0.0
+        return self._m2 / (self.count - 1)
+
+    @property
+    def stddev(self):
+        """Sample standard deviation of all samples. 0 if there are less than 2 samples."""
+        return math.sqrt(self.variance)
+
+
+class MovingAverage:
+    """Exponentially weighted moving average (EWMA) of a stream of values, over a time window.
+
+    Each sample is weighted according to the time since the previous sample, so the average decays with time regardless of
+    the sampling rate: samples older than the window have about 37% of the total weight (the same as the Unix load averages).
+    """
+
+    __slots__ = ("window", "value", "_last_time")
+
+    def __init__(self, window: float):
+        self.window = window
+        """Time constant (in seconds) of the average."""
+        self.value = math.nan
+        """Current average. NaN if there are no samples."""
+        self._last_time: float = None
+
+    def add(self, timestamp: float, value: float):
+        """Adds a sample, taken at the given time (in seconds)."""
+        if self._last_time is None:
+            self.value = value
+        else:
+            alpha = 1.0 - math.exp(-max(0.0, timestamp - self._last_time) / self.window)
+            self.value += alpha * (value - self.value)
+        self._last_time = timestamp
+
+
+class P2Quantile:
+    """Estimates a quantile of a stream of values, using the P² algorithm (Jain & Chlamtac, 1985).
+
+    The P² algorithm keeps only 5 markers, whose heights are adjusted with piecewise-parabolic interpolation as samples are
+    added. So it's O(1) in memory and time per sample, without storing the samples.
+    """
+
+    __slots__ = ("quantile", "count", "_heights", "_positions", "_desired", "_increments")
+
+    def __init__(self, quantile: float):
+        self.quantile = quantile
+        """The quantile being estimated, in [0, 1]. For example, 0.95 for the 95th percentile."""
+        self.count = 0
+        """Number of samples added."""
+        self._heights: list[float] = []
+        self._positions = [1, 2, 3, 4, 5]
+        self._desired = [1.0, 1.0 + 2 * quantile, 1.0 + 4 * quantile, 3.0 + 2 * quantile, 5.0]
+        self._increments = (0.0, quantile / 2, quantile, (1.0 + quantile) / 2, 1.0)
+
+    def add(self, value: float):
+        """Adds a sample."""
+        self.count += 1
+        heights = self._heights
+        if self.count <= 5:
+            heights.append(value)
+            if self.count == 5:
+                heights.sort()
+            return
+        # Find the cell of the new value, adjusting the extreme markers if needed.
+        if value < heights[0]:
+            heights[0] = value
+            cell = 0
+        elif value >= heights[4]:
+            heights[4] = value
+            cell = 3
+        else:
+            cell = 0
+            while value >= heights[cell + 1]:
+                cell += 1
+        positions, desired = self._positions, self._desired
+        for i in range(cell + 1, 5):
+            positions[i] += 1
+        for i in range(5):
+            desired[i] += self._increments[i]
+        # Adjust the heights of the middle markers, if they're off their desired positions.
+        for i in range(1, 4):
+            offset = desired[i] - positions[i]
+            if (offset >= 1 and positions[i + 1] - positions[i] > 1) or (offset <= -1 and positions[i - 1] - positions[i] < -1):
+                step = 1 if offset > 0 else -1
+                height = self._parabolic(i, step)
+                if not (heights[i - 1] < height < heights[i + 1]):
+                    height = heights[i] + step * (heights[i + step] - heights[i]) / (positions[i + step] - positions[i])
+                heights[i] = height
+                positions[i] += step
+
+    def _parabolic(self, i: int, step: int):
+        """Piecewise-parabolic prediction of the new height of marker I, when moved by STEP."""
+        q, n = self._heights, self._positions
+        return q[i] + step / (n[i + 1] - n[i - 1]) * (
+            (n[i] - n[i - 1] + step) * (q[i + 1] - q[i]) / (n[i + 1] - n[i]) +
+            (n[i + 1] - n[i] - step) * (q[i] - q[i - 1]) / (n[i] - n[i - 1])
+        )
+
+    @property
+    def value(self):
+        """Estimated quantile of all samples. NaN if there are no samples.
+        With less than 5 samples, this is the exact quantile (nearest rank) of the samples."""
+        if self.count >= 5:
+            return self._heights[2]
+        if self.count <= 0:
+            return math.nan
+        samples = sorted(self._heights)
+        return samples[round(self.quantile * (self.count - 1))]
+
+
+class WindowedQuantile:
+    """Estimates a quantile of a stream of values, over tumbling time windows.
+
+    A P² estimator (see ``P2Quantile``) is used for each window, and restarted when the window ends. Our value is the estimate
+    of the last complete window, or of the current window while no window was completed yet.
+    """
+
+    __slots__ = ("window", "_estimator", "_window_start", "_last_value")
+
+    def __init__(self, quantile: float, window: float):
+        self.window = window
+        """Duration (in seconds) of each window."""
+        self._estimator = P2Quantile(quantile)
+        self._window_start: float = None
+        self._last_value = math.nan
+
+    def add(self, timestamp: float, value: float):
+        """Adds a sample, taken at the given time (in seconds)."""
+        if self._window_start is None:
+            self._window_start = timestamp
+        elif timestamp >= self._window_start + self.window:
+            self._last_value = self._estimator.value
+            self._estimator = P2Quantile(self._estimator.quantile)
+            self._window_start = timestamp
+        self._estimator.add(value)
+
+    @property
+    def value(self):
+        """Estimated quantile of the last complete window (or of the current window, if none was completed). NaN if there are no samples."""
+        if self._last_value == self._last_value:  # not NaN
+            return self._last_value
+        return self._estimator.value
+
+
+class SensorStats:
+    """Streaming statistics of the values of a sensor.
+
+    Keeps, with O(1) cost per sample and without storing samples:
+    * The mean and standard deviation of all values (see ``RunningStats``).
+    * A moving average over a time window (see ``MovingAverage``). By default, over 1 minute.
+    * A quantile over a time window (see ``WindowedQuantile``). By default, the 95th percentile over 5 minutes.
+
+    These are updated once per poll by the ComputerSystem update thread, along with the sensor's history, and can be read
+    by any thread.
+    """
+
+    __slots__ = ("running", "average", "percentile")
+
+    def __init__(self, average_window: float = DEFAULT_AVERAGE_WINDOW, percentile: float = DEFAULT_PERCENTILE,
+                 percentile_window: float = DEFAULT_PERCENTILE_WINDOW):
+        self.running = RunningStats()
+        """Mean and variance of all values."""
+        self.average = MovingAverage(average_window)
+        """Moving average of the values over a time window."""
+        self.percentile = WindowedQuantile(percentile, percentile_window)
+        """Quantile of the values over a time window."""
+
+    def add(self, timestamp: float, value: float):
+        """Adds a sample, taken at the given time (in seconds)."""
+        self.running.add(value)
+        self.average.add(timestamp, value)
+        self.percentile.add(timestamp, value)
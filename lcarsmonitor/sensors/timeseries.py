@@ -0,0 +1,226 @@
+import math
+import time
+import queue
+import sqlite3
+import threading
+import click
+
+DEFAULT_STORE_TIERS = ((1.0, 24 * 3600.0), (60.0, 30 * 24 * 3600.0), (3600.0, math.inf))
+"""Default tiers of a TimeSeriesStore, as ``(bucket_duration, retention)`` pairs (in seconds): raw (1s) data for 24 hours,
+1 minute rollups for 30 days and hourly rollups forever."""
+
+
+class _Bucket:
+    """Accumulator of the samples of a sensor in a bucket of a tier."""
+
+    __slots__ = ("start", "minimum", "maximum", "total", "count")
+
+    def __init__(self, start: float):
+        self.start = start
+        self.minimum = math.inf
+        self.maximum = -math.inf
+        self.total = 0.0
+        self.count = 0
+
+    def add(self, minimum: float, maximum: float, total: float, count: int):
+        if minimum < self.minimum:
+            self.minimum = minimum
+        if maximum > self.maximum:
+            self.maximum = maximum
+        self.total += total
+        self.count += count
+
+
+class TimeSeriesStore:
+    """Persistent store of sensor values, backed by a SQLite database.
+
+    Values are stored in tiers of fixed-duration buckets (see ``DEFAULT_STORE_TIERS``), each with its own retention. Each bucket
+    keeps the minimum, maximum, average and number of the values of a sensor in that time. The first tier is the "raw" data,
+    while the others are rollups of it. Buckets older than the retention of their tier are deleted.
+
+    Values are added by the ComputerSystem update thread (see ``add()``), which only queues them. A writer thread aggregates
+    the queued values into buckets, and periodically writes all closed buckets in a single transaction. Buckets are written
+    with upserts that merge with existing data, so partial buckets (such as when the app is closed) are merged when resumed.
+
+    All timestamps in the store (and its query API) are wall-clock times, in seconds since the epoch (as ``time.time()``).
+    """
+
+    def __init__(self, path: str, tiers: tuple[tuple[float, float]] = DEFAULT_STORE_TIERS, flush_interval: float = 5.0):
+        """Opens (or creates) the store at the given PATH, and starts its writer thread.
+
+        Args:
+            path (str): path of the SQLite database file.
+            tiers (tuple[tuple[float, float]], optional): ``(bucket_duration, retention)`` of each tier, from finest to coarsest.
+                Each bucket duration should be a multiple of the previous tier's. Defaults to ``DEFAULT_STORE_TIERS``.
+            flush_interval (float, optional): time (in seconds) between writes to the database. Defaults to 5.
+        """
+        self.path = path
+        """Path of the database file."""
+        self.tiers = tuple(tiers)
+        """``(bucket_duration, retention)`` of each tier."""
+        self.flush_interval = flush_interval
+        """Time (in seconds) between writes to the database."""
+        self._clock_offset = time.time() - time.perf_counter()
+        self._rowids: list[int] = []
+        self._queue: queue.SimpleQueue[tuple[float, list[tuple[int, float]]] | None] = queue.SimpleQueue()
+        self._buckets: list[dict[int, _Bucket]] = [{} for _ in self.tiers]
+        self._closed: list[tuple] = []
+        self._last_cleanup = 0.0
+        self._lock = threading.Lock()
+        self._connection = self._connect()
+        self._create_tables(self._connection)
+        self._thread = threading.Thread(target=self._writer_loop, daemon=True)
+        self._thread.start()
+
+    def _connect(self):
+        """Opens a new connection to our database."""
+        connection = sqlite3.connect(self.path, timeout=10.0, check_same_thread=False)
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.execute("PRAGMA synchronous=NORMAL")
+        return connection
+
+    def _create_tables(self, connection: sqlite3.Connection):
+        """Creates our tables, if they don't exist."""
+        with connection:
+            connection.execute("CREATE TABLE IF NOT EXISTS sensors (rowid INTEGER PRIMARY KEY, sensor_id TEXT UNIQUE NOT NULL)")
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS buckets (tier INTEGER NOT NULL, sensor INTEGER NOT NULL, time REAL NOT NULL, "
+                "minimum REAL NOT NULL, maximum REAL NOT NULL, total REAL NOT NULL, count INTEGER NOT NULL, "
+                "PRIMARY KEY (tier, sensor, time)) WITHOUT ROWID"
+            )
+
+    def set_sensors(self, sensor_ids: list[str]):
+        """Sets the IDs of the sensors being stored, by their index. ``add()`` receives values by these indexes."""
+        with self._lock:
+            with self._connection:
+                self._connection.executemany("INSERT OR IGNORE INTO sensors (sensor_id) VALUES (?)", [(id,) for id in sensor_ids])
+            rowids = dict(self._connection.execute("SELECT sensor_id, rowid FROM sensors"))
+        self._rowids = [rowids[id] for id in sensor_ids]
+
+    def add(self, timestamp: float, samples: list[tuple[int, float]]):
+        """Adds the given values to the store. They'll be written by the writer thread later.
+
+        Args:
+            timestamp (float): time of the values, from ``time.perf_counter()`` (such as a ``SensorSnapshot.timestamp``).
+            samples (list[tuple[int, float]]): ``(sensor_index, value)`` pairs. Sensor indexes are those from ``set_sensors()``.
+        """
+        rowids = self._rowids
+        self._queue.put((timestamp + self._clock_offset, [(rowids[index], value) for index, value in samples]))
+
+    def _aggregate(self, timestamp: float, samples: list[tuple[int, float]]):
+        """Adds the given samples to the buckets of the first tier, closing buckets that ended."""
+        duration = self.tiers[0][0]
+        start = timestamp - (timestamp % duration)
+        buckets = self._buckets[0]
+        for rowid, value in samples:
+            bucket = buckets.get(rowid)
+            if bucket is None or bucket.start != start:
+                if bucket is not None:
+                    self._close_bucket(0, rowid, bucket)
+                bucket = buckets[rowid] = _Bucket(start)
+            bucket.add(value, value, value, 1)
+
+    def _close_bucket(self, tier: int, rowid: int, bucket: _Bucket):
+        """Queues the given bucket to be written, and merges it into the bucket of the next tier (closing that if needed)."""
+        self._closed.append((tier, rowid, bucket.start, bucket.minimum, bucket.maximum, bucket.total, bucket.count))
+        if tier + 1 >= len(self.tiers):
+            return
+        duration = self.tiers[tier + 1][0]
+        start = bucket.start - (bucket.start % duration)
+        buckets = self._buckets[tier + 1]
+        parent = buckets.get(rowid)
+        if parent is None or parent.start != start:
+            if parent is not None:
+                self._close_bucket(tier + 1, rowid, parent)
+            parent = buckets[rowid] = _Bucket(start)
+        parent.add(bucket.minimum, bucket.maximum, bucket.total, bucket.count)
+
+    def _write(self, rows: list[tuple]):
+        """Writes the given bucket rows to the database in a single transaction, merging with existing buckets."""
+        if len(rows) <= 0:
+            return
+        with self._lock, self._connection:
+            self._connection.executemany(
+                "INSERT INTO buckets (tier, sensor, time, minimum, maximum, total, count) VALUES (?, ?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT (tier, sensor, time) DO UPDATE SET minimum=min(minimum, excluded.minimum), "
+                "maximum=max(maximum, excluded.maximum), total=total+excluded.total, count=count+excluded.count",
+                rows
+            )
+
+    def _cleanup(self, now: float):
+        """Deletes buckets older than the retention of their tier."""
+        with self._lock, self._connection:
+            for tier, (_, retention) in enumerate(self.tiers):
+                if math.isfinite(retention):
+                    self._connection.execute("DELETE FROM buckets WHERE tier = ? AND time < ?", (tier, now - retention))
+
+    def _writer_loop(self):
+        """Main loop of the writer thread: aggregates queued values and periodically writes closed buckets."""
+        next_flush = time.perf_counter() + self.flush_interval
+        stopping = False
+        while not stopping:
+            try:
+                item = self._queue.get(timeout=max(0.0, next_flush - time.perf_counter()))
+                if item is None:
+                    stopping = True
+                else:
+                    self._aggregate(*item)
+            except queue.Empty:
+                pass
+            if stopping or time.perf_counter() >= next_flush:
+                next_flush = time.perf_counter() + self.flush_interval
+                try:
+                    if stopping:
+                        # Write our open buckets as well. They'll be merged with the rest of their data if we resume later.
+                        for tier, buckets in enumerate(self._buckets):
+                            for rowid, bucket in buckets.items():
+                                self._closed.append((tier, rowid, bucket.start, bucket.minimum, bucket.maximum, bucket.total, bucket.count))
+                            buckets.clear()
+                    rows, self._closed = self._closed, []
+                    self._write(rows)
+                    now = time.time()
+                    if now - self._last_cleanup >= 3600.0:
+                        self._last_cleanup = now
+                        self._cleanup(now)
+                except sqlite3.Error as e:
+                    click.secho(f"TimeSeriesStore: failed to write to '{self.path}': {e}", fg="red")
+
+    def close(self):
+        """Stops the writer thread, writing all pending data, and closes the database."""
+        if self._thread is None:
+            return
+        self._queue.put(None)
+        self._thread.join()
+        self._thread = None
+        self._connection.close()
+
+    def query(self, sensor_id: str, start: float, end: float = None, bucket: float = None):
+        """Gets the stored values of a sensor in a time range, aggregated in buckets.
+
+        The finest tier that covers the START time (according to its retention) is used, re-aggregating its buckets to the
+        requested bucket duration.
+
+        Args:
+            sensor_id (str): ID of the sensor.
+            start (float): start of the time range (wall-clock time, as ``time.time()``).
+            end (float, optional): end of the time range. Defaults to now.
+            bucket (float, optional): duration (in seconds) of each returned bucket. Defaults to the duration of the tier's buckets.
+                Durations smaller than the tier's buckets are rounded up to it.
+
+        Returns:
+            list[tuple[float, float, float, float]]: ``(time, minimum, maximum, average)`` of each bucket with values in the range,
+            ordered by time. The time of a bucket is its start time.
+        """
+        if end is None:
+            end = time.time()
+        now = time.time()
+        tier = next((index for index, (_, retention) in enumerate(self.tiers) if start >= now - retention), len(self.tiers) - 1)
+        bucket = max(bucket or 0.0, self.tiers[tier][0])
+        with self._lock:
+            return self._connection.execute(
+                "SELECT CAST(b.time / ? AS INTEGER) * ? AS bucket_time, min(b.minimum), max(b.maximum), sum(b.total) / sum(b.count) "
+                "FROM buckets b JOIN sensors s ON b.sensor = s.rowid "
+                "WHERE b.tier = ? AND s.sensor_id = ? AND b.time >= ? AND b.time < ? "
+                "GROUP BY bucket_time ORDER BY bucket_time",
+                (bucket, bucket, tier, sensor_id, start - (start % bucket), end)
+            ).fetchall()
@@ -8,8 +8,10 @@ from libasvat.imgui.nodes import Node, NodeSystem, PinKind, output_property
 from libasvat.imgui.nodes.node_config import SystemConfig, get_all_prop_values_for_storage, restore_prop_values_to_object
 from libasvat.imgui.colors import Colors, Color
 from lcarsmonitor.widgets.base import BaseWidget, Slot
-from lcarsmonitor.sensors.sensors import InternalSensor, render_create_sensor_menu
+from lcarsmonitor.sensors.sensors import render_create_sensor_menu
 from lcarsmonitor.sensors.sensor_node import Sensor
+from lcarsmonitor.sensors.sensor_group import SensorGroup
+from lcarsmonitor.sensors.sensor_alert import SensorAlert
 from libasvat.data import DataCache
 
 
@@ -64,7 +66,11 @@ class SystemRootNode(Node):
 
     @output_property(use_prop_value=True)
     def delta_time(self) -> float:
-        """Gets the delta time, in seconds, between the current and last frames from IMGUI."""
+        """Gets the delta time, in seconds, between the current and last frames from IMGUI.
+
+        When the system is running headless (see ``UISystem.update()``), this is the time between headless updates instead."""
+        if self.system.headless_delta_time is not None:
+            return self.system.headless_delta_time
         io = imgui.get_io()
         return io.delta_time
 
@@ -103,6 +109,8 @@ class UISystem(NodeSystem):
         super().__init__(name, nodes)
         self.edit_enabled: bool = True
         """If editing the graph is enabled in this system."""
+        self.headless_delta_time: float = None
+        """Delta time (in seconds) of the last headless update (see ``self.update()``). None if the system is rendered by the GUI."""
         self._root_node: SystemRootNode = None
         if self.root_node is None:
             self._root_node = SystemRootNode()
@@ -146,6 +154,19 @@ class UISystem(NodeSystem):
         self.root_node.widget_root.render()
         imgui.end_child()
 
+    def update(self, delta_time: float):
+        """Updates this UISystem without rendering it, for running headless (without a GUI).
+
+        This only triggers the Root node's On Update flow, running the system's logic. Widgets aren't rendered, so flows
+        triggered by widgets (such as button clicks) never happen. Sensor-driven flows are triggered separately, when
+        the ComputerSystem processes sensor events.
+
+        Args:
+            delta_time (float): time (in seconds) since the last update. Used as the Root node's ``delta_time``.
+        """
+        self.headless_delta_time = delta_time
+        self.root_node.on_update.trigger()
+
     def render_system(self):
         if imgui.shortcut(imgui.Key.mod_ctrl | imgui.Key.s):
             self.save_config()
@@ -204,21 +225,24 @@ class UISystem(NodeSystem):
 
         return object_creation_menu(actions.Action, name_getter, filter=self.node_creation_menu_filter)
 
-    def render_create_sensor_menu(self) -> Sensor | None:
-        """Renders the contents for a menu that allows the user to create a Sensor node.
+    def render_create_sensor_menu(self) -> Sensor | SensorGroup | SensorAlert | None:
+        """Renders the contents for a menu that allows the user to create a Sensor (or SensorGroup/SensorAlert) node.
 
         Returns:
-            Sensor: the sensor object from the ComputerSystem singleton, when the user selects a sensor. None otherwise.
+            Sensor | SensorGroup | SensorAlert: the new sensor node, when the user selects a sensor, sensor group or
+            sensor alert. None otherwise.
         """
-        def filter(isen: InternalSensor):
-            """Checks if the given sensor name matches our filter and thus can be displayed."""
-            if not self._node_creation_filter:
-                return True
-            return self._node_creation_filter.lower() in isen.name.lower()
-
-        new_sensor = render_create_sensor_menu(Sensor.__doc__, filter)
+        new_sensor = render_create_sensor_menu(Sensor.__doc__, name_filter=self._node_creation_filter)
         if new_sensor:
             return new_sensor.create()
+        if (self._node_creation_filter or "").lower() in "sensor group":
+            if menu_item("Sensor Group"):
+                return SensorGroup()
+            imgui.set_item_tooltip(SensorGroup.__doc__)
+        if (self._node_creation_filter or "").lower() in "sensor alert":
+            if menu_item("Sensor Alert"):
+                return SensorAlert()
+            imgui.set_item_tooltip(SensorAlert.__doc__)
 
     def draw_background_context_menu(self, linked_to_pin):
         if isinstance(linked_to_pin, Slot):
@@ -22,6 +22,9 @@ class Alert(LCARSWidget):
     The type of the alert (Red, Yellow, etc) is selectable via property, and will update the alert visual representation
     accordingly.
 
+    The alert may also be bound to an alert rule of the ComputerSystem (see ``alert_rule``), in which case it's only
+    displayed while the rule is raised, with the rule's severity as its type.
+
     The alert graphics itself has a fixed aspect-ratio to preserve its proportions, and will try to fit to the slot's area.
     So depending on slot size, some empty space may be left on the left/right or top/bottom sides.
     """
@@ -39,6 +42,7 @@ class Alert(LCARSWidget):
         self._small_text.scale = 2.0
         self._small_text.font = LCARSFont.LCARS_WIDE
         self._small_text.align = Alignment.BOTTOM
+        self._alert_rule = ""
         self._xaml_scale = Vector2(1/734.305, 1/582.540)
         self.bar_data: list[tuple[Color, Animation]] = []
         self._setup_fixed_paths()
@@ -63,6 +67,19 @@ class Alert(LCARSWidget):
         self._alert_type = value
         self._update_alert_type()
 
+    @primitives.string_property()
+    def alert_rule(self) -> str:
+        """Name of an alert rule of the ComputerSystem to bind this alert to. [GET/SET]
+
+        If set, this alert is only displayed while the rule is raised, and its type follows the rule's severity.
+        Alert rules are evaluated by the ComputerSystem after each poll, so no sensor logic is needed to drive this alert.
+        If empty (the default), this alert is always displayed, with the type set in ``alert_type``."""
+        return self._alert_rule
+
+    @alert_rule.setter
+    def alert_rule(self, value: str):
+        self._alert_rule = value
+
     def _draw_alert(self):
         """Internal utility to render our rectangle."""
         ratio = 1.0 / self._xaml_scale.aspect_ratio()
@@ -255,9 +272,24 @@ class Alert(LCARSWidget):
         self.text_animation.add_looping_keyframe()
 
     def render(self):
-        self._draw_alert()
+        if self._is_displayed():
+            self._draw_alert()
         self._handle_interaction()
 
+    def _is_displayed(self):
+        """Checks if this alert should be displayed: always if not bound to an alert rule, otherwise only while the rule
+        is raised. This also updates our type to match the rule's severity."""
+        if not self._alert_rule:
+            return True
+        from lcarsmonitor.sensors.sensors import ComputerSystem
+        rule = ComputerSystem().rules.get_rule(self._alert_rule)
+        if rule is None or not rule.active:
+            return False
+        alert_type = AlertType(rule.severity.value)
+        if alert_type is not self.alert_type:
+            self.alert_type = alert_type
+        return True
+
     def reset_animations(self):
         """Resets all alert animation objects"""
         self.text_animation.reset()
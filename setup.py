@@ -24,5 +24,5 @@ setuptools.setup(
         "License :: Exclusive Copyright",
         "Operating System :: OS Independent",
     ],
-    install_requires=["libasvat", "pythonnet", "pyinstaller"]
+    install_requires=["libasvat", "pythonnet", "pyinstaller", "numpy"]
 )
@@ -0,0 +1,94 @@
+import pytest
+from lcarsmonitor.sensors.catalog import SensorCatalogIndex, build_catalog, CatalogHardware
+from lcarsmonitor.sensors.sources.synthetic_impl import SyntheticSensors
+
+
+@pytest.fixture
+def source():
+    source = SyntheticSensors()
+    source.hardware_count = 2
+    source.sensors_per_hardware = 3
+    source.sub_hardware_count = 2
+    source.sub_hardware_depth = 1
+    source.initialize()
+    return source
+
+
+@pytest.fixture
+def index(source: SyntheticSensors):
+    return SensorCatalogIndex(source.get_all_hardware(), max_cached_filters=2)
+
+
+def all_isensors(source: SyntheticSensors):
+    return [isensor for root in source.get_all_hardware() for isensor in root.get_all_isensors()]
+
+
+def brute_force(source: SyntheticSensors, text: str):
+    """The sensors whose name contains TEXT, checked one by one."""
+    return {isensor for isensor in all_isensors(source) if text.lower() in isensor.name.lower()}
+
+
+def test_tree_is_cached(index: SensorCatalogIndex, source: SyntheticSensors):
+    assert len(index.children) == 6
+    for root in source.get_all_hardware():
+        for hw in root.get_all_hardware():
+            assert index.children[hw] == tuple(hw.children)
+            assert index.isensors[hw] == tuple(hw.isensors)
+
+
+@pytest.mark.parametrize("text", [None, ""])
+def test_empty_filter_matches_everything(index: SensorCatalogIndex, source: SyntheticSensors, text: str):
+    result = index.filter(text)
+    assert result.matches == set(all_isensors(source))
+    assert len(result.rows) == 18
+    assert result.visible_hardware == set(index.children)
+
+
+@pytest.mark.parametrize("text", ["#1", "#", "temp", "TEMPERATURE #1", "load #0", "load #2", "ure #"])
+def test_filter_matches_substrings(index: SensorCatalogIndex, source: SyntheticSensors, text: str):
+    result = index.filter(text)
+    assert result.matches == brute_force(source, text)
+    assert len(result.rows) == len(result.matches)
+    # Visible hardware are the parents (and their parents) of the matched sensors.
+    visible = set()
+    for isensor in result.matches:
+        hw = isensor.parent
+        while hw is not None:
+            visible.add(hw)
+            hw = hw.parent
+    assert result.visible_hardware == visible
+
+
+def test_extending_the_text_refines_the_last_result(index: SensorCatalogIndex, source: SyntheticSensors):
+    name = all_isensors(source)[0].name
+    previous = index.filter(name[:3])
+    for length in range(4, len(name) + 1):
+        result = index.filter(name[:length])
+        assert result.matches == brute_force(source, name[:length])
+        assert result.matches <= previous.matches
+        previous = result
+    # Shortening the text doesn't use the last result.
+    assert index.filter(name[:3]).matches == brute_force(source, name[:3])
+
+
+def test_results_are_cached(index: SensorCatalogIndex):
+    first = index.filter("load")
+    assert index.filter("LOAD") is first
+    index.filter("abc")
+    assert index.filter("load") is first  # used again, so "abc" is the least recently used
+    index.filter("xyz")
+    assert index.filter("load") is first
+    assert "abc" not in index._cache
+
+
+def test_catalog_tree(source: SyntheticSensors):
+    hardware = [hw for root in source.get_all_hardware() for hw in root.get_all_hardware()]
+    catalog = build_catalog("test", hardware)
+    assert [record["start"] for record in catalog["hardware"]] == [0, 3, 6, 9, 12, 15]
+    assert [record["parent"] for record in catalog["hardware"]] == [-1, 0, 0, -1, 3, 3]
+    roots, all_hardware = CatalogHardware.build_tree(catalog)
+    assert [hw.id for hw in roots] == [hw.id for hw in source.get_all_hardware()]
+    assert [hw.id for hw in all_hardware] == [hw.id for hw in hardware]
+    assert [[child.id for child in hw.children] for hw in all_hardware] == [[child.id for child in hw.children] for hw in hardware]
+    rows = [isensor.row for hw in all_hardware for isensor in hw.isensors]
+    assert rows == list(range(18))
@@ -0,0 +1,92 @@
+import os
+import math
+import time
+import pytest
+from array import array
+from types import SimpleNamespace
+from lcarsmonitor.sensors.daemon import SharedSensorTable, DaemonRunningError, SENSOR_FIELDS, STALE_TIMEOUT
+
+
+def fake_isensor(value: float, minimum: float, maximum: float, limits: tuple[float, float] = None):
+    """Object with the InternalSensor data read by ``SharedSensorTable.write_sensor()``."""
+    return SimpleNamespace(value=value, value_range=SimpleNamespace(x=minimum, y=maximum),
+                           limits=limits and SimpleNamespace(x=limits[0], y=limits[1]))
+
+
+@pytest.fixture
+def table():
+    """A new SharedSensorTable with 3 sensors and 2 hardware, under an unique name. It's closed (and unlinked) at the end of the test."""
+    table = SharedSensorTable.create(f"lcarsmonitor_test_{os.getpid()}_{time.perf_counter_ns()}", 3, 2)
+    yield table
+    table.close()
+
+
+def read(table: SharedSensorTable, start: int, count: int, max_attempts: int = 100):
+    out = array("d", bytes(8 * SENSOR_FIELDS * count))
+    with memoryview(out).cast("B") as view:
+        is_ok = table.read_rows(start, view, max_attempts)
+    return is_ok, list(out)
+
+
+def test_new_table_is_empty(table: SharedSensorTable):
+    assert (table.sensor_count, table.hardware_count) == (3, 2)
+    assert (table.sequence, table.generation) == (0, 0)
+    assert table.is_running
+    is_ok, values = read(table, 0, 3)
+    assert is_ok
+    assert all(math.isnan(value) for value in values)
+    assert list(table.demand) == [0.0, 0.0]
+
+
+def test_write_and_read_rows(table: SharedSensorTable):
+    reader = SharedSensorTable.attach(table.shm.name)
+    try:
+        table.begin_write()
+        table.write_sensor(1, fake_isensor(42.0, 30.0, 50.0, (0.0, 100.0)))
+        table.write_sensor(2, fake_isensor(None, 1.0, 2.0))
+        table.end_write()
+        assert (reader.sequence, reader.generation) == (2, 1)
+
+        is_ok, values = read(reader, 1, 2)
+        assert is_ok
+        assert values[:SENSOR_FIELDS] == [42.0, 30.0, 50.0, 0.0, 100.0]
+        assert math.isnan(values[SENSOR_FIELDS])
+        assert values[SENSOR_FIELDS + 1:SENSOR_FIELDS + 3] == [1.0, 2.0]
+        assert all(math.isnan(value) for value in values[SENSOR_FIELDS + 3:])
+
+        # Readers write their demand, which the daemon reads.
+        reader.demand[1] = 123.0
+        assert table.demand[1] == 123.0
+    finally:
+        reader.close()
+
+
+def test_read_fails_while_writing(table: SharedSensorTable):
+    table.begin_write()
+    assert table.sequence % 2 == 1
+    is_ok, _ = read(table, 0, 1, max_attempts=3)
+    assert not is_ok
+    table.end_write()
+    is_ok, _ = read(table, 0, 1, max_attempts=3)
+    assert is_ok
+
+
+def test_running_daemon_is_not_replaced(table: SharedSensorTable):
+    with pytest.raises(DaemonRunningError):
+        SharedSensorTable.create(table.shm.name, 1, 1)
+    # The running daemon's table is untouched.
+    assert table.sensor_count == 3
+    reader = SharedSensorTable.attach(table.shm.name)
+    assert reader.sensor_count == 3
+    reader.close()
+
+
+def test_stale_table_is_replaced(table: SharedSensorTable):
+    table._heartbeat[0] = time.time() - STALE_TIMEOUT - 1.0  # as left over by a crashed daemon
+    assert not table.is_running
+    new_table = SharedSensorTable.create(table.shm.name, 1, 1)
+    try:
+        assert (new_table.sensor_count, new_table.hardware_count) == (1, 1)
+    finally:
+        new_table.close()
+    table.owner = False  # the new table already unlinked the shared memory
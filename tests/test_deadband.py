@@ -0,0 +1,54 @@
+import math
+from lcarsmonitor.sensors.deadband import ChangeDetector
+
+
+def test_any_change_without_deadband():
+    detector = ChangeDetector()
+    assert detector.check(10.0)
+    assert not detector.check(10.0)
+    assert detector.check(10.001)
+
+
+def test_absolute_deadband_is_from_reported_value():
+    detector = ChangeDetector()
+    detector.check(10.0)
+    assert not detector.check(10.4, deadband=0.5)
+    assert not detector.check(10.5, deadband=0.5)
+    # Small changes don't accumulate against the previous value, only against the last reported one.
+    assert detector.check(10.6, deadband=0.5)
+    assert detector.last_value == 10.6
+
+
+def test_relative_deadband():
+    detector = ChangeDetector()
+    detector.check(100.0)
+    assert not detector.check(104.0, relative_deadband=0.05)
+    assert detector.check(106.0, relative_deadband=0.05)
+    # The largest of both deadbands is used.
+    assert not detector.check(110.0, deadband=5.0, relative_deadband=0.01)
+
+
+def test_hysteresis_only_on_reversals():
+    detector = ChangeDetector()
+    detector.check(50.0)
+    assert detector.check(52.0, deadband=1.0, hysteresis=2.0)  # first direction: no hysteresis
+    assert detector.check(54.0, deadband=1.0, hysteresis=2.0)  # same direction
+    assert not detector.check(52.0, deadband=1.0, hysteresis=2.0)  # reversal needs more than 3
+    assert detector.check(50.5, deadband=1.0, hysteresis=2.0)
+    assert detector.direction == -1
+
+
+def test_missing_values():
+    detector = ChangeDetector()
+    assert not detector.check(math.nan)
+    assert detector.check(10.0)
+    assert detector.check(math.nan)  # value disappeared
+    assert not detector.check(math.nan)
+    assert detector.check(10.0, deadband=100.0)  # value appeared, regardless of deadband
+
+
+def test_reset():
+    detector = ChangeDetector()
+    detector.check(10.0)
+    detector.reset()
+    assert detector.check(10.0)
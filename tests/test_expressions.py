@@ -0,0 +1,133 @@
+import math
+import numpy as np
+import pytest
+from fnmatch import fnmatchcase
+from lcarsmonitor.sensors.expressions import ExpressionError, compile_expression
+
+SENSORS = ["/cpu/0/temperature/0", "/cpu/0/load/1", "/cpu/0/load/2", "/gpu/0/temperature/0", "/fan/0"]
+"""IDs of the sensors available to the test expressions, by index."""
+
+
+def compile(expression: str, conditions: bool = False):
+    def resolve_sensor(key: str):
+        return SENSORS.index(key) if key in SENSORS else None
+
+    def resolve_sensors(pattern: str):
+        return [index for index, key in enumerate(SENSORS) if fnmatchcase(key, pattern)]
+    return compile_expression(expression, resolve_sensor, resolve_sensors, conditions)
+
+
+def values(*sensor_values: float):
+    return np.array(sensor_values, dtype=np.float64)
+
+
+VALUES = values(60.0, 20.0, 40.0, 70.0, 1200.0)
+
+
+@pytest.mark.parametrize("expression,conditions", [
+    ("sensor(", False),
+    ("sensor('/missing')", False),
+    ("sensor(1)", False),
+    ("sensors('/nothing/*')", False),
+    ("sensors('/cpu/0/load/*')", False),  # results in a vector
+    ("unknown(1)", False),
+    ("abs(1, 2)", False),
+    ("__import__('os')", False),
+    ("sensor('/fan/0').real", False),
+    ("sensor('/fan/0') > 0", False),  # conditions disabled
+    ("rate(sensor('/fan/0'))", False),
+    ("rate(rate(sensor('/fan/0')))", True),
+    ("rate(sensor('/fan/0') > 1) > 0", True),  # used to compile, then raise TypeError when evaluated
+    ("rate(not sensor('/fan/0'))", True),
+    ("sensors('/cpu/0/load/*') > 10", True),
+    ("sensors('/cpu/0/load/*') > 10 and 1", True),
+    ("0 < sensors('/cpu/0/load/*') < 10", True),
+])
+def test_compile_errors(expression: str, conditions: bool):
+    with pytest.raises(ExpressionError):
+        compile(expression, conditions)
+
+
+def test_arithmetic_and_dependencies():
+    program = compile("(sensor('/cpu/0/temperature/0') + sensor('/gpu/0/temperature/0')) / 2")
+    assert program.dependencies == (0, 3)
+    assert program.evaluate(VALUES) == pytest.approx(65.0)
+
+
+def test_reductions_over_globs():
+    program = compile("max(sensors('/cpu/0/load/*')) + sum(sensors('*/temperature/*'))")
+    assert program.dependencies == (0, 1, 2, 3)
+    assert program.evaluate(VALUES) == pytest.approx(40.0 + 130.0)
+    # Sensors without values are ignored by reductions...
+    assert compile("avg(sensors('/cpu/0/load/*'))").evaluate(values(60, math.nan, 40, 70, 0)) == pytest.approx(40.0)
+    assert compile("count(sensors('/cpu/0/load/*'))").evaluate(values(60, math.nan, 40, 70, 0)) == 1.0
+    # ...unless none of them have values.
+    assert math.isnan(compile("max(sensors('/cpu/0/load/*'))").evaluate(values(60, math.nan, math.nan, 70, 0)))
+
+
+def test_undefined_results_are_nan():
+    # Callers ignore numpy warnings while evaluating (see RuleEngine.evaluate()).
+    with np.errstate(all="ignore"):
+        assert math.isnan(compile("sensor('/fan/0') + 1").evaluate(values(0, 0, 0, 0, math.nan)))
+        assert math.isnan(compile("1 / sensor('/fan/0')").evaluate(values(0, 0, 0, 0, 0)))
+        assert math.isnan(compile("10 ** sensor('/fan/0')").evaluate(VALUES))  # overflow
+
+
+@pytest.mark.parametrize("expression,expected", [
+    ("sensor('/fan/0') > 1000", 1.0),
+    ("sensor('/fan/0') == 0", 0.0),
+    ("20 <= sensor('/cpu/0/load/1') < 40", 1.0),
+    ("20 < sensor('/cpu/0/load/1') < 40", 0.0),
+    ("sensor('/fan/0') > 1000 and sensor('/cpu/0/load/1') > 50", 0.0),
+    ("sensor('/fan/0') > 1000 or sensor('/cpu/0/load/1') > 50", 1.0),
+    ("not sensor('/fan/0') > 1000", 0.0),
+    ("any(sensors('/cpu/0/load/*') > 30)", 1.0),
+    ("all(sensors('/cpu/0/load/*') > 30)", 0.0),
+])
+def test_conditions(expression: str, expected: float):
+    assert compile(expression, conditions=True).evaluate(VALUES) == expected
+
+
+@pytest.mark.parametrize("expression", [
+    "sensor('/fan/0') == 0",
+    "sensor('/fan/0') != 0",
+    "not sensor('/fan/0')",
+    "sensor('/fan/0') and 1",  # NaN is "truthy" in Python
+    "0 or sensor('/fan/0')",
+    "1 < sensor('/fan/0') < 2000",
+    "sensor('/cpu/0/load/1') > 10 and sensor('/fan/0') > 10",
+])
+def test_conditions_propagate_nan(expression: str):
+    no_fan = values(60, 20, 40, 70, math.nan)
+    assert math.isnan(compile(expression, conditions=True).evaluate(no_fan))
+
+
+def test_vector_conditions_ignore_missing_values():
+    program = compile("any(sensors('/cpu/0/load/*') == 0)", conditions=True)
+    assert program.evaluate(values(60, math.nan, 40, 70, 0)) == 0.0
+    assert program.evaluate(values(60, math.nan, 0, 70, 0)) == 1.0
+    assert math.isnan(program.evaluate(values(60, math.nan, math.nan, 70, 0)))
+
+
+def test_rate():
+    program = compile("rate(sensor('/cpu/0/temperature/0'))", conditions=True)
+    later = values(65, 20, 40, 70, 1200)
+    assert program.evaluate(later, VALUES, 2.0) == pytest.approx(2.5)
+    with np.errstate(all="ignore"):
+        assert math.isnan(program.evaluate(VALUES))  # no previous values
+        assert math.isnan(program.evaluate(later, VALUES, 0.0))
+
+    program = compile("max(rate(sensors('/cpu/0/load/*'))) > 5", conditions=True)
+    assert program.evaluate(values(60, 30, 40, 70, 1200), VALUES, 1.0) == 1.0
+    assert program.evaluate(values(60, 24, 42, 70, 1200), VALUES, 1.0) == 0.0
+
+
+def test_limit():
+    program = compile("sensor('/cpu/0/temperature/0') >= limit('/cpu/0/temperature/0') - 5", conditions=True)
+    assert program.dependencies == (0,)
+    limits = values(100, math.nan, math.nan, 90, math.nan)
+    assert program.evaluate(VALUES, limits=limits) == 0.0
+    assert program.evaluate(values(96, 20, 40, 70, 1200), limits=limits) == 1.0
+    # Sensors without limits (or no limits given at all) are undefined.
+    assert math.isnan(program.evaluate(VALUES))
+    assert math.isnan(compile("limit('/fan/0') > 0", conditions=True).evaluate(VALUES, limits=limits))
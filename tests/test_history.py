@@ -0,0 +1,62 @@
+import pytest
+from lcarsmonitor.sensors.history import SensorHistory, HistoryTier, DEFAULT_RAW_CAPACITY, DEFAULT_TIERS
+
+
+def test_default_memory_budget():
+    history = SensorHistory()
+    assert history.raw_capacity == DEFAULT_RAW_CAPACITY
+    assert [tier.bucket_duration for tier in history.tiers] == [duration for duration, _ in DEFAULT_TIERS]
+    assert history.memory_size <= 10 * 1024
+
+
+def test_raw_ring_buffer():
+    history = SensorHistory(raw_capacity=5, tiers=())
+    assert len(history) == 0
+    assert history.last_timestamp is None
+    assert history.get_raw() == ([], [])
+    for second in range(8):
+        history.append(float(second), second * 10.0)
+    assert len(history) == 5
+    assert history.last_timestamp == 7.0
+    assert history.get_raw() == ([3.0, 4.0, 5.0, 6.0, 7.0], [30.0, 40.0, 50.0, 60.0, 70.0])
+    assert history.get_raw(duration=2.0) == ([5.0, 6.0, 7.0], [50.0, 60.0, 70.0])
+
+
+def test_rollup_buckets():
+    tier = HistoryTier(10.0, 4)
+    for timestamp, value in ((0.0, 5.0), (3.0, 1.0), (9.5, 9.0), (12.0, 20.0), (15.0, 40.0)):
+        tier.add(timestamp, value)
+    # Only closed buckets are returned: the one started at 10s is still open.
+    times, mins, maxs, avgs = tier.get()
+    assert (times, mins, maxs) == ([0.0], [1.0], [9.0])
+    assert avgs == [pytest.approx(5.0)]
+
+    tier.add(21.0, 0.0)
+    times, mins, maxs, avgs = tier.get()
+    assert times == [0.0, 10.0]
+    assert (mins[1], maxs[1], avgs[1]) == (20.0, 40.0, 30.0)
+
+
+def test_rollup_skips_empty_buckets_and_wraps():
+    tier = HistoryTier(1.0, 3)
+    for timestamp in (0.0, 1.0, 5.0, 6.0, 7.0, 8.0):
+        tier.add(timestamp, timestamp)
+    assert len(tier) == 3
+    times, _, _, _ = tier.get()
+    assert times == [5.0, 6.0, 7.0]  # the gap (2s to 4s) has no buckets, and the oldest were overwritten
+    assert tier.get(duration=1.0)[0] == [6.0, 7.0]
+
+
+def test_history_rollups():
+    history = SensorHistory(raw_capacity=10, tiers=((1.0, 10), (5.0, 10)))
+    for step in range(21):
+        history.append(step * 0.5, float(step))
+    times, mins, maxs, avgs = history.get_rollup(1.0)
+    assert len(times) == 10
+    assert (times[0], mins[0], maxs[0], avgs[0]) == (0.0, 0.0, 1.0, 0.5)
+    times, mins, maxs, avgs = history.get_rollup(5.0)
+    assert (times, mins, maxs, avgs) == ([0.0, 5.0], [0.0, 10.0], [9.0, 19.0], [4.5, 14.5])
+    # Buckets that started in the last DURATION seconds, relative to the newest sample (at 10s).
+    assert history.get_rollup(5.0, duration=5.0)[0] == [5.0]
+    assert history.get_rollup(5.0, duration=3.0)[0] == []
+    assert history.get_rollup(60.0) == ([], [], [], [])
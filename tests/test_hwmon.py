@@ -0,0 +1,134 @@
+import os
+import pytest
+from lcarsmonitor.sensors.sensors_api import HardwareType, SensorType
+from lcarsmonitor.sensors.sources.hwmon_impl import HwmonSensors
+
+
+def make_chip(root, folder: str, name: str, attributes: dict[str, str], device: str = None):
+    """Creates a fake hwmon chip folder ``ROOT/FOLDER`` with the given ``name`` and attribute files.
+    If DEVICE is given, the chip's ``device`` symlink points to a folder with that name in ``ROOT/devices``."""
+    path = root / folder
+    path.mkdir()
+    (path / "name").write_text(f"{name}\n")
+    for attribute, content in attributes.items():
+        (path / attribute).write_text(f"{content}\n")
+    if device is not None:
+        target = root / "devices" / device
+        target.mkdir(parents=True)
+        os.symlink(target, path / "device")
+    return path
+
+
+@pytest.fixture
+def source(tmp_path):
+    """A HwmonSensors source reading from an (initially empty) fake hwmon folder at ``tmp_path``.
+    It's shut down at the end of the test."""
+    source = HwmonSensors()
+    source.sysfs_path = str(tmp_path)
+    yield source
+    source.shutdown()
+
+
+def test_check_availability(tmp_path, source: HwmonSensors):
+    is_ok, _ = source.check_availability()
+    assert is_ok
+    source.sysfs_path = str(tmp_path / "missing")
+    is_ok, _ = source.check_availability()
+    assert not is_ok
+
+
+def test_chips_are_sorted_with_stable_ids(tmp_path, source: HwmonSensors):
+    # hwmonN numbering follows probe order, so same-named chips are told apart by their device path.
+    make_chip(tmp_path, "hwmon0", "nvme", {"temp1_input": "40000"}, device="nvme1")
+    make_chip(tmp_path, "hwmon1", "nvme", {"temp1_input": "30000"}, device="nvme0")
+    make_chip(tmp_path, "hwmon2", "coretemp", {"temp1_input": "50000"}, device="coretemp.0")
+    make_chip(tmp_path, "hwmon3", "empty", {}, device="empty")
+    source.initialize()
+
+    hardware = source.get_all_hardware()
+    assert [hw.id for hw in hardware] == ["/hwmon/coretemp/0", "/hwmon/nvme/0", "/hwmon/nvme/1"]
+    assert [hw.path for hw in hardware] == [str(tmp_path / folder) for folder in ("hwmon2", "hwmon1", "hwmon0")]
+    assert [hw.type for hw in hardware] == [HardwareType.CPU, HardwareType.Storage, HardwareType.Storage]
+
+
+def test_sensor_types_and_scales(tmp_path, source: HwmonSensors):
+    make_chip(tmp_path, "hwmon0", "nct6798", {
+        "temp1_input": "45500",
+        "temp1_label": "SYSTIN",
+        "fan1_input": "1200",
+        "in0_input": "1250",
+        "power1_input": "15000000",
+        "curr1_input": "2500",
+        "temp1_max": "80000",  # not an input: not a sensor
+    })
+    source.initialize()
+    hw = source.get_all_hardware()[0]
+    assert hw.type == HardwareType.SuperIO
+    hw.poll()
+
+    sensors = {(isensor.type, isensor.name): isensor.value for isensor in hw.isensors}
+    assert sensors == {
+        (SensorType.Temperature, "SYSTIN"): pytest.approx(45.5),
+        (SensorType.Fan, f"{SensorType.Fan.value} #1"): pytest.approx(1200.0),
+        (SensorType.Voltage, f"{SensorType.Voltage.value} #0"): pytest.approx(1.25),
+        (SensorType.Power, f"{SensorType.Power.value} #1"): pytest.approx(15.0),
+        (SensorType.Current, f"{SensorType.Current.value} #1"): pytest.approx(2.5),
+    }
+
+
+def test_limits(tmp_path, source: HwmonSensors):
+    make_chip(tmp_path, "hwmon0", "k10temp", {
+        "temp1_input": "40000", "temp1_min": "10000", "temp1_max": "70000", "temp1_crit": "95000",
+        "temp2_input": "40000", "temp2_max": "70000",
+        "temp3_input": "40000",
+    })
+    source.initialize()
+    limits = [isensor.limits for isensor in source.get_all_hardware()[0].isensors]
+
+    assert (limits[0].x, limits[0].y) == pytest.approx((10.0, 95.0))  # crit takes priority over max
+    assert (limits[1].x, limits[1].y) == pytest.approx((0.0, 70.0))
+    assert limits[2] is None
+
+
+def test_rereads_changed_values(tmp_path, source: HwmonSensors):
+    chip = make_chip(tmp_path, "hwmon0", "acpitz", {"temp1_input": "40000"})
+    source.initialize()
+    isensor = source.get_all_hardware()[0].isensors[0]
+    isensor.update()
+    assert isensor.value == pytest.approx(40.0)
+
+    # Rewriting the file in place keeps the inode, same as sysfs regenerating the attribute on each read.
+    (chip / "temp1_input").write_text("52000\n")
+    isensor.update()
+    assert isensor.value == pytest.approx(52.0)
+    assert (isensor.value_range.x, isensor.value_range.y) == pytest.approx((40.0, 52.0))
+
+
+def test_failing_read_has_no_value(tmp_path, source: HwmonSensors):
+    chip = make_chip(tmp_path, "hwmon0", "drivetemp", {"temp1_input": "35000"})
+    source.initialize()
+    isensor = source.get_all_hardware()[0].isensors[0]
+    isensor.update()
+    assert isensor.value == pytest.approx(35.0)
+
+    (chip / "temp1_input").write_text("unavailable\n")
+    isensor.update()
+    assert isensor.value is None
+
+
+def test_shutdown_closes_files(tmp_path, source: HwmonSensors, monkeypatch):
+    make_chip(tmp_path, "hwmon0", "coretemp", {"temp1_input": "40000", "temp2_input": "41000"})
+    source.initialize()
+    isensors = list(source.get_all_hardware()[0].isensors)
+    fds = [isensor._fd for isensor in isensors]
+    assert all(fd >= 0 for fd in fds)
+
+    closed = []
+    close = os.close
+    monkeypatch.setattr(os, "close", lambda fd: (closed.append(fd), close(fd)))
+    source.shutdown()
+    assert sorted(closed) == sorted(fds)
+    assert len(source.get_all_hardware()) == 0
+    for isensor in isensors:
+        assert isensor._fd < 0
+        isensor.update()  # closed sensors are no longer read
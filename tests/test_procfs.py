@@ -0,0 +1,141 @@
+import os
+import shutil
+import pytest
+from lcarsmonitor.sensors.sensors_api import SensorType
+from lcarsmonitor.sensors.sources.proc_impl import (ProcSensors, ProcCpuHardware, ProcMemoryHardware, ProcDisksHardware,
+                                                    ProcNetworkHardware, SECTOR_SIZE)
+
+FIXTURES_PATH = os.path.join(os.path.dirname(__file__), "fixtures", "procfs")
+"""Folder with recorded procfs files (``stat``, ``meminfo``, ``diskstats`` and ``net/dev``)."""
+
+
+def read_fixture(filename: str) -> bytes:
+    with open(os.path.join(FIXTURES_PATH, filename), "rb") as file:
+        return file.read()
+
+
+def poll(hw, data: bytes, timestamp: float):
+    """Parses DATA (read at TIMESTAMP) with the given hardware, and updates its sensors."""
+    hw.parse(data, timestamp)
+    for isensor in hw.isensors:
+        isensor.update()
+    return {str(isensor.id): isensor.value for isensor in hw.isensors}
+
+
+def test_cpu_load():
+    data = read_fixture(ProcCpuHardware.FILENAME)
+    hw = ProcCpuHardware(data)
+    assert [isensor.name for isensor in hw.isensors] == ["CPU Total"] + [f"CPU Core #{core}" for core in range(1, 5)]
+    assert all(isensor.type == SensorType.Load for isensor in hw.isensors)
+    assert poll(hw, data, 0.0)["/proc/cpu/load/0"] is None  # first poll has no delta
+
+    # cpu0: +30 user, +10 system, +50 idle, +10 iowait -> 40% load. Other cores are unchanged.
+    later = data.replace(b"cpu0 1393 280 234 924458 9530", b"cpu0 1423 280 244 924508 9540")
+    values = poll(hw, later, 1.0)
+    assert values["/proc/cpu/load/1"] == pytest.approx(40.0)
+    assert values["/proc/cpu/load/2"] is None
+
+
+def test_moved_lines_are_found():
+    data = read_fixture(ProcCpuHardware.FILENAME)
+    hw = ProcCpuHardware(data)
+    poll(hw, data, 0.0)
+    # cpu0 gains a digit, moving all following lines. cpu3: +25 user, +75 idle -> 25% load.
+    later = data.replace(b"cpu0 1393 ", b"cpu0 11393 ").replace(b"cpu3 984 27 112 924355 ", b"cpu3 1009 27 112 924430 ")
+    values = poll(hw, later, 1.0)
+    assert values["/proc/cpu/load/4"] == pytest.approx(25.0)
+    assert values["/proc/cpu/load/1"] == pytest.approx(100.0)
+
+
+def test_memory_usage():
+    hw = ProcMemoryHardware(read_fixture(ProcMemoryHardware.FILENAME))
+    values = poll(hw, read_fixture(ProcMemoryHardware.FILENAME), 0.0)
+    assert values["/proc/ram/load/0"] == pytest.approx(100.0 * (16303428 - 12454072) / 16303428)
+    assert values["/proc/ram/data/1"] == pytest.approx(12454072 / (1024 * 1024))
+    assert values["/proc/ram/load/1"] == pytest.approx(100.0 * (2097148 - 1572860) / 2097148)
+
+    # Missing keys have no value, instead of reading some other line.
+    values = poll(hw, b"MemTotal:       16303428 kB\nMemFree:         9231580 kB\n", 1.0)
+    assert values["/proc/ram/load/0"] is None
+    assert values["/proc/ram/load/1"] is None
+
+
+def test_disks_throughput():
+    data = read_fixture(ProcDisksHardware.FILENAME)
+    hw = ProcDisksHardware(data)
+    # Virtual devices and partitions are ignored.
+    assert sorted({str(isensor.id).split("/")[3] for isensor in hw.isensors}) == ["nvme0n1", "sda"]
+    poll(hw, data, 0.0)
+
+    later = data.replace(b"nvme0n1 204118 61092 14108364 45290 366240 262344 24372576 391126 0 337924",
+                         b"nvme0n1 204118 61092 14110412 45290 366240 262344 24376672 391126 0 338174")
+    values = poll(hw, later, 0.5)
+    assert values["/proc/storage/nvme0n1/throughput/0"] == pytest.approx(2048 * SECTOR_SIZE / 0.5)
+    assert values["/proc/storage/nvme0n1/throughput/1"] == pytest.approx(4096 * SECTOR_SIZE / 0.5)
+    assert values["/proc/storage/nvme0n1/load/0"] == pytest.approx(50.0)
+    assert values["/proc/storage/sda/throughput/0"] == pytest.approx(0.0)
+
+
+def test_network_throughput():
+    data = read_fixture(ProcNetworkHardware.FILENAME)
+    hw = ProcNetworkHardware(data)
+    # The loopback is ignored, and interface names may be glued to their first counter.
+    assert [isensor.name for isensor in hw.isensors] == ["enp5s0 Download Speed", "enp5s0 Upload Speed",
+                                                         "wlp4s0 Download Speed", "wlp4s0 Upload Speed"]
+    poll(hw, data, 0.0)
+
+    later = data.replace(b"wlp4s0:2306520 ", b"wlp4s0:2307520 ").replace(b"   480266 ", b"   480766 ")
+    values = poll(hw, later, 2.0)
+    assert values["/proc/network/wlp4s0/throughput/0"] == pytest.approx(500.0)
+    assert values["/proc/network/wlp4s0/throughput/1"] == pytest.approx(250.0)
+    assert values["/proc/network/enp5s0/throughput/0"] == pytest.approx(0.0)
+
+
+def test_missing_label_has_no_value():
+    data = read_fixture(ProcDisksHardware.FILENAME)
+    hw = ProcDisksHardware(data)
+    poll(hw, data, 0.0)
+    # Such as a removed USB disk.
+    unplugged = b"".join(line for line in data.splitlines(keepends=True) if b" sda " not in line)
+    values = poll(hw, unplugged, 1.0)
+    assert values["/proc/storage/sda/throughput/0"] is None
+    assert values["/proc/storage/nvme0n1/throughput/0"] == pytest.approx(0.0)
+
+
+@pytest.fixture
+def procfs_path(tmp_path):
+    """A copy of the procfs fixtures, which tests may change."""
+    path = tmp_path / "proc"
+    shutil.copytree(FIXTURES_PATH, path)
+    return path
+
+
+def test_source_reads_fixtures(procfs_path):
+    source = ProcSensors()
+    source.procfs_path = str(procfs_path)
+    assert source.check_availability()[0]
+    source.initialize()
+    try:
+        assert [hw.name for hw in source.get_all_hardware()] == ["CPU", "Memory", "Storage", "Network"]
+        memory = source.get_all_hardware()[1]
+        memory.poll()
+        assert memory.isensors[0].value == pytest.approx(100.0 * (16303428 - 12454072) / 16303428)
+    finally:
+        source.shutdown()
+
+
+def test_source_skips_unparsable_files(procfs_path, monkeypatch):
+    def failing_layout(self, data):
+        raise ValueError("unexpected contents")
+    monkeypatch.setattr(ProcDisksHardware, "_build_layout", failing_layout)
+    opened, closed = [], []
+    os_open, os_close = os.open, os.close
+    monkeypatch.setattr(os, "open", lambda *args: opened.append(os_open(*args)) or opened[-1])
+    monkeypatch.setattr(os, "close", lambda fd: (closed.append(fd), os_close(fd)))
+
+    source = ProcSensors()
+    source.procfs_path = str(procfs_path)
+    source.initialize()
+    assert [hw.name for hw in source.get_all_hardware()] == ["CPU", "Memory", "Network"]
+    source.shutdown()
+    assert sorted(closed) == sorted(opened)
@@ -0,0 +1,129 @@
+import math
+import pytest
+from array import array
+from lcarsmonitor.sensors.snapshot import SensorSnapshot
+from lcarsmonitor.sensors.catalog import get_catalog_isensors
+from lcarsmonitor.sensors.recording import SensorRecorder, RecordingReader, RecordingFormat, RECORDING_EXTENSION
+from lcarsmonitor.sensors.sources.synthetic_impl import SyntheticSensors
+from lcarsmonitor.sensors.sources.replay_impl import ReplaySensors
+
+TIMESTAMPS = (100.0, 100.5, 101.0, 102.5)
+
+
+def frame_values(frame: int, sensor_count: int):
+    """Values recorded in the given frame: the second sensor has no value in odd frames."""
+    return [math.nan if (row == 1 and frame % 2) else frame * 10.0 + row for row in range(sensor_count)]
+
+
+@pytest.fixture
+def source():
+    source = SyntheticSensors()
+    source.hardware_count = 2
+    source.sensors_per_hardware = 2
+    source.sub_hardware_count = 1
+    source.sub_hardware_depth = 1
+    source.initialize()
+    return source
+
+
+@pytest.fixture
+def recording(tmp_path, source: SyntheticSensors):
+    """Path of a recording of the synthetic SOURCE, with a frame for each of TIMESTAMPS."""
+    hardware = [hw for root in source.get_all_hardware() for hw in root.get_all_hardware()]
+    isensors = get_catalog_isensors(hardware)
+    for index, isensor in enumerate(isensors):
+        isensor.index = index
+    path = str(tmp_path / f"test{RECORDING_EXTENSION}")
+    recorder = SensorRecorder(path, source.pretty_name, hardware)
+    for frame, timestamp in enumerate(TIMESTAMPS):
+        recorder.record(SensorSnapshot(timestamp=timestamp, values=array("d", frame_values(frame, len(isensors)))))
+    assert recorder.frame_count == len(TIMESTAMPS)
+    recorder.close()
+    recorder.record(SensorSnapshot(timestamp=200.0, values=array("d", frame_values(0, len(isensors)))))  # ignored
+    return path
+
+
+def assert_values(values, expected: list[float]):
+    assert len(values) == len(expected)
+    for value, expected_value in zip(values, expected):
+        if math.isnan(expected_value):
+            assert math.isnan(value)
+        else:
+            assert value == pytest.approx(expected_value)
+
+
+def test_reader(recording: str, source: SyntheticSensors):
+    reader = RecordingReader(recording)
+    try:
+        assert reader.sensor_count == 8
+        assert reader.frame_count == len(TIMESTAMPS)
+        assert [reader.get_timestamp(frame) for frame in range(reader.frame_count)] == [0.0, 0.5, 1.0, 2.5]
+        assert reader.duration == 2.5
+        assert reader.catalog["source"] == source.pretty_name
+        assert [record["id"] for record in reader.catalog["hardware"]] == ["/synthetic/0", "/synthetic/0/0", "/synthetic/1", "/synthetic/1/0"]
+        for frame in range(reader.frame_count):
+            with reader.get_values(frame, 0, reader.sensor_count) as values:
+                assert_values(values, frame_values(frame, reader.sensor_count))
+        with reader.get_values(2, 3, 2) as values:
+            assert_values(values, frame_values(2, 8)[3:5])
+    finally:
+        reader.close()
+
+
+@pytest.mark.parametrize("timestamp,frame", [(-1.0, 0), (0.0, 0), (0.7, 1), (1.0, 2), (2.0, 2), (99.0, 3)])
+def test_find_frame(recording: str, timestamp: float, frame: int):
+    reader = RecordingReader(recording)
+    try:
+        assert reader.find_frame(timestamp) == frame
+    finally:
+        reader.close()
+
+
+def test_partial_frame_is_ignored(recording: str):
+    with open(recording, "ab") as file:
+        file.write(b"\0" * (RecordingFormat.frame_size(8) - 1))
+    reader = RecordingReader(recording)
+    assert reader.frame_count == len(TIMESTAMPS)
+    reader.close()
+
+
+def test_invalid_recording(tmp_path):
+    path = tmp_path / "invalid.lcrec"
+    path.write_bytes(b"NOTAREC!" + bytes(64))
+    with pytest.raises(ValueError):
+        RecordingReader(str(path))
+    replay = ReplaySensors()
+    replay.recording_path = str(path)
+    is_available, _ = replay.check_availability()
+    assert not is_available
+
+
+@pytest.mark.parametrize("loop", [False, True])
+def test_replay(recording: str, source: SyntheticSensors, loop: bool):
+    replay = ReplaySensors()
+    replay.recording_path = recording
+    replay.playback_speed = 0
+    replay.loop = loop
+    is_available, _ = replay.check_availability()
+    assert is_available
+    replay.initialize()
+    try:
+        original = [hw for root in source.get_all_hardware() for hw in root.get_all_hardware()]
+        replayed = [hw for root in replay.get_all_hardware() for hw in root.get_all_hardware()]
+        assert [(hw.id, hw.name) for hw in replayed] == [(hw.id, hw.name) for hw in original]
+        isensors = get_catalog_isensors(replayed)
+        assert [(isensor.id, isensor.name, isensor.type) for isensor in isensors] == \
+            [(isensor.id, isensor.name, isensor.type) for isensor in get_catalog_isensors(original)]
+
+        # Each poll of a hardware reads its next frame.
+        expected_frames = [0, 1, 2, 3, 0 if loop else 3]
+        for frame in expected_frames:
+            for hw in replayed:
+                hw.poll()
+            expected = frame_values(frame, len(isensors))
+            values = [math.nan if isensor.value is None else isensor.value for isensor in isensors]
+            assert_values(values, expected)
+        assert isensors[0].value_range.x == pytest.approx(0.0)
+        assert isensors[0].value_range.y == pytest.approx(30.0)
+    finally:
+        replay.shutdown()
@@ -0,0 +1,158 @@
+import math
+import pytest
+from array import array
+from lcarsmonitor.sensors.snapshot import SensorSnapshot
+from lcarsmonitor.sensors.rules import AlertRule, AlertSeverity, RuleEngine
+
+
+class FakeHardware:
+    def __init__(self, name: str):
+        self.full_name = name
+        self.polled = True
+
+
+class FakeSensor:
+    """Minimal stand-in for an InternalSensor: rules only use its ID, name, index, parent and subscribers."""
+
+    def __init__(self, parent: FakeHardware, id: str, name: str, index: int):
+        self.parent = parent
+        self.id = id
+        self.full_name = f"{parent.full_name} / {name}"
+        self.index = index
+        self.subscribers = []
+
+    def _add(self, subscriber):
+        self.subscribers.append(subscriber)
+
+    def _remove(self, subscriber):
+        self.subscribers.remove(subscriber)
+
+
+@pytest.fixture
+def cpu():
+    return FakeHardware("CPU")
+
+
+@pytest.fixture
+def isensors(cpu):
+    """Sensors by ID: a CPU temperature and two CPU core loads, and a fan from another hardware."""
+    board = FakeHardware("Motherboard")
+    isensors = [
+        FakeSensor(cpu, "/cpu/0/temperature/0", "Package", 0),
+        FakeSensor(cpu, "/cpu/0/load/1", "Core #1", 1),
+        FakeSensor(cpu, "/cpu/0/load/2", "Core #2", 2),
+        FakeSensor(board, "/board/fan/0", "Fan #1", 3),
+    ]
+    return {isensor.id: isensor for isensor in isensors}
+
+
+def snapshot(timestamp: float, *values: float, limits: list[float] = None):
+    limits = array("d", limits or [math.nan] * len(values))
+    return SensorSnapshot(timestamp=timestamp, values=array("d", values), limits_min=limits, limits_max=limits)
+
+
+def engine_with(isensors: dict, **definition) -> RuleEngine:
+    engine = RuleEngine()
+    engine.definitions.append({"name": "Test", **definition})
+    engine.compile(isensors)
+    return engine
+
+
+class Listener:
+    def __init__(self):
+        self.events = []
+
+    def on_alert(self, event):
+        self.events.append(event)
+
+
+def test_compile_resolves_and_subscribes(isensors: dict):
+    rule = AlertRule({"name": "Hot", "condition": "max(sensors('cpu / core*')) > 90 and sensor('/board/fan/0') == 0"})
+    rule.compile(isensors, list(isensors.values()))
+    assert rule.error is None
+    assert [isensor.id for isensor in rule._dependencies] == ["/cpu/0/load/1", "/cpu/0/load/2", "/board/fan/0"]
+    assert all(isensor.subscribers == [rule] for isensor in rule._dependencies)
+    assert isensors["/cpu/0/temperature/0"].subscribers == []
+
+    rule.release()
+    assert all(isensor.subscribers == [] for isensor in isensors.values())
+
+
+def test_invalid_condition_is_never_raised(isensors: dict):
+    engine = engine_with(isensors, condition="sensor('/missing') > 0")
+    rule = engine.get_rule("test")
+    assert "unknown sensor" in rule.error
+    engine.evaluate(snapshot(0.0, 100, 100, 100, 0))
+    assert not rule.active
+    assert engine.process_events() == 0
+
+
+def test_raise_and_clear_events(isensors: dict):
+    engine = engine_with(isensors, condition="sensor('/cpu/0/temperature/0') > limit('/cpu/0/temperature/0')",
+                         severity="YELLOW")
+    listener = Listener()
+    engine.add_listener("TEST", listener)
+    limits = [80, math.nan, math.nan, math.nan]
+
+    engine.evaluate(snapshot(0.0, 70, 0, 0, 0, limits=limits))
+    engine.evaluate(snapshot(1.0, 85, 0, 0, 0, limits=limits))
+    engine.evaluate(snapshot(2.0, 90, 0, 0, 0, limits=limits))  # still raised: no new event
+    assert engine.active_rules == [engine.get_rule("Test")]
+    engine.evaluate(snapshot(3.0, 75, 0, 0, 0, limits=limits))
+    assert engine.active_rules == []
+
+    assert engine.process_events() == 2
+    assert [event.raised for event in listener.events] == [True, False]
+    assert listener.events[0].rule.severity is AlertSeverity.YELLOW
+    assert listener.events[0].message == "YELLOW ALERT RAISED: Test"
+    assert engine.process_events() == 0
+
+
+def test_holding_duration(isensors: dict):
+    engine = engine_with(isensors, condition="sensor('/board/fan/0') == 0", duration=5)
+    rule = engine.get_rule("Test")
+    for timestamp in (0.0, 2.0, 4.9):
+        engine.evaluate(snapshot(timestamp, 0, 0, 0, 0))
+        assert not rule.active
+    engine.evaluate(snapshot(5.0, 0, 0, 0, 0))
+    assert rule.active
+
+    # Stopping to hold (even for a single evaluation) clears the rule and restarts the duration.
+    engine.evaluate(snapshot(6.0, 0, 0, 0, 900))
+    assert not rule.active
+    engine.evaluate(snapshot(7.0, 0, 0, 0, 0))
+    engine.evaluate(snapshot(11.0, 0, 0, 0, 0))
+    assert not rule.active
+    assert engine.process_events() == 2
+
+
+def test_undefined_condition_never_holds(isensors: dict):
+    engine = engine_with(isensors, condition="sensor('/board/fan/0') == 0")
+    rule = engine.get_rule("Test")
+    engine.evaluate(snapshot(0.0, 0, 0, 0, 0))
+    assert rule.active
+    engine.evaluate(snapshot(1.0, 0, 0, 0, math.nan))
+    assert math.isnan(rule.value)
+    assert not rule.active
+
+
+def test_rate_condition(isensors: dict):
+    engine = engine_with(isensors, condition="rate(sensor('/cpu/0/temperature/0')) > 2")
+    rule = engine.get_rule("Test")
+    engine.evaluate(snapshot(0.0, 50, 0, 0, 0))
+    assert math.isnan(rule.value)  # no previous values
+    engine.evaluate(snapshot(2.0, 56, 0, 0, 0))
+    assert rule.active
+    engine.evaluate(snapshot(4.0, 58, 0, 0, 0))
+    assert not rule.active
+
+
+def test_only_evaluated_when_polled(isensors: dict, cpu: FakeHardware):
+    engine = engine_with(isensors, condition="sensor('/cpu/0/temperature/0') > 90")
+    rule = engine.get_rule("Test")
+    cpu.polled = False
+    engine.evaluate(snapshot(0.0, 100, 0, 0, 0))
+    assert not rule.active
+    cpu.polled = True
+    engine.evaluate(snapshot(1.0, 100, 0, 0, 0))
+    assert rule.active
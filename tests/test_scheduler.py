@@ -0,0 +1,100 @@
+import pytest
+from lcarsmonitor.sensors.scheduler import PollScheduler, PollTier, RECOVERY_POLLS, SLOW_TIER_FACTOR, QUARANTINE_PERIOD
+
+
+class FakeHardware:
+    """Minimal stand-in for a Hardware: the scheduler only uses its ID, name, ``needs_polling`` and ``poll()``."""
+
+    def __init__(self, id: str, needs_polling: bool = True):
+        self.id = id
+        self.full_name = id
+        self.needs_polling = needs_polling
+        self.polled = False
+        self.polls = 0
+
+    def poll(self):
+        self.polls += 1
+
+
+@pytest.fixture
+def scheduler():
+    periods = {"fast": 0.5}
+    scheduler = PollScheduler(lambda hw: periods.get(hw.id, 1.0))
+    scheduler.budget = 0.1
+    return scheduler
+
+
+def test_polls_due_hardware(scheduler: PollScheduler):
+    fast, slow, unused = FakeHardware("fast"), FakeHardware("slow"), FakeHardware("unused", needs_polling=False)
+    scheduler.reset([fast, slow, unused], 0.0)
+    assert scheduler.poll_due(0.0) == [fast, slow]
+    assert not unused.polled
+    assert scheduler.next_deadline == 0.5
+    assert scheduler.poll_due(0.5) == [fast]
+    assert not slow.polled  # flags of hardware not polled are reset
+    assert set(scheduler.poll_due(1.0)) == {fast, slow}
+    assert scheduler.poll_due(1.2, force=True) == []
+    assert scheduler.poll_due(1.5, force=True) == [fast]
+
+
+def test_deadlines_dont_drift_or_burst(scheduler: PollScheduler):
+    hw = FakeHardware("slow")
+    scheduler.reset([hw], 0.0)
+    scheduler.poll_due(0.1)  # late poll: next deadline is still based on the previous one
+    assert scheduler.next_deadline == 1.0
+    scheduler.poll_due(3.5)  # fell behind more than a period: rescheduled from now, without catching up
+    assert hw.polls == 2
+    assert scheduler.next_deadline == 4.5
+
+
+def test_demotion_and_quarantine(scheduler: PollScheduler):
+    hw = FakeHardware("slow")
+    timing = scheduler.get_timing(hw)
+    for _ in range(scheduler.max_overruns - 1):
+        scheduler._record_poll(hw, 0.5)
+    assert timing.tier is PollTier.NORMAL
+    scheduler._record_poll(hw, 0.5)
+    assert timing.tier is PollTier.SLOW
+    assert scheduler.get_tier_period(hw) == SLOW_TIER_FACTOR
+
+    # A poll within budget resets the consecutive overruns.
+    scheduler._record_poll(hw, 0.5)
+    scheduler._record_poll(hw, 0.01)
+    scheduler._record_poll(hw, 0.5)
+    assert timing.tier is PollTier.SLOW
+    for _ in range(scheduler.max_overruns):
+        scheduler._record_poll(hw, 0.5)
+    assert timing.tier is PollTier.QUARANTINED
+    assert scheduler.get_tier_period(hw) == QUARANTINE_PERIOD
+    assert timing.total_overruns == 2 * scheduler.max_overruns + 2
+    assert timing.count == 2 * scheduler.max_overruns + 3
+
+
+def test_recovery(scheduler: PollScheduler):
+    hw = FakeHardware("slow")
+    timing = scheduler.get_timing(hw)
+    timing.tier = PollTier.QUARANTINED
+    scheduler._record_poll(hw, 0.01)  # probe poll within budget
+    assert timing.tier is PollTier.SLOW
+    for _ in range(RECOVERY_POLLS - 1):
+        scheduler._record_poll(hw, 0.01)
+    assert timing.tier is PollTier.SLOW
+    scheduler._record_poll(hw, 0.01)
+    assert timing.tier is PollTier.NORMAL
+
+
+def test_release_and_no_budget(scheduler: PollScheduler):
+    hw = FakeHardware("slow")
+    timing = scheduler.get_timing(hw)
+    timing.tier = PollTier.QUARANTINED
+    scheduler.release(hw)
+    assert timing.tier is PollTier.NORMAL
+
+    scheduler.budget = 0
+    for _ in range(10):
+        scheduler._record_poll(hw, 5.0)
+    assert timing.tier is PollTier.NORMAL
+    assert timing.maximum == 5.0
+
+    scheduler.clear_timings()
+    assert scheduler.get_timing(hw) is not timing
@@ -0,0 +1,75 @@
+import math
+import numpy as np
+import pytest
+from lcarsmonitor.sensors.smoothing import BatchSmoother, SmoothingFilter
+
+
+def smooth(smoother: BatchSmoother, *values: float, polled: list[bool] = None):
+    values = np.array(values, dtype=np.float64)
+    polled = np.ones(len(values), dtype=bool) if polled is None else np.array(polled)
+    return smoother.apply(values, polled)
+
+
+def test_no_filter_keeps_values():
+    smoother = BatchSmoother(2)
+    assert not smoother.is_active
+    assert list(smooth(smoother, 1.0, 2.0)) == [1.0, 2.0]
+
+
+def test_ema():
+    smoother = BatchSmoother(2)
+    smoother.configure(0, SmoothingFilter.EMA, 0.75)
+    assert smoother.is_active
+    assert list(smooth(smoother, 10.0, 10.0)) == [10.0, 10.0]  # first value is used as is
+    smoothed = smooth(smoother, 30.0, 30.0)
+    assert smoothed[0] == pytest.approx(15.0)
+    assert smoothed[1] == 30.0
+    assert smoother.get_filter(0) is SmoothingFilter.EMA
+
+
+def test_median_removes_spikes():
+    smoother = BatchSmoother(1)
+    smoother.configure(0, SmoothingFilter.MEDIAN, 2 / (BatchSmoother.MAX_MEDIAN_WINDOW - 1))  # window of 3 values
+    results = [smooth(smoother, value)[0] for value in (10.0, 11.0, 100.0, 12.0, 13.0)]
+    assert results[2:] == [11.0, 12.0, 13.0]
+
+
+def test_kalman_converges():
+    smoother = BatchSmoother(1)
+    smoother.configure(0, SmoothingFilter.KALMAN, 0.5)
+    smooth(smoother, 0.0)
+    results = [smooth(smoother, 10.0)[0] for _ in range(20)]
+    assert 0.0 < results[0] < 10.0
+    assert results[-1] == pytest.approx(10.0, abs=0.01)
+
+
+@pytest.mark.parametrize("filter", [SmoothingFilter.EMA, SmoothingFilter.MEDIAN, SmoothingFilter.KALMAN])
+def test_max_strength_still_follows_values(filter: SmoothingFilter):
+    smoother = BatchSmoother(1)
+    smoother.configure(0, filter, 1.0)
+    smooth(smoother, 0.0)
+    first = smooth(smoother, 100.0)[0]
+    for _ in range(2000):
+        last = smooth(smoother, 100.0)[0]
+    assert first < 100.0
+    assert last == pytest.approx(100.0, rel=0.01)
+
+
+def test_missing_and_unpolled_values():
+    smoother = BatchSmoother(2)
+    smoother.configure(0, SmoothingFilter.EMA, 0.5)
+    smoother.configure(1, SmoothingFilter.EMA, 0.5)
+    smooth(smoother, 10.0, 10.0)
+    smoothed = smooth(smoother, math.nan, 20.0, polled=[True, False])
+    assert math.isnan(smoothed[0])  # no value: no smoothed value
+    assert smoothed[1] == 10.0  # not polled: filter state is kept
+    assert smooth(smoother, 20.0, 20.0)[0] == pytest.approx(15.0)
+
+
+def test_configure_resets_state():
+    smoother = BatchSmoother(1)
+    smoother.configure(0, SmoothingFilter.EMA, 0.5)
+    smooth(smoother, 10.0)
+    smoother.configure(0, SmoothingFilter.EMA, 0.9)
+    assert smooth(smoother, 50.0)[0] == 50.0
+    smoother.configure(5, SmoothingFilter.EMA, 0.5)  # out of range: ignored
@@ -0,0 +1,82 @@
+import math
+import random
+import statistics
+import pytest
+from lcarsmonitor.sensors.stats import RunningStats, MovingAverage, P2Quantile, WindowedQuantile, SensorStats
+
+
+def test_running_stats():
+    stats = RunningStats()
+    assert math.isnan(stats.mean)
+    assert stats.stddev == 0.0
+    samples = [2.0, 4.0, 4.0, 4.0, 5.0, 5.0, 7.0, 9.0]
+    for sample in samples:
+        stats.add(sample)
+    assert stats.count == len(samples)
+    assert stats.mean == pytest.approx(statistics.mean(samples))
+    assert stats.variance == pytest.approx(statistics.variance(samples))
+    assert stats.stddev == pytest.approx(statistics.stdev(samples))
+
+
+def test_running_stats_is_stable_with_large_offsets():
+    stats = RunningStats()
+    for sample in (1e9 + 4, 1e9 + 7, 1e9 + 13, 1e9 + 16):
+        stats.add(sample)
+    assert stats.variance == pytest.approx(30.0)
+
+
+def test_moving_average_decays_with_time():
+    average = MovingAverage(10.0)
+    average.add(0.0, 0.0)
+    assert average.value == 0.0
+    average.add(10.0, 100.0)  # one window later: 1 - e^-1 of the way to the new value
+    assert average.value == pytest.approx(100.0 * (1.0 - math.exp(-1.0)))
+    average.add(10.0, 0.0)  # no time passed: no weight
+    assert average.value == pytest.approx(100.0 * (1.0 - math.exp(-1.0)))
+
+
+def test_moving_average_independent_of_rate():
+    slow, fast = MovingAverage(5.0), MovingAverage(5.0)
+    for step in range(11):
+        slow.add(step * 1.0, 50.0 if step > 0 else 0.0)
+    for step in range(101):
+        fast.add(step * 0.1, 50.0 if step > 0 else 0.0)
+    assert slow.value == pytest.approx(fast.value, rel=0.01)
+
+
+def test_p2_quantile_with_few_samples():
+    quantile = P2Quantile(0.5)
+    assert math.isnan(quantile.value)
+    for sample in (3.0, 1.0, 2.0):
+        quantile.add(sample)
+    assert quantile.value == 2.0
+
+
+@pytest.mark.parametrize("q", [0.5, 0.95])
+def test_p2_quantile_estimate(q: float):
+    rng = random.Random(1234)
+    samples = [rng.gauss(50.0, 10.0) for _ in range(5000)]
+    quantile = P2Quantile(q)
+    for sample in samples:
+        quantile.add(sample)
+    exact = statistics.quantiles(samples, n=100)[round(q * 100) - 1]
+    assert quantile.value == pytest.approx(exact, abs=1.0)
+
+
+def test_windowed_quantile():
+    quantile = WindowedQuantile(0.5, 10.0)
+    for timestamp in range(10):
+        quantile.add(float(timestamp), 10.0 + timestamp)
+    assert quantile.value == pytest.approx(14.5, abs=0.6)  # no complete window yet: current estimate
+    for timestamp in range(10, 15):
+        quantile.add(float(timestamp), 100.0)
+    assert quantile.value == pytest.approx(14.5, abs=0.6)  # last complete window
+
+
+def test_sensor_stats():
+    stats = SensorStats(average_window=1.0, percentile=0.5, percentile_window=60.0)
+    for timestamp in range(5):
+        stats.add(float(timestamp), 10.0)
+    assert stats.running.mean == 10.0
+    assert stats.average.value == pytest.approx(10.0)
+    assert stats.percentile.value == 10.0
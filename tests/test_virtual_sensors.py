@@ -0,0 +1,108 @@
+import math
+import pytest
+from array import array
+from lcarsmonitor.sensors.sensors_api import SensorType
+from lcarsmonitor.sensors.snapshot import SensorSnapshot
+from lcarsmonitor.sensors.sources.virtual_impl import VirtualSensors
+
+
+class FakeHardware:
+    def __init__(self, name: str):
+        self.full_name = name
+        self.polled = True
+
+
+class FakeSensor:
+    """Minimal stand-in for an InternalSensor: virtual sensors only use its ID, name, index, parent and subscribers."""
+
+    def __init__(self, parent: FakeHardware, id: str, name: str, index: int):
+        self.parent = parent
+        self.id = id
+        self.full_name = f"{parent.full_name} / {name}"
+        self.index = index
+        self.subscribers = []
+
+    def _add(self, subscriber):
+        self.subscribers.append(subscriber)
+
+    def _remove(self, subscriber):
+        self.subscribers.remove(subscriber)
+
+
+@pytest.fixture
+def gpu():
+    return FakeHardware("GPU")
+
+
+@pytest.fixture
+def source(gpu: FakeHardware):
+    """VirtualSensors with a few definitions, compiled over two real sensors (at indexes 0 and 1). Virtual sensors are
+    indexed after them."""
+    source = VirtualSensors()
+    source.definitions = [
+        {"name": "Total Power", "expression": "sensor('/gpu/0/power/0') + sensor('CPU / Package Power')", "type": "Power"},
+        {"name": "Doubled", "expression": "sensor('/virtual/power/total-power') * 2"},
+        {"name": "Broken", "expression": "sensor('/missing')"},
+    ]
+    source.initialize()
+    isensors = [FakeSensor(gpu, "/gpu/0/power/0", "Power", 0), FakeSensor(FakeHardware("CPU"), "/cpu/0/power/0", "Package Power", 1)]
+    for index, vsensor in enumerate(source.isensors, start=len(isensors)):
+        vsensor.index = index
+        isensors.append(vsensor)
+    source.compile({str(isensor.id): isensor for isensor in isensors})
+    return source
+
+
+def snapshot(*values: float):
+    nans = array("d", [math.nan] * len(values))
+    return SensorSnapshot(values=array("d", values), minimums=array("d", nans), maximums=array("d", nans),
+                          limits_min=nans, limits_max=nans)
+
+
+def test_compile(source: VirtualSensors):
+    total, doubled, broken = source.isensors
+    assert str(total.id) == "/virtual/power/total-power"
+    assert total.type == SensorType.Power
+    assert total.error is None and doubled.error is None
+    assert [str(isensor.id) for isensor in total._dependencies] == ["/gpu/0/power/0", "/cpu/0/power/0"]
+    assert "unknown sensor" in broken.error
+    assert not broken.needs_evaluation
+
+
+def test_evaluate_in_definition_order(source: VirtualSensors):
+    values = snapshot(100, 40, math.nan, math.nan, math.nan)
+    source.evaluate(values)
+    assert list(values.values[2:4]) == [140.0, 280.0]
+    assert math.isnan(values.values[4])
+    assert source.get_all_hardware()[0].polled
+    assert (values.minimums[2], values.maximums[2]) == (140.0, 140.0)
+
+
+def test_evaluate_only_when_polled(source: VirtualSensors):
+    source.evaluate(snapshot(100, 40, math.nan, math.nan, math.nan))
+    total = source.isensors[0]
+    for hw in {total.parent, *(isensor.parent for isensor in total._dependencies)}:
+        hw.polled = False  # as reset by the ComputerSystem before each poll
+    values = snapshot(150, 40, math.nan, math.nan, math.nan)
+    source.evaluate(values)
+    assert math.isnan(values.values[2])  # not evaluated: the sensors it uses weren't polled
+    assert not source.get_all_hardware()[0].polled
+
+
+def test_missing_values_have_no_value(source: VirtualSensors):
+    values = snapshot(math.nan, 40, math.nan, math.nan, math.nan)
+    source.evaluate(values)
+    assert math.isnan(values.values[2])
+    assert source.isensors[0].value is None
+
+
+def test_subscribes_to_dependencies_while_used(source: VirtualSensors):
+    total = source.isensors[0]
+    gpu_power = total._dependencies[0]
+    assert gpu_power.subscribers == []
+
+    node = object()
+    total._add(node)
+    assert gpu_power.subscribers == [total]
+    total._remove(node)
+    assert gpu_power.subscribers == []